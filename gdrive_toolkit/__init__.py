@@ -8,126 +8,157 @@ License: MIT
 
 __version__ = "0.1.0"
 
-# Import authentication functions
-from .auth import (
-    quick_connect,
-    authenticate_colab,
-    authenticate_kaggle,
-    authenticate_local,
-    detect_environment,
-    # Backward compatibility aliases
-    auth_colab,
-    auth_kaggle,
-    auth_local,
-)
-
-# Import file operations
-from .operations import (
-    upload_file,
-    download_file,
-    search_files,
-    delete_file,
-    get_file_info,
-    get_file_path,
-    list_files_in_folder,
-)
-
-# Import folder operations
-from .folder import (
-    create_folder,
-    share_file,
-    get_folder_id_by_name,
-    create_folder_path,
-    list_folders,
-    delete_folder,
-)
+# Public names by the submodule that defines them ("name as alias" renames).
+# Nothing is imported until first use (PEP 562), so importing the package,
+# or running a trivial CLI command, doesn't pull in pydrive2 and friends.
+_SUBMODULE_EXPORTS = {
+    # Authentication functions
+    'auth': (
+        'quick_connect',
+        'authenticate_colab',
+        'authenticate_kaggle',
+        'authenticate_local',
+        'detect_environment',
+        'DriveHandleFactory',
+        'get_handle_factory',
+        'TokenRefresher',
+        'start_token_refresher',
+        # Backward compatibility aliases
+        'auth_colab',
+        'auth_kaggle',
+        'auth_local',
+    ),
+    # File operations
+    'operations': (
+        'upload_file',
+        'download_file',
+        'search_files',
+        'iter_search_files',
+        'delete_file',
+        'delete_files',
+        'get_file_info',
+        'get_files_info',
+        'get_file_path',
+        'get_file_paths',
+        'PathResolver',
+        'list_files_in_folder',
+        'FIELD_PRESETS',
+    ),
+    # Folder operations
+    'folder': (
+        'create_folder',
+        'share_file',
+        'share_files',
+        'get_folder_id_by_name',
+        'create_folder_path',
+        'prefill_folder_cache',
+        'list_folders',
+        'iter_list_folders',
+        'delete_folder',
+    ),
+    # Client operations (advanced)
+    'client': (
+        'upload_file as upload_file_client',
+        'download_file as download_file_client',
+        'create_folder as create_folder_client',
+        'list_folder',
+        'iter_list_folder',
+        'search_files as search_files_client',
+        'iter_search_files as iter_search_files_client',
+        'delete_file_or_folder',
+        'share_anyone_reader',
+        'get_shareable_link',
+        'zip_and_upload',
+        'upload_large_file',
+        'download_file_with_progress',
+        'copy_file',
+        'copy_files',
+        'move_file',
+        'get_folder_size',
+    ),
+    # Utilities
+    'utils': (
+        'format_size',
+        'print_file_list',
+        'validate_file_path',
+        'compute_md5',
+        'get_mime_type',
+        'guess_mime_type',
+        'detect_environment as detect_env',
+        'print_progress_bar',
+        'format_file_size',
+        'batch_upload',
+        'batch_download',
+        'create_readme_file',
+    ),
+    # Tree traversal
+    'walk': (
+        'walk_tree',
+        'folder_stats',
+    ),
+    # Batched requests
+    'batch': (
+        'BatchExecutor',
+    ),
+    # Asyncio client (needs the optional aiohttp dependency at use time)
+    'aio': (
+        'AsyncDriveClient',
+    ),
+    # Local index
+    'index': (
+        'DriveIndex',
+    ),
+    # Directory sync
+    'sync': (
+        'sync_to_drive',
+        'mirror_from_drive',
+    ),
+    # Caching
+    'cache': (
+        'MetadataCache',
+        'get_metadata_cache',
+        'set_metadata_cache',
+        'FolderCache',
+        'get_folder_cache',
+        'set_folder_cache',
+        'TokenCache',
+        'get_token_cache',
+        'set_token_cache',
+    ),
+}
 
-# Import client operations (advanced)
-from .client import (
-    upload_file as upload_file_client,
-    download_file as download_file_client,
-    create_folder as create_folder_client,
-    list_folder,
-    search_files as search_files_client,
-    delete_file_or_folder,
-    share_anyone_reader,
-    get_shareable_link,
-    zip_and_upload,
-    upload_large_file,
-    download_file_with_progress,
-    copy_file,
-    move_file,
-    get_folder_size,
-)
+_LAZY_IMPORTS = {}
+for _module, _names in _SUBMODULE_EXPORTS.items():
+    for _name in _names:
+        _attr, _, _alias = _name.partition(' as ')
+        _LAZY_IMPORTS[_alias or _attr] = (_module, _attr)
+del _module, _names, _name, _attr, _alias
 
-# Import utilities
-from .utils import (
-    format_size,
-    print_file_list,
-    validate_file_path,
-    get_mime_type,
-    guess_mime_type,
-    detect_environment as detect_env,
-    print_progress_bar,
-    format_file_size,
-    batch_upload,
-    batch_download,
-    create_readme_file,
-)
 
-# Define what gets imported with "from gdrive_toolkit import *"
-__all__ = [
-    # Version
-    '__version__',
-    
-    # Authentication
-    'quick_connect',
-    'authenticate_colab',
-    'authenticate_kaggle',
-    'authenticate_local',
-    'detect_environment',
-    'auth_colab',
-    'auth_kaggle',
-    'auth_local',
-    
-    # File operations
-    'upload_file',
-    'download_file',
-    'search_files',
-    'delete_file',
-    'get_file_info',
-    'list_files_in_folder',
+def __getattr__(name):
+    """Import a public name (or a submodule) on first access."""
+    from importlib import import_module
     
-    # Folder operations
-    'create_folder',
-    'share_file',
-    'get_folder_id_by_name',
-    'create_folder_path',
-    'list_folders',
-    'delete_folder',
+    if name in _SUBMODULE_EXPORTS:
+        # gdrive_toolkit.client etc. worked before the imports went lazy
+        return import_module(f".{name}", __name__)
     
-    # Client operations (advanced)
-    'list_folder',
-    'delete_file_or_folder',
-    'share_anyone_reader',
-    'get_shareable_link',
-    'zip_and_upload',
-    'upload_large_file',
-    'download_file_with_progress',
-    'copy_file',
-    'move_file',
-    'get_folder_size',
+    try:
+        module_name, attr = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
     
-    # Utilities
-    'format_size',
-    'print_file_list',
-    'validate_file_path',
-    'get_mime_type',
-    'guess_mime_type',
-    'detect_env',
-    'print_progress_bar',
-    'format_file_size',
-    'batch_upload',
-    'batch_download',
-    'create_readme_file',
-]
+    value = getattr(import_module(f".{module_name}", __name__), attr)
+    # Cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+# Define what gets imported with "from gdrive_toolkit import *"
+# Built from _SUBMODULE_EXPORTS so the two can't drift apart; the *_client
+# aliases are only reachable as attributes, as before
+__all__ = ['__version__'] + [name for name in _LAZY_IMPORTS if not name.endswith('_client')]
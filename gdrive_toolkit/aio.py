@@ -0,0 +1,601 @@
+"""
+Asyncio client for Google Drive.
+Client bất đồng bộ (asyncio) cho Google Drive.
+
+Talks to the Drive v2 REST API over aiohttp with a pooled connector, so
+thousands of metadata calls can overlap inside one event loop without a
+thread per call. Authentication reuses an authenticated GoogleDrive
+instance; its access token is refreshed off the event loop when needed.
+
+Requires the optional aiohttp dependency::
+
+    pip install gdrive-toolkit[async]
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import uuid
+import asyncio
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydrive2.drive import GoogleDrive
+
+
+API_URL = "https://www.googleapis.com/drive/v2/files"
+UPLOAD_URL = "https://www.googleapis.com/upload/drive/v2/files"
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+# Files up to this size go up in one multipart request
+MULTIPART_LIMIT = 5 * 1024 * 1024  # 5 MB
+
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB, a multiple of 256 KB
+
+# Chunk responses after which the session offset is queried before resending
+RESYNC_STATUSES = (403, 429, 500, 502, 503, 504)
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class AsyncDriveClient:
+    """
+    Async equivalents of the core Drive operations.
+    Các thao tác Drive cơ bản dạng async.
+    
+    At most ``max_concurrency`` requests are in flight at once; the rest
+    wait on a semaphore. Transient failures (429, 5xx, rate-limit 403s and
+    dropped connections) are retried with exponential backoff, and an
+    expired token is refreshed once on 401.
+    
+    Example:
+        >>> drive = quick_connect()
+        >>> async with AsyncDriveClient(drive, max_concurrency=64) as client:
+        ...     infos = await asyncio.gather(*(client.get_file(i) for i in file_ids))
+        ...     file_id = await client.upload_file("data.csv", parent_id=folder_id)
+    """
+    
+    def __init__(
+        self,
+        drive: GoogleDrive,
+        max_concurrency: int = 32,
+        max_retries: int = 5,
+        timeout: float = 300,
+        session=None
+    ):
+        """
+        Args:
+            drive: Authenticated GoogleDrive instance (credentials source)
+            max_concurrency: Maximum requests in flight (default: 32)
+            max_retries: Retries for transient failures (default: 5)
+            timeout: Total seconds allowed per request (default: 300)
+            session: aiohttp.ClientSession to use instead of creating one;
+                     it is not closed by close()
+        """
+        self.drive = drive
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._transport_errors: Tuple[type, ...] = (OSError, asyncio.TimeoutError)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    
+    async def close(self) -> None:
+        """Close the HTTP session if this client created it."""
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+            self._session = None
+    
+    def _get_session(self):
+        """Create the pooled aiohttp session on first use."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._refresh_lock = asyncio.Lock()
+            try:
+                import aiohttp  # type: ignore
+            except ImportError:
+                pass
+            else:
+                # Also for a caller's session: ServerDisconnectedError and
+                # ClientPayloadError are not OSErrors
+                self._transport_errors = (aiohttp.ClientError, OSError, asyncio.TimeoutError)
+        
+        if self._session is None:
+            try:
+                import aiohttp  # type: ignore
+            except ImportError:
+                raise ImportError(
+                    "AsyncDriveClient requires aiohttp. "
+                    "Install it with: pip install gdrive-toolkit[async]"
+                )
+            
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        
+        return self._session
+    
+    async def _access_token(self, force_refresh: bool = False) -> str:
+        """Return a valid access token, refreshing it in a worker thread if needed."""
+        auth = self.drive.auth
+        if force_refresh or auth.access_token_expired:
+            async with self._refresh_lock:  # type: ignore
+                # Another task may have refreshed while we waited
+                if force_refresh or auth.access_token_expired:
+                    await asyncio.to_thread(auth.Refresh)
+        return auth.credentials.access_token
+    
+    @staticmethod
+    def _is_retryable(status: int, body: bytes) -> bool:
+        from .batch import RATE_LIMIT_REASONS
+        from .transfer import RETRY_STATUSES
+        
+        if status in RETRY_STATUSES:
+            return True
+        if status != 403:
+            return False
+        try:
+            errors = json.loads(body)['error']['errors']
+        except (KeyError, TypeError, ValueError):
+            return False
+        return any(error.get('reason') in RATE_LIMIT_REASONS for error in errors)
+    
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        expected: Tuple[int, ...] = (200,),
+        sink=None,
+        max_retries: Optional[int] = None
+    ) -> Tuple[int, Any, bytes]:
+        """
+        Send one API request with retries.
+        
+        Args:
+            sink: Async callable fed each body chunk instead of buffering
+                  the body (for downloads); called with None before a retry
+            max_retries: Override the client's max_retries (0 to fail fast)
+        
+        Returns:
+            tuple: (status, response headers, body bytes)
+        """
+        session = self._get_session()
+        retries = self.max_retries if max_retries is None else max_retries
+        
+        async with self._semaphore:  # type: ignore
+            refreshed = refresh_now = False
+            attempt = 0
+            
+            while True:
+                token = await self._access_token(refresh_now)
+                refresh_now = False
+                request_headers = dict(headers or {}, Authorization=f"Bearer {token}")
+                
+                try:
+                    async with session.request(
+                        method, url, params=params, json=json_body, data=data,
+                        headers=request_headers
+                    ) as resp:
+                        status, resp_headers = resp.status, resp.headers
+                        if sink is not None and status in expected:
+                            async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                                await sink(chunk)
+                            body = b''
+                        else:
+                            body = await resp.read()
+                except self._transport_errors:
+                    if attempt == retries:
+                        raise
+                    if sink is not None:
+                        await sink(None)
+                else:
+                    if status in expected:
+                        return status, resp_headers, body
+                    
+                    if status == 404:
+                        raise FileNotFoundError(f"Not found: {method} {url}")
+                    
+                    if status == 401 and not refreshed:
+                        # A token refresh doesn't count as a retry
+                        refreshed = refresh_now = True
+                        continue
+                    
+                    if not self._is_retryable(status, body) or attempt == retries:
+                        raise RuntimeError(f"HTTP {status} for {method} {url}: {body[:200]!r}")
+                
+                await asyncio.sleep(min(2 ** attempt, 32))
+                attempt += 1
+    
+    async def _request_json(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        _, _, body = await self._request(method, url, **kwargs)
+        return json.loads(body) if body else {}
+    
+    async def get_file(self, file_id: str, fields: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get a file's metadata.
+        Lấy metadata của file.
+        
+        Full resources (fields=None) are served from and stored in the
+        shared metadata cache.
+        
+        Args:
+            file_id: Drive file ID
+            fields: Comma-separated fields (None for the full resource)
+        
+        Returns:
+            Dict: File resource
+        """
+        from .cache import get_metadata_cache
+        
+        cache = get_metadata_cache()
+        if cache is not None:
+            cached = cache.get(file_id)
+            if cached is not None:
+                return cached
+        
+        params = {'supportsAllDrives': 'true'}
+        if fields:
+            params['fields'] = fields
+        metadata = await self._request_json('GET', f"{API_URL}/{file_id}", params=params)
+        
+        if cache is not None and fields is None:
+            cache.put(file_id, metadata)
+        return metadata
+    
+    async def iter_search_files(
+        self,
+        query: Optional[str] = None,
+        folder_id: Optional[str] = None,
+        file_name: Optional[str] = None,
+        page_size: int = 100,
+        max_results: Optional[int] = None,
+        trashed: bool = False,
+        fields: Optional[str] = 'standard'
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield search results page by page.
+        Trả về kết quả tìm kiếm theo từng trang.
+        
+        Args:
+            query: Custom Drive query string
+            folder_id: Search only in this folder
+            file_name: Search by name (contains)
+            page_size: Results per request (max 1000)
+            max_results: Stop after this many results (None for all)
+            trashed: Include trashed files (default: False)
+            fields: FIELD_PRESETS name or comma-separated field list
+        
+        Yields:
+            Dict: File resources in API order
+        """
+        from .operations import _build_search_query, _list_fields
+        
+        if max_results is not None:
+            page_size = min(page_size, max_results)
+        
+        params: Dict[str, Any] = {'maxResults': min(page_size, 1000)}
+        q = _build_search_query(query, folder_id, file_name, trashed)
+        if q:
+            params['q'] = q
+        list_fields = _list_fields(fields)
+        if list_fields:
+            params['fields'] = list_fields
+        
+        count = 0
+        while True:
+            page = await self._request_json('GET', API_URL, params=params)
+            for item in page.get('items', []):
+                yield item
+                count += 1
+                if max_results is not None and count >= max_results:
+                    return
+            
+            if not page.get('nextPageToken'):
+                return
+            params['pageToken'] = page['nextPageToken']
+    
+    async def search_files(
+        self,
+        query: Optional[str] = None,
+        folder_id: Optional[str] = None,
+        file_name: Optional[str] = None,
+        max_results: int = 100,
+        trashed: bool = False,
+        fields: Optional[str] = 'standard'
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for files.
+        Tìm kiếm file.
+        
+        Args:
+            query: Custom Drive query string
+            folder_id: Search only in this folder
+            file_name: Search by name (contains)
+            max_results: Maximum results (default: 100)
+            trashed: Include trashed files (default: False)
+            fields: FIELD_PRESETS name or comma-separated field list
+        
+        Returns:
+            List[Dict]: Matching file resources
+        """
+        return [item async for item in self.iter_search_files(
+            query, folder_id, file_name, page_size=min(max_results, 1000),
+            max_results=max_results, trashed=trashed, fields=fields
+        )]
+    
+    async def list_folder(
+        self,
+        folder_id: str = 'root',
+        max_results: int = 1000,
+        fields: Optional[str] = 'basic'
+    ) -> List[Dict[str, Any]]:
+        """
+        List the files and folders directly inside a folder.
+        Liệt kê nội dung của folder.
+        
+        Args:
+            folder_id: Folder ID (default: "root")
+            max_results: Maximum results (default: 1000)
+            fields: FIELD_PRESETS name or comma-separated field list
+        
+        Returns:
+            List[Dict]: Child file resources
+        """
+        return await self.search_files(folder_id=folder_id, max_results=max_results,
+                                       fields=fields)
+    
+    async def create_folder(self, folder_name: str, parent_id: Optional[str] = None) -> str:
+        """
+        Create a folder.
+        Tạo folder.
+        
+        Args:
+            folder_name: Name of the new folder
+            parent_id: Parent folder ID (None for root)
+        
+        Returns:
+            str: New folder ID
+        """
+        from .folder import _remember_created_folder
+        
+        body: Dict[str, Any] = {'title': folder_name, 'mimeType': FOLDER_MIME}
+        if parent_id:
+            body['parents'] = [{'id': parent_id}]
+        
+        created = await self._request_json(
+            'POST', API_URL, json_body=body,
+            params={'supportsAllDrives': 'true', 'fields': 'id'}
+        )
+        _remember_created_folder(parent_id, folder_name, created['id'])
+        return created['id']
+    
+    async def delete(self, file_id: str, trash: bool = False) -> bool:
+        """
+        Delete a file or folder.
+        Xóa file hoặc folder.
+        
+        Args:
+            file_id: File or folder ID
+            trash: Move to trash instead of deleting permanently (default: False)
+        
+        Returns:
+            bool: True once deleted
+        """
+        from .folder import _forget_folder
+        from .operations import _invalidate_metadata
+        
+        if trash:
+            await self._request('POST', f"{API_URL}/{file_id}/trash",
+                                params={'supportsAllDrives': 'true', 'fields': 'id'})
+        else:
+            await self._request('DELETE', f"{API_URL}/{file_id}",
+                                params={'supportsAllDrives': 'true'}, expected=(200, 204))
+        
+        _invalidate_metadata(file_id)
+        _forget_folder(file_id)
+        return True
+    
+    async def upload_file(
+        self,
+        file_path: str,
+        parent_id: Optional[str] = None,
+        file_name: Optional[str] = None
+    ) -> str:
+        """
+        Upload a local file.
+        Upload file lên Drive.
+        
+        Files up to 5 MB are sent in one multipart request; larger files go
+        through a resumable session in 8 MB chunks. Disk reads run in a
+        worker thread so the event loop is never blocked.
+        
+        Args:
+            file_path: Local file to upload
+            parent_id: Destination folder ID (None for root)
+            file_name: Name on Drive (default: the local file name)
+        
+        Returns:
+            str: New file ID
+        """
+        from .utils import get_mime_type
+        
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        metadata: Dict[str, Any] = {'title': file_name or os.path.basename(file_path)}
+        if parent_id:
+            metadata['parents'] = [{'id': parent_id}]
+        mime_type = get_mime_type(file_path)
+        total_size = os.path.getsize(file_path)
+        params = {'supportsAllDrives': 'true', 'fields': 'id'}
+        
+        if total_size <= MULTIPART_LIMIT:
+            content = await asyncio.to_thread(_read_file, file_path, 0, total_size)
+            boundary = uuid.uuid4().hex
+            body = (
+                f"--{boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(metadata)}\r\n--{boundary}\r\nContent-Type: {mime_type}\r\n\r\n"
+            ).encode('utf-8') + content + f"\r\n--{boundary}--".encode('utf-8')
+            
+            created = await self._request_json(
+                'POST', UPLOAD_URL, data=body,
+                params=dict(params, uploadType='multipart'),
+                headers={'Content-Type': f'multipart/related; boundary={boundary}'}
+            )
+            return created['id']
+        
+        _, resp_headers, _ = await self._request(
+            'POST', UPLOAD_URL, json_body=metadata,
+            params=dict(params, uploadType='resumable'),
+            headers={'X-Upload-Content-Type': mime_type,
+                     'X-Upload-Content-Length': str(total_size)}
+        )
+        session_uri = resp_headers.get('Location')
+        if not session_uri:
+            raise RuntimeError("Drive did not return a resumable session URI")
+        
+        offset = 0
+        while True:
+            length = min(UPLOAD_CHUNK_SIZE, total_size - offset)
+            chunk = await asyncio.to_thread(_read_file, file_path, offset, length)
+            offset, resource = await self._put_chunk(session_uri, chunk, offset, total_size)
+            if resource is not None:
+                return resource['id']
+    
+    async def _put_chunk(
+        self,
+        session_uri: str,
+        data: bytes,
+        offset: int,
+        total_size: int
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Send one chunk of a resumable session, resyncing on transient failures.
+        
+        After a 5xx or a dropped connection Drive may have stored part of
+        the chunk, so ask for the session's offset instead of resending the
+        same range.
+        
+        Returns:
+            tuple: (next_offset, resource) where resource is the finished
+            file resource after the last chunk, else None.
+        """
+        from .transfer import _parse_range_offset
+        
+        content_range = f"bytes {offset}-{offset + len(data) - 1}/{total_size}"
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                # Retry here rather than in _request, which would resend blindly
+                status, resp_headers, body = await self._request(
+                    'PUT', session_uri, data=data, headers={'Content-Range': content_range},
+                    expected=(200, 201, 308) + RESYNC_STATUSES, max_retries=0
+                )
+            except self._transport_errors:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if status in (200, 201):
+                    return offset + len(data), json.loads(body)
+                if status == 308:
+                    return _parse_range_offset(resp_headers), None
+                if not self._is_retryable(status, body) or attempt == self.max_retries:
+                    raise RuntimeError(f"HTTP {status} while uploading chunk: {body[:200]!r}")
+            
+            await asyncio.sleep(min(2 ** attempt, 32))
+            
+            acked, resource = await self._query_upload_offset(session_uri, total_size)
+            if resource is not None:
+                return acked, resource
+            if acked != offset:
+                return acked, None
+        
+        raise RuntimeError("Chunk upload failed")
+    
+    async def _query_upload_offset(
+        self,
+        session_uri: str,
+        total_size: int
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Ask Drive how many bytes of a session it has acknowledged."""
+        from .transfer import _parse_range_offset
+        
+        status, resp_headers, body = await self._request(
+            'PUT', session_uri, data=b'', headers={'Content-Range': f"bytes */{total_size}"},
+            expected=(200, 201, 308, 404, 410)
+        )
+        if status in (200, 201):
+            return total_size, json.loads(body)
+        if status in (404, 410):
+            raise RuntimeError("Upload session expired")
+        return _parse_range_offset(resp_headers), None
+    
+    async def download_file(self, file_id: str, save_path: str = ".") -> str:
+        """
+        Download a file.
+        Download file từ Drive.
+        
+        The content is streamed to a temporary file next to the destination
+        and renamed into place when complete.
+        
+        Args:
+            file_id: Drive file ID
+            save_path: Directory or full destination path (default: ".")
+        
+        Returns:
+            str: Path to the downloaded file
+        """
+        from .sync import TEMP_PREFIX
+        
+        if os.path.isdir(save_path):
+            metadata = await self.get_file(file_id)
+            save_path = os.path.join(save_path, metadata['title'])
+        
+        directory = os.path.dirname(os.path.abspath(save_path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+        
+        f = open(temp_path, 'wb')
+        try:
+            async def sink(chunk):
+                if chunk is None:  # retrying: start over
+                    await asyncio.to_thread(f.truncate, 0)
+                    await asyncio.to_thread(f.seek, 0)
+                else:
+                    await asyncio.to_thread(f.write, chunk)
+            
+            await self._request(
+                'GET', f"{API_URL}/{file_id}",
+                params={'alt': 'media', 'supportsAllDrives': 'true'}, sink=sink
+            )
+            f.close()
+            os.replace(temp_path, save_path)
+        except BaseException:
+            f.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        return save_path
+
+
+def _read_file(file_path: str, offset: int, length: int) -> bytes:
+    """Read length bytes at offset (runs in a worker thread)."""
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
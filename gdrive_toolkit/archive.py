@@ -0,0 +1,336 @@
+"""
+Parallel ZIP archive writer.
+Tạo file ZIP với nén song song.
+
+Files are split into blocks that are deflated independently on a process
+pool (the same approach as pigz) and written back in order, so the
+archive is built at the speed of several cores while memory stays bounded
+by the number of blocks in flight.
+"""
+
+import os
+import time
+import struct
+import zlib
+from collections import deque
+from typing import Optional, List, Tuple, Callable, BinaryIO
+
+
+# Extensions whose content is already compressed; deflating them again
+# burns CPU for little or no gain, so they are stored as-is.
+STORED_EXTENSIONS = {
+    '.npz', '.pt', '.pth', '.ckpt', '.parquet', '.feather', '.orc', '.avro',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.avif',
+    '.mp3', '.mp4', '.mkv', '.mov', '.avi', '.webm', '.ogg', '.flac', '.aac',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.lz4', '.7z', '.rar',
+    '.whl', '.jar', '.apk', '.docx', '.xlsx', '.pptx',
+}
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_MAX_COUNT = 0xFFFF
+
+BLOCK_SIZE = 4 * 1024 * 1024  # 4 MB
+
+
+def should_store(file_path: str) -> bool:
+    """
+    Check whether a file should be stored rather than deflated.
+    Kiểm tra file đã nén sẵn (chỉ lưu, không nén lại).
+    
+    Args:
+        file_path: Path or archive name
+    
+    Returns:
+        bool: True for already-compressed types (.npz, .pt, .jpg, .parquet, ...)
+    """
+    return os.path.splitext(file_path)[1].lower() in STORED_EXTENSIONS
+
+
+def collect_folder_entries(folder_path: str) -> List[Tuple[str, str]]:
+    """
+    List every file under a folder with its archive name.
+    
+    Args:
+        folder_path: Folder to walk
+    
+    Returns:
+        List[Tuple[str, str]]: (file path, archive name) pairs in walk order
+    """
+    entries = []
+    for root, dirs, files in os.walk(folder_path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            entries.append((file_path, os.path.relpath(file_path, folder_path)))
+    return entries
+
+
+def _deflate_block(data: bytes, level: int, last: bool) -> bytes:
+    """
+    Deflate one block independently (runs in a worker process).
+    
+    Non-final blocks end with a sync flush so they are byte-aligned and
+    can be concatenated; only the last block sets the final-block bit.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _dos_datetime(mtime: float) -> Tuple[int, int]:
+    """Convert a timestamp to (DOS date, DOS time)."""
+    t = time.localtime(mtime)
+    year = max(t.tm_year, 1980)
+    dos_date = (year - 1980) << 9 | t.tm_mon << 5 | t.tm_mday
+    dos_time = t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2
+    return dos_date, dos_time
+
+
+class _ZipEntry:
+    """Bookkeeping for one archive member."""
+    
+    def __init__(self, arcname: str, method: int, mtime: float, mode: int, size: int):
+        self.name = arcname.replace(os.sep, '/').encode('utf-8')
+        self.utf8 = not arcname.isascii()
+        self.method = method
+        self.date, self.time = _dos_datetime(mtime)
+        self.external_attr = (mode & 0xFFFF) << 16
+        # Same heuristic as zipfile: compressed data may slightly exceed size
+        self.zip64 = size * 1.05 > ZIP64_LIMIT
+        self.header_offset = 0
+        self.crc = 0
+        self.compress_size = 0
+        self.file_size = 0
+    
+    @property
+    def flags(self) -> int:
+        # Bit 3: sizes and CRC follow the data in a data descriptor
+        return 0x08 | (0x800 if self.utf8 else 0)
+    
+    @property
+    def version(self) -> int:
+        return 45 if self.zip64 else 20
+
+
+class ParallelZipWriter:
+    """
+    Write a ZIP archive to a (possibly non-seekable) binary stream.
+    Ghi file ZIP ra stream, nén song song trên nhiều process.
+    
+    Every entry uses a data descriptor, so nothing is ever rewritten and
+    the target can be a pipe or a ResumableUploadStream.
+    
+    Example:
+        >>> with open('out.zip', 'wb') as f:
+        ...     with ParallelZipWriter(f, max_workers=8) as zipw:
+        ...         zipw.write('data.csv', 'data.csv')
+    """
+    
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        compresslevel: int = 6,
+        max_workers: Optional[int] = None,
+        block_size: int = BLOCK_SIZE
+    ):
+        """
+        Args:
+            fileobj: Writable binary stream
+            compresslevel: Deflate level 0-9 (default: 6)
+            max_workers: Compression processes (default: CPU count)
+            block_size: Uncompressed bytes per compression task (default: 4 MB)
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        self.fileobj = fileobj
+        self.compresslevel = compresslevel
+        self.block_size = block_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._entries: List[_ZipEntry] = []
+        # Ordered ('header' | 'data' | 'descriptor', entry, payload) operations
+        self._pending: deque = deque()
+        self._pending_blocks = 0
+        self._offset = 0
+        self._closed = False
+    
+    def _emit(self, data: bytes) -> None:
+        self.fileobj.write(data)
+        self._offset += len(data)
+    
+    def _write_local_header(self, entry: _ZipEntry) -> None:
+        entry.header_offset = self._offset
+        extra = b''
+        size_field = 0
+        if entry.zip64:
+            extra = struct.pack('<HHQQ', 0x0001, 16, 0, 0)
+            size_field = 0xFFFFFFFF
+        
+        self._emit(struct.pack(
+            '<IHHHHHIIIHH', 0x04034B50, entry.version, entry.flags, entry.method,
+            entry.time, entry.date, 0, size_field, size_field,
+            len(entry.name), len(extra)
+        ) + entry.name + extra)
+    
+    def _write_data_descriptor(self, entry: _ZipEntry) -> None:
+        if entry.zip64:
+            self._emit(struct.pack('<IIQQ', 0x08074B50, entry.crc,
+                                   entry.compress_size, entry.file_size))
+        else:
+            self._emit(struct.pack('<IIII', 0x08074B50, entry.crc,
+                                   entry.compress_size, entry.file_size))
+    
+    def _drain_one(self) -> None:
+        """Write the oldest pending operation, waiting for its compression if needed."""
+        kind, entry, payload = self._pending.popleft()
+        
+        if kind == 'header':
+            self._write_local_header(entry)
+        elif kind == 'data':
+            data = payload.result() if entry.method == ZIP_DEFLATED else payload
+            self._emit(data)
+            entry.compress_size += len(data)
+            self._pending_blocks -= 1
+        else:
+            self._write_data_descriptor(entry)
+    
+    def write(self, file_path: str, arcname: Optional[str] = None) -> None:
+        """
+        Add one file to the archive.
+        
+        Already-compressed types are stored; everything else is deflated
+        in blocks on the process pool. Output is written strictly in order,
+        and compression of later blocks (and later files) overlaps with it,
+        with at most ~2 blocks per worker held in memory.
+        
+        Args:
+            file_path: Local file to add
+            arcname: Name inside the archive (default: file_path)
+        """
+        stat = os.stat(file_path)
+        method = ZIP_STORED if should_store(file_path) or self.compresslevel == 0 else ZIP_DEFLATED
+        entry = _ZipEntry(arcname or file_path, method, stat.st_mtime, stat.st_mode, stat.st_size)
+        self._pending.append(('header', entry, None))
+        
+        max_pending = self.max_workers * 2
+        
+        with open(file_path, 'rb') as f:
+            block = f.read(self.block_size)
+            while True:
+                next_block = f.read(self.block_size)
+                last = not next_block
+                
+                entry.crc = zlib.crc32(block, entry.crc)
+                entry.file_size += len(block)
+                
+                if method == ZIP_DEFLATED:
+                    payload = self._executor.submit(
+                        _deflate_block, block, self.compresslevel, last
+                    )
+                else:
+                    payload = block
+                self._pending.append(('data', entry, payload))
+                self._pending_blocks += 1
+                
+                while self._pending_blocks >= max_pending:
+                    self._drain_one()
+                
+                if last:
+                    break
+                block = next_block
+        
+        self._pending.append(('descriptor', entry, None))
+        self._entries.append(entry)
+    
+    def close(self) -> None:
+        """Write the central directory and shut down the process pool."""
+        if self._closed:
+            return
+        self._closed = True
+        
+        while self._pending:
+            self._drain_one()
+        self._executor.shutdown()
+        
+        start_dir = self._offset
+        for entry in self._entries:
+            extra_values = []
+            file_size = entry.file_size
+            compress_size = entry.compress_size
+            header_offset = entry.header_offset
+            
+            if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+                extra_values += [file_size, compress_size]
+                file_size = compress_size = 0xFFFFFFFF
+            if header_offset > ZIP64_LIMIT:
+                extra_values.append(header_offset)
+                header_offset = 0xFFFFFFFF
+            
+            extra = b''
+            if extra_values:
+                extra = struct.pack(f'<HH{len(extra_values)}Q', 0x0001,
+                                    8 * len(extra_values), *extra_values)
+            
+            version = 45 if (extra_values or entry.zip64) else 20
+            self._emit(struct.pack(
+                '<IBBHHHHHIIIHHHHHII', 0x02014B50, version, 3, version,
+                entry.flags, entry.method, entry.time, entry.date, entry.crc,
+                compress_size, file_size, len(entry.name), len(extra), 0, 0, 0,
+                entry.external_attr, header_offset
+            ) + entry.name + extra)
+        
+        end_dir = self._offset
+        count = len(self._entries)
+        size_dir = end_dir - start_dir
+        
+        if count > ZIP_MAX_COUNT or start_dir > ZIP64_LIMIT or size_dir > ZIP64_LIMIT:
+            # ZIP64 end of central directory record and locator
+            self._emit(struct.pack('<IQHHIIQQQQ', 0x06064B50, 44, 45, 45, 0, 0,
+                                   count, count, size_dir, start_dir))
+            self._emit(struct.pack('<IIQI', 0x07064B50, 0, end_dir, 1))
+            count = min(count, ZIP_MAX_COUNT)
+            size_dir = min(size_dir, 0xFFFFFFFF)
+            start_dir = min(start_dir, 0xFFFFFFFF)
+        
+        self._emit(struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, count, count,
+                               size_dir, start_dir, 0))
+    
+    def abort(self) -> None:
+        """Stop worker processes without finishing the archive."""
+        self._closed = True
+        self._executor.shutdown(cancel_futures=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def write_zip_parallel(
+    fileobj: BinaryIO,
+    entries: List[Tuple[str, str]],
+    compresslevel: int = 6,
+    max_workers: Optional[int] = None,
+    on_entry: Optional[Callable[[str], None]] = None
+) -> None:
+    """
+    Write a ZIP archive of the given files, compressing on a process pool.
+    Tạo file ZIP, nén song song trên nhiều process.
+    
+    Args:
+        fileobj: Writable binary stream (need not be seekable)
+        entries: (file path, archive name) pairs, written in this order
+        compresslevel: Deflate level 0-9 (default: 6)
+        max_workers: Compression processes (default: CPU count)
+        on_entry: Called with each archive name after it is written
+    """
+    with ParallelZipWriter(fileobj, compresslevel=compresslevel, max_workers=max_workers) as zipw:
+        for file_path, arcname in entries:
+            zipw.write(file_path, arcname)
+            if on_entry:
+                on_entry(arcname)
@@ -5,7 +5,12 @@ Xác thực Google Drive cho nhiều môi trường (Colab, Kaggle, local).
 
 import os
 import sys
-from typing import Optional
+import hashlib
+import threading
+import weakref
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from oauth2client.client import Storage
 from pydrive2.auth import GoogleAuth
 from pydrive2.drive import GoogleDrive
 
@@ -202,11 +207,8 @@ def authenticate_kaggle(
             
             gauth.credentials = credentials
             
-            # Refresh to get access token
-            if gauth.access_token_expired:
-                gauth.Refresh()
-            else:
-                gauth.Authorize()
+            # Reuse a cached access token, or refresh to get one
+            _authorize_cached(gauth)
             
             drive = GoogleDrive(gauth)
             print("✓ Successfully authenticated in Kaggle (using refresh token)")
@@ -242,10 +244,7 @@ def authenticate_kaggle(
         )
     
     # Use existing credentials
-    if gauth.access_token_expired:
-        gauth.Refresh()
-    else:
-        gauth.Authorize()
+    _authorize_cached(gauth)
     
     drive = GoogleDrive(gauth)
     print("✓ Successfully authenticated in Kaggle (using saved credentials)")
@@ -304,14 +303,12 @@ def authenticate_local(
         # Authenticate if credentials don't exist
         print("First-time authentication required. Opening browser...")
         gauth.LocalWebserverAuth()
-    elif gauth.access_token_expired:
-        # Refresh credentials if expired
-        print("Refreshing expired credentials...")
-        gauth.Refresh()
+        _save_token(gauth.credentials)
+    elif _authorize_cached(gauth):
+        print("Refreshed expired credentials")
     else:
-        # Use existing valid credentials
+        # Valid token from the credentials file or the token cache
         print("Using existing credentials...")
-        gauth.Authorize()
     
     # Save credentials for next time
     gauth.SaveCredentialsFile(credentials_file)
@@ -328,7 +325,8 @@ def quick_connect(
     kaggle_credentials_txt: Optional[str] = None,
     client_id: Optional[str] = None,
     client_secret: Optional[str] = None,
-    refresh_token: Optional[str] = None
+    refresh_token: Optional[str] = None,
+    background_refresh: bool = True
 ) -> GoogleDrive:
     """
     Quick connect to Google Drive with auto-detection of environment.
@@ -347,6 +345,8 @@ def quick_connect(
         client_id: Google OAuth client ID (Kaggle only, optional)
         client_secret: Google OAuth client secret (Kaggle only, optional)
         refresh_token: Google OAuth refresh token (Kaggle only, optional)
+        background_refresh: Refresh the access token in a background thread
+                            shortly before it expires (default: True)
     
     Returns:
         GoogleDrive: Authenticated Google Drive instance
@@ -387,16 +387,422 @@ def quick_connect(
         print(f"🔍 Detected environment: {env.upper()}")
     
     if env == 'colab':
-        return authenticate_colab()
+        drive = authenticate_colab()
     elif env == 'kaggle':
-        return authenticate_kaggle(
+        drive = authenticate_kaggle(
             client_id=client_id,
             client_secret=client_secret,
             refresh_token=refresh_token,
             credentials_txt=kaggle_credentials_txt
         )
     else:  # local
-        return authenticate_local(credentials_file, client_secrets_file)
+        drive = authenticate_local(credentials_file, client_secrets_file)
+    
+    if background_refresh:
+        start_token_refresher(drive)
+    return drive
+
+
+# Access tokens valid for less than this are refreshed before use
+TOKEN_MIN_VALIDITY = 60
+
+
+def _utcnow() -> datetime:
+    """Current time as a naive UTC datetime, as oauth2client uses."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _token_cache_key(credentials) -> Optional[str]:
+    """Token cache key: a hash of the client ID and refresh token."""
+    refresh_token = getattr(credentials, 'refresh_token', None)
+    if not refresh_token:
+        return None
+    client_id = getattr(credentials, 'client_id', None) or ''
+    return hashlib.sha256(f"{client_id}:{refresh_token}".encode()).hexdigest()
+
+
+def _expires_within(credentials, seconds: float) -> bool:
+    """Check whether the access token is missing or expires within seconds."""
+    if credentials.access_token is None or credentials.access_token_expired:
+        return True
+    if credentials.token_expiry is None:
+        return False
+    return credentials.token_expiry - _utcnow() < timedelta(seconds=seconds)
+
+
+def _load_cached_token(credentials, min_validity: float = TOKEN_MIN_VALIDITY) -> bool:
+    """Load a cached access token into credentials; returns True on a hit."""
+    from .cache import get_token_cache
+    
+    key = _token_cache_key(credentials)
+    cache = get_token_cache()
+    if key is None or cache is None:
+        return False
+    
+    try:
+        cached = cache.get(key, min_validity=min_validity)
+    except Exception:
+        # The cache is an optimization; never fail authentication over it
+        return False
+    # The cached token may be the one we already hold and want replaced
+    if cached is None or cached[0] == credentials.access_token:
+        return False
+    
+    credentials.access_token, expiry = cached
+    # oauth2client compares against naive UTC datetimes
+    credentials.token_expiry = datetime.fromtimestamp(expiry, timezone.utc).replace(tzinfo=None)
+    credentials.invalid = False
+    return True
+
+
+def _save_token(credentials) -> None:
+    """Store the current access token so other processes can reuse it."""
+    from .cache import get_token_cache
+    
+    key = _token_cache_key(credentials)
+    cache = get_token_cache()
+    if key is None or cache is None or not credentials.access_token or not credentials.token_expiry:
+        return
+    
+    expiry = credentials.token_expiry.replace(tzinfo=timezone.utc).timestamp()
+    try:
+        cache.put(key, credentials.access_token, expiry)
+    except Exception:
+        pass
+
+
+def _authorize_cached(gauth: GoogleAuth) -> bool:
+    """
+    Authorize gauth, reusing a cached access token when one is still valid.
+    
+    Returns:
+        bool: True if the token had to be refreshed from the token endpoint
+    """
+    credentials = gauth.credentials
+    refreshed = False
+    
+    if _expires_within(credentials, TOKEN_MIN_VALIDITY) and not _load_cached_token(credentials):
+        gauth.Refresh()
+        _save_token(credentials)
+        refreshed = True
+    
+    gauth.Authorize()
+    return refreshed
+
+
+class _LockedMemoryStorage(Storage):
+    """
+    Credential store that only serializes refreshes and caches new tokens.
+    
+    oauth2client refreshes a token that got a 401 under its store's lock;
+    without a store, every thread that hits the 401 refreshes on its own.
+    The refreshed access token goes to the token cache; nothing else is
+    persisted.
+    """
+    
+    def __init__(self):
+        super().__init__(lock=threading.Lock())
+    
+    def locked_get(self):
+        return None
+    
+    def locked_put(self, credentials):
+        # Called after every refresh, including ones triggered by a 401
+        _save_token(credentials)
+    
+    def locked_delete(self):
+        pass
+
+
+class _SharedAuth(GoogleAuth):
+    """GoogleAuth for one worker thread: shared credentials, its own transport."""
+    
+    def __init__(self, factory: 'DriveHandleFactory'):
+        base = factory.drive.auth
+        super().__init__(settings=base.settings, http_timeout=base.http_timeout)
+        self.client_config = base.client_config
+        self.auth_method = base.auth_method
+        self.credentials = base.credentials
+        self.factory = factory
+    
+    def Refresh(self):
+        self.factory.refresh()
+    
+    # pydrive2 calls these when the token has expired; a worker thread must
+    # refresh the shared token instead of opening a browser
+    def LocalWebserverAuth(self, *args, **kwargs):
+        self.factory.refresh()
+    
+    def ServiceAuth(self):
+        self.factory.refresh()
+
+
+class DriveHandleFactory:
+    """
+    Per-thread GoogleDrive handles that share one authentication.
+    Tạo GoogleDrive handle riêng cho từng thread, dùng chung một lần xác thực.
+    
+    httplib2.Http is not thread-safe, so a single GoogleDrive handle can't
+    be used from several threads at once. The factory gives each thread
+    its own handle with its own authorized HTTP transport, whose
+    keep-alive connections are reused for every call that thread makes.
+    All handles share the credentials of the original handle, and the
+    access token is refreshed under a lock, once, whichever thread notices
+    it has expired.
+    
+    Example:
+        >>> factory = DriveHandleFactory(quick_connect())
+        >>> def work(path):
+        ...     return upload_file(factory.get(), path, show_progress=False)
+        >>> with ThreadPoolExecutor(max_workers=8) as pool:
+        ...     file_ids = list(pool.map(work, paths))
+    """
+    
+    def __init__(self, drive: GoogleDrive):
+        """
+        Args:
+            drive: Authenticated GoogleDrive instance (from quick_connect() etc.)
+        """
+        self.drive = drive
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+        
+        credentials = drive.auth.credentials
+        if credentials is not None and getattr(credentials, 'store', None) is None:
+            credentials.set_store(_LockedMemoryStorage())
+    
+    def refresh(self, min_validity: float = 0) -> bool:
+        """
+        Renew the shared access token if it expires within min_validity seconds.
+        
+        A token another process already refreshed is taken from the token
+        cache; otherwise the token endpoint is called and the new token is
+        cached.
+        
+        Args:
+            min_validity: Seconds the token must stay valid for (default: 0,
+                          renew only once it has expired)
+        
+        Returns:
+            bool: True if this call renewed the token
+        """
+        with self._refresh_lock:
+            auth = self.drive.auth
+            
+            # Another thread may have refreshed while we waited
+            if not _expires_within(auth.credentials, min_validity):
+                return False
+            
+            if not _load_cached_token(auth.credentials, max(min_validity, TOKEN_MIN_VALIDITY)):
+                auth.credentials.refresh(auth._build_http())
+                _save_token(auth.credentials)
+            return True
+    
+    def get(self) -> GoogleDrive:
+        """
+        Get the calling thread's handle, creating it on first use.
+        
+        Returns:
+            GoogleDrive: Handle to use from this thread only
+        """
+        handle = getattr(self._local, 'drive', None)
+        if handle is None:
+            handle = self._local.drive = self._new_handle()
+        return handle
+    
+    def _new_handle(self) -> GoogleDrive:
+        from googleapiclient.discovery import build
+        
+        self.refresh()
+        
+        gauth = _SharedAuth(self)
+        http = gauth.credentials.authorize(gauth._build_http())
+        gauth.http = http
+        # pydrive2 file objects use the auth's thread-local transport
+        gauth.thread_local.http = http
+        gauth.service = build("drive", "v2", http=http, cache_discovery=False)
+        
+        return GoogleDrive(gauth)
+
+
+_handle_factories_lock = threading.Lock()
+
+
+def get_handle_factory(drive: GoogleDrive) -> DriveHandleFactory:
+    """
+    Get the shared DriveHandleFactory for an authenticated handle.
+    Lấy DriveHandleFactory dùng chung cho một GoogleDrive handle.
+    
+    The factory is stored on the handle, so it lives exactly as long as
+    the handle does. Handles made by a factory map back to that factory,
+    so nested thread pools share one set of credentials.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+    
+    Returns:
+        DriveHandleFactory: Factory bound to drive's credentials
+    """
+    if isinstance(drive.auth, _SharedAuth):
+        return drive.auth.factory
+    
+    with _handle_factories_lock:
+        factory = getattr(drive, '_handle_factory', None)
+        if factory is None:
+            factory = drive._handle_factory = DriveHandleFactory(drive)
+        return factory
+
+
+class TokenRefresher(threading.Thread):
+    """
+    Background thread that renews the access token shortly before it expires.
+    Thread chạy nền làm mới access token trước khi hết hạn.
+    
+    Without it, the first request after expiry gets a 401, refreshes and
+    is retried; during a long transfer that stalls every worker at once.
+    The refresher sleeps until ``margin`` seconds before expiry and renews
+    the shared token through the handle factory, so all handles pick up
+    the new token. It only holds a weak reference to the factory and exits
+    once the handle is garbage collected. It is a daemon thread and never
+    keeps the process alive.
+    
+    Example:
+        >>> refresher = start_token_refresher(drive)
+        >>> refresher.stop()
+    """
+    
+    def __init__(
+        self,
+        factory: DriveHandleFactory,
+        margin: float = 300,
+        retry_delay: float = 60,
+        key: Optional[str] = None
+    ):
+        """
+        Args:
+            factory: Handle factory whose shared token is renewed
+            margin: Renew this many seconds before expiry (default: 300)
+            retry_delay: Seconds to wait after a failed refresh (default: 60)
+            key: Registry key used by start_token_refresher()
+        """
+        super().__init__(name='gdrive-token-refresher', daemon=True)
+        self.margin = margin
+        self.retry_delay = retry_delay
+        self.key = key
+        self.stopped = False
+        self._wake = threading.Event()
+        self.track(factory)
+    
+    @property
+    def factory(self) -> Optional[DriveHandleFactory]:
+        """The tracked factory, or None once its handle has been freed."""
+        return self._factory()
+    
+    def track(self, factory: DriveHandleFactory) -> None:
+        """Switch to another factory, e.g. the handle of a reconnect."""
+        self._factory = weakref.ref(factory)
+        # Wake up when the handle goes away, or to recompute the next refresh
+        weakref.finalize(factory, self._wake.set)
+        self._wake.set()
+    
+    def _seconds_until_due(self) -> Optional[float]:
+        """Seconds until the next refresh, or None once the handle is gone."""
+        factory = self._factory()
+        if factory is None:
+            return None
+        
+        credentials = factory.drive.auth.credentials
+        if credentials.access_token is None or credentials.invalid:
+            return 0
+        if credentials.token_expiry is None:
+            # No known expiry: check again later
+            return self.retry_delay
+        remaining = (credentials.token_expiry - _utcnow()).total_seconds()
+        return remaining - self.margin
+    
+    def _sleep(self, seconds: float) -> None:
+        self._wake.wait(seconds)
+        self._wake.clear()
+    
+    def _refresh(self) -> bool:
+        """Refresh through the factory; False if it failed."""
+        factory = self._factory()
+        if factory is None:
+            return True
+        try:
+            factory.refresh(min_validity=self.margin)
+            return True
+        except Exception as e:
+            print(f"⚠️ Background token refresh failed: {e}")
+            return False
+    
+    def run(self):
+        try:
+            while not self.stopped:
+                delay = self._seconds_until_due()
+                if delay is None:
+                    # Decide under the lock so start_token_refresher() can't
+                    # hand a new handle to a thread that is about to exit
+                    with _handle_factories_lock:
+                        if self._factory() is None:
+                            self.stopped = True
+                            break
+                    continue
+                if delay > 0:
+                    self._sleep(delay)
+                    continue
+                
+                # Sleep outside _refresh so no frame keeps the factory alive
+                if not self._refresh():
+                    self._sleep(self.retry_delay)
+                elif (self._seconds_until_due() or 1) <= 0:
+                    # Tokens live shorter than the margin; don't spin
+                    self._sleep(self.retry_delay)
+        finally:
+            with _handle_factories_lock:
+                if _token_refreshers.get(self.key) is self:
+                    del _token_refreshers[self.key]
+    
+    def stop(self) -> None:
+        """Stop the thread."""
+        self.stopped = True
+        self._wake.set()
+
+
+# Credentials key -> running refresher
+_token_refreshers: Dict[Optional[str], TokenRefresher] = {}
+
+
+def start_token_refresher(drive: GoogleDrive, margin: float = 300) -> TokenRefresher:
+    """
+    Keep a handle's access token fresh in the background.
+    Tự động làm mới access token ở chế độ nền.
+    
+    At most one refresher runs per set of credentials. Calling this again,
+    e.g. after reconnecting with the same refresh token, hands the running
+    refresher the new handle instead of starting another thread.
+    quick_connect() calls this by default.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        margin: Renew this many seconds before expiry (default: 300)
+    
+    Returns:
+        TokenRefresher: The running refresher thread
+    """
+    factory = get_handle_factory(drive)
+    key = _token_cache_key(factory.drive.auth.credentials) or f"id:{id(factory)}"
+    
+    with _handle_factories_lock:
+        refresher = _token_refreshers.get(key)
+        if refresher is not None and refresher.is_alive() and not refresher.stopped:
+            refresher.track(factory)
+            return refresher
+        
+        refresher = TokenRefresher(factory, margin=margin, key=key)
+        _token_refreshers[key] = refresher
+        refresher.start()
+        return refresher
 
 
 # Backward compatibility aliases
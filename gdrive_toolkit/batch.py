@@ -0,0 +1,170 @@
+"""
+Batched Drive API calls.
+Gộp nhiều lời gọi Drive API vào một batch request.
+
+Up to 100 calls are sent as one multipart request to the Drive batch
+endpoint, so bulk metadata, delete, share and copy operations cost about
+N/100 round trips instead of N. Sub-requests that fail with a transient
+error (rate limits, 5xx) are retried on their own in a later batch.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydrive2.drive import GoogleDrive
+
+
+# Drive accepts at most 100 calls per batch request
+MAX_BATCH_SIZE = 100
+
+# 403 reasons that mean "slow down" rather than "not allowed"
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+def _is_retryable(exception: Exception) -> bool:
+    """Check whether a failed sub-request is worth sending again."""
+    from .transfer import RETRY_STATUSES
+    
+    status = getattr(getattr(exception, 'resp', None), 'status', None)
+    if status in RETRY_STATUSES:
+        return True
+    if status != 403:
+        return False
+    
+    try:
+        errors = json.loads(exception.content)['error']['errors']  # type: ignore
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return False
+    return any(error.get('reason') in RATE_LIMIT_REASONS for error in errors)
+
+
+class BatchExecutor:
+    """
+    Collect Drive API calls and send them as multipart batch requests.
+    Gom các lời gọi Drive API và gửi theo batch.
+    
+    Calls are added as unexecuted googleapiclient requests, each under a
+    key. ``execute()`` sends them ``batch_size`` at a time and returns one
+    result per key: the response, or the exception for that call. Calls
+    that hit a rate limit or a 5xx error are retried with exponential
+    backoff, and only the failed calls are sent again.
+    
+    Example:
+        >>> executor = BatchExecutor(drive)
+        >>> for file_id in file_ids:
+        ...     executor.add(executor.service.files().delete(fileId=file_id), key=file_id)
+        >>> results = executor.execute()
+        >>> failed = {k: v for k, v in results.items() if isinstance(v, Exception)}
+    """
+    
+    def __init__(
+        self,
+        drive: GoogleDrive,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_retries: int = 5
+    ):
+        """
+        Args:
+            drive: Authenticated GoogleDrive instance
+            batch_size: Calls per batch request, 1-100 (default: 100)
+            max_retries: Retries for transient failures (default: 5)
+        """
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+        
+        if drive.auth.service is None:
+            drive.auth.Authorize()
+        
+        self.drive = drive
+        self.service = drive.auth.service
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retried = 0
+        self._calls: Dict[Hashable, Any] = {}
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    def add(self, request, key: Optional[Hashable] = None) -> Hashable:
+        """
+        Queue one call.
+        
+        Args:
+            request: Unexecuted request, e.g. ``service.files().get(fileId=...)``
+            key: Key for the result (default: the call's position)
+        
+        Returns:
+            Hashable: The key
+        """
+        if key is None:
+            key = len(self._calls)
+        if key in self._calls:
+            raise ValueError(f"Duplicate batch key: {key!r}")
+        self._calls[key] = request
+        return key
+    
+    def _execute_chunk(
+        self,
+        chunk: List[Tuple[Hashable, Any]],
+        results: Dict[Hashable, Any],
+        final: bool
+    ) -> List[Tuple[Hashable, Any]]:
+        """Send one batch request; returns the calls to retry."""
+        retry = []
+        
+        def callback(request_id, response, exception):
+            key, request = chunk[int(request_id)]
+            if exception is None:
+                results[key] = response
+            elif not final and _is_retryable(exception):
+                retry.append((key, request))
+            else:
+                results[key] = exception
+        
+        batch = self.service.new_batch_http_request(callback=callback)
+        for i, (key, request) in enumerate(chunk):
+            batch.add(request, request_id=str(i))
+        
+        try:
+            batch.execute(http=self.drive.auth.http)
+        except Exception as e:
+            # The batch request itself failed: every unanswered call is retried
+            if final:
+                for key, _ in chunk:
+                    results.setdefault(key, e)
+                return []
+            return [(key, request) for key, request in chunk if key not in results]
+        
+        return retry
+    
+    def execute(self) -> Dict[Hashable, Any]:
+        """
+        Send every queued call and clear the queue.
+        
+        Returns:
+            Dict: {key: response, or the Exception raised for that call},
+            in the order the calls were added
+        """
+        pending = list(self._calls.items())
+        order = list(self._calls)
+        self._calls = {}
+        results: Dict[Hashable, Any] = {}
+        
+        for attempt in range(self.max_retries + 1):
+            final = attempt == self.max_retries
+            retry = []
+            for start in range(0, len(pending), self.batch_size):
+                retry.extend(self._execute_chunk(pending[start:start + self.batch_size],
+                                                 results, final))
+            if not retry:
+                break
+            
+            self.retried += len(retry)
+            time.sleep(min(2 ** attempt, 32))
+            pending = retry
+        
+        return {key: results[key] for key in order}
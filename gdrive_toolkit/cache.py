@@ -0,0 +1,576 @@
+"""
+Caching helpers for gdrive-toolkit.
+Các bộ nhớ đệm (cache) cho gdrive-toolkit.
+"""
+
+import os
+import copy
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Iterable
+
+
+def default_cache_dir() -> str:
+    """
+    Get the directory used for persistent caches.
+    Lấy thư mục lưu cache.
+    
+    Uses $GDRIVE_TOOLKIT_CACHE_DIR if set, else $XDG_CACHE_HOME/gdrive-toolkit,
+    else ~/.cache/gdrive-toolkit.
+    
+    Returns:
+        str: Cache directory path (not created)
+    """
+    if os.environ.get('GDRIVE_TOOLKIT_CACHE_DIR'):
+        return os.environ['GDRIVE_TOOLKIT_CACHE_DIR']
+    
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'gdrive-toolkit')
+
+
+class HashCache:
+    """
+    Persistent cache of local file MD5 digests.
+    Cache MD5 của file local, lưu trên đĩa.
+    
+    Entries are keyed on absolute path and are only valid while the file's
+    mtime and size are unchanged, so repeat runs don't re-hash large files.
+    Safe to share between threads.
+    
+    Example:
+        >>> cache = HashCache()
+        >>> md5 = cache.md5("model.pt")  # hashed once, then served from cache
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (or create) a hash cache.
+        
+        Args:
+            db_path: SQLite file path (default: <cache dir>/hashes.sqlite)
+        """
+        if db_path is None:
+            db_path = os.path.join(default_cache_dir(), 'hashes.sqlite')
+        
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, md5 TEXT)"
+        )
+        self._conn.commit()
+    
+    def get(self, file_path: str) -> Optional[str]:
+        """
+        Get the cached MD5 of a file if it is still valid.
+        
+        Args:
+            file_path: Path to file
+        
+        Returns:
+            Optional[str]: Cached MD5, or None if missing or stale
+        """
+        stat = os.stat(file_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, size, md5 FROM hashes WHERE path = ?",
+                (os.path.abspath(file_path),)
+            ).fetchone()
+        
+        if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2]
+        return None
+    
+    def put(self, file_path: str, md5: str) -> None:
+        """
+        Store the MD5 of a file for its current mtime and size.
+        
+        Args:
+            file_path: Path to file
+            md5: MD5 hex digest of the file's current content
+        """
+        stat = os.stat(file_path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes (path, mtime_ns, size, md5) VALUES (?, ?, ?, ?)",
+                (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, md5)
+            )
+            self._conn.commit()
+    
+    def md5(self, file_path: str) -> str:
+        """
+        Get the MD5 of a file, hashing it only if the cache has no valid entry.
+        
+        Args:
+            file_path: Path to file
+        
+        Returns:
+            str: MD5 hex digest
+        """
+        from .utils import compute_md5
+        
+        cached = self.get(file_path)
+        if cached is not None:
+            return cached
+        
+        md5 = compute_md5(file_path)
+        self.put(file_path, md5)
+        return md5
+    
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
+
+
+_hash_cache: Optional[HashCache] = None
+_hash_cache_lock = threading.Lock()
+
+
+def get_hash_cache() -> HashCache:
+    """
+    Get the process-wide default HashCache, opening it on first use.
+    Lấy HashCache mặc định.
+    
+    Returns:
+        HashCache: Shared hash cache
+    """
+    global _hash_cache
+    
+    with _hash_cache_lock:
+        if _hash_cache is None:
+            try:
+                _hash_cache = HashCache()
+            except (OSError, sqlite3.Error):
+                # Read-only home directory: fall back to an in-memory cache
+                _hash_cache = HashCache(':memory:')
+        return _hash_cache
+
+
+class MetadataCache:
+    """
+    In-memory cache of Drive file metadata with a TTL and LRU eviction.
+    Cache metadata của file trên Drive (có TTL và LRU).
+    
+    Holds full Files.get resources keyed on file ID. Entries expire after
+    ``ttl`` seconds, the least recently used entry is evicted once
+    ``max_entries`` is reached, and writes made through the toolkit
+    invalidate the files they touch. Changes made outside the toolkit are
+    picked up once the entry expires. Safe to share between threads.
+    
+    Example:
+        >>> cache = MetadataCache(max_entries=4096, ttl=600)
+        >>> set_metadata_cache(cache)
+        >>> get_file_info(drive, "abc123")  # fetched
+        >>> get_file_info(drive, "abc123")  # served from cache
+        >>> cache.stats()
+        {'hits': 1, 'misses': 1, 'size': 1}
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        """
+        Args:
+            max_entries: Maximum number of cached files (default: 1024)
+            ttl: Seconds an entry stays valid (default: 60)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get cached metadata for a file.
+        
+        Args:
+            file_id: Drive file ID
+        
+        Returns:
+            Optional[Dict]: A copy of the metadata, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[file_id]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(file_id)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+    
+    def put(self, file_id: str, metadata: Dict[str, Any]) -> None:
+        """
+        Store metadata for a file.
+        
+        Args:
+            file_id: Drive file ID
+            metadata: Full file resource
+        """
+        with self._lock:
+            self._entries[file_id] = (time.monotonic() + self.ttl, copy.deepcopy(dict(metadata)))
+            self._entries.move_to_end(file_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, file_id: str) -> None:
+        """
+        Drop the cached metadata for a file.
+        
+        Args:
+            file_id: Drive file ID
+        """
+        with self._lock:
+            self._entries.pop(file_id, None)
+    
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict: {'hits', 'misses', 'size'}
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+_metadata_cache: Optional[MetadataCache] = MetadataCache()
+
+
+def get_metadata_cache() -> Optional[MetadataCache]:
+    """
+    Get the metadata cache used by the toolkit.
+    Lấy cache metadata đang dùng.
+    
+    Returns:
+        Optional[MetadataCache]: Active cache, or None if caching is disabled
+    """
+    return _metadata_cache
+
+
+def set_metadata_cache(cache: Optional[MetadataCache]) -> None:
+    """
+    Replace the metadata cache used by the toolkit.
+    Thay cache metadata.
+    
+    Any object with the same get/put/invalidate methods can be plugged in.
+    
+    Args:
+        cache: New cache, or None to disable metadata caching
+    
+    Example:
+        >>> set_metadata_cache(MetadataCache(ttl=300))  # longer-lived entries
+        >>> set_metadata_cache(None)                    # always hit the API
+    """
+    global _metadata_cache
+    _metadata_cache = cache
+
+
+class FolderCache:
+    """
+    Session cache of folder lookups by parent and name.
+    Cache tra cứu folder theo (folder cha, tên).
+    
+    Maps ``(parent_id, name)`` to a folder ID. Folders found or created
+    through the toolkit are remembered for ``ttl`` seconds, or until
+    deleted or moved through the toolkit, so a folder trashed elsewhere
+    stops resolving once its entry expires. Names known to be missing are
+    remembered for ``negative_ttl`` seconds, so a folder created elsewhere
+    is still found soon after. A parent can be marked
+    as fully listed, after which every name not seen in the listing
+    counts as missing. Safe to share between threads.
+    
+    Example:
+        >>> create_folder_path(drive, "Projects/2025/run-001")
+        >>> create_folder_path(drive, "Projects/2025/run-002")  # prefix is cached
+        >>> get_folder_cache().stats()['hits']
+    """
+    
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 30.0, max_entries: int = 10000):
+        """
+        Args:
+            ttl: Seconds a found folder stays cached (default: 300)
+            negative_ttl: Seconds a missing name stays cached (default: 30)
+            max_entries: Maximum cached lookups (default: 10000)
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # (parent_id, name) -> (expires, folder ID or None)
+        self._entries: OrderedDict = OrderedDict()
+        # parent_id -> expiry of a complete listing
+        self._listed: Dict[Optional[str], float] = {}
+        self._lock = threading.Lock()
+    
+    def _store(self, key: Any, expires: float, folder_id: Optional[str]) -> None:
+        self._entries[key] = (expires, folder_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def get(self, parent_id: Optional[str], name: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a folder.
+        
+        Args:
+            parent_id: Parent folder ID (None for "anywhere")
+            name: Folder name
+        
+        Returns:
+            Tuple[bool, Optional[str]]: (known, folder ID). known=False means
+            the cache has no answer; (True, None) means the folder is known
+            not to exist
+        """
+        now = time.monotonic()
+        key = (parent_id, name)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            
+            if self._listed.get(parent_id, 0) > now:
+                self.hits += 1
+                return True, None
+            
+            self.misses += 1
+            return False, None
+    
+    def put(self, parent_id: Optional[str], name: str, folder_id: Optional[str]) -> None:
+        """
+        Remember a lookup result.
+        
+        Args:
+            parent_id: Parent folder ID (None for "anywhere")
+            name: Folder name
+            folder_id: Folder ID, or None if no such folder exists
+        """
+        expires = time.monotonic() + (self.ttl if folder_id else self.negative_ttl)
+        with self._lock:
+            self._store((parent_id, name), expires, folder_id)
+    
+    def prefill(self, parent_id: str, folders: Iterable[Tuple[str, str]]) -> None:
+        """
+        Record the complete list of folders in a parent.
+        
+        Args:
+            parent_id: Parent folder ID
+            folders: (name, folder ID) pairs; the first ID of a name wins
+        """
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            seen = set()
+            for name, folder_id in folders:
+                if name not in seen:
+                    seen.add(name)
+                    self._store((parent_id, name), expires, folder_id)
+            self._listed[parent_id] = time.monotonic() + self.negative_ttl
+    
+    def invalidate(self, folder_id: str) -> None:
+        """
+        Forget a folder, e.g. after it was deleted or moved.
+        
+        Drops lookups that resolved to it and lookups inside it.
+        
+        Args:
+            folder_id: Folder ID
+        """
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v[1] == folder_id or k[0] == folder_id]:
+                del self._entries[key]
+            self._listed.pop(folder_id, None)
+    
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._listed.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict: {'hits', 'misses', 'size'}
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+_folder_cache: Optional[FolderCache] = FolderCache()
+
+
+def get_folder_cache() -> Optional[FolderCache]:
+    """
+    Get the folder lookup cache used by the toolkit.
+    Lấy cache tra cứu folder đang dùng.
+    
+    Returns:
+        Optional[FolderCache]: Active cache, or None if caching is disabled
+    """
+    return _folder_cache
+
+
+def set_folder_cache(cache: Optional[FolderCache]) -> None:
+    """
+    Replace the folder lookup cache used by the toolkit.
+    Thay cache tra cứu folder.
+    
+    Args:
+        cache: New cache, or None to disable folder lookup caching
+    """
+    global _folder_cache
+    _folder_cache = cache
+
+
+class TokenCache:
+    """
+    Persistent cache of OAuth access tokens and their expiry.
+    Cache access token OAuth (kèm thời hạn), dùng chung giữa các process.
+    
+    Lets a new process reuse a still-valid access token instead of calling
+    the token endpoint at startup. Entries are keyed on a hash of the
+    client ID and refresh token, so the refresh token itself is not
+    stored. The database file is readable by its owner only. Safe to share
+    between threads and processes.
+    
+    Example:
+        >>> cache = TokenCache()
+        >>> cache.put(key, "ya29...", time.time() + 3600)
+        >>> cache.get(key, min_validity=60)  # ("ya29...", expiry) or None
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (or create) a token cache.
+        
+        Args:
+            db_path: SQLite file path (default: <cache dir>/tokens.sqlite)
+        """
+        if db_path is None:
+            db_path = os.path.join(default_cache_dir(), 'tokens.sqlite')
+        
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            # Create the file owner-only before SQLite opens it
+            os.close(os.open(db_path, os.O_CREAT | os.O_RDWR, 0o600))
+        
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            "key TEXT PRIMARY KEY, access_token TEXT, expiry REAL)"
+        )
+        self._conn.commit()
+    
+    def get(self, key: str, min_validity: float = 60) -> Optional[Tuple[str, float]]:
+        """
+        Get a cached token that stays valid for at least min_validity seconds.
+        
+        Args:
+            key: Cache key
+            min_validity: Seconds the token must still be valid for (default: 60)
+        
+        Returns:
+            Optional[Tuple[str, float]]: (access token, expiry as a Unix
+            timestamp), or None if missing or expiring too soon
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT access_token, expiry FROM tokens WHERE key = ?", (key,)
+            ).fetchone()
+        
+        if row and row[1] - time.time() >= min_validity:
+            return row[0], row[1]
+        return None
+    
+    def put(self, key: str, access_token: str, expiry: float) -> None:
+        """
+        Store a token.
+        
+        Args:
+            key: Cache key
+            access_token: OAuth access token
+            expiry: Expiry as a Unix timestamp
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tokens (key, access_token, expiry) VALUES (?, ?, ?)",
+                (key, access_token, expiry)
+            )
+            self._conn.commit()
+    
+    def invalidate(self, key: str) -> None:
+        """Drop a token, e.g. after the API rejected it."""
+        with self._lock:
+            self._conn.execute("DELETE FROM tokens WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
+
+
+_token_cache: Optional[TokenCache] = None
+_token_cache_enabled = True
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> Optional[TokenCache]:
+    """
+    Get the token cache used by the toolkit, opening it on first use.
+    Lấy cache token đang dùng.
+    
+    Returns:
+        Optional[TokenCache]: Active cache, or None if token caching is disabled
+    """
+    global _token_cache
+    
+    with _token_cache_lock:
+        if _token_cache is None and _token_cache_enabled:
+            try:
+                _token_cache = TokenCache()
+            except (OSError, sqlite3.Error):
+                # Read-only home directory: fall back to an in-memory cache
+                _token_cache = TokenCache(':memory:')
+        return _token_cache
+
+
+def set_token_cache(cache: Optional[TokenCache]) -> None:
+    """
+    Replace the token cache used by the toolkit.
+    Thay cache token.
+    
+    Args:
+        cache: New cache, or None to disable token caching (every process
+               then fetches its own access token)
+    """
+    global _token_cache, _token_cache_enabled
+    
+    with _token_cache_lock:
+        _token_cache = cache
+        _token_cache_enabled = cache is not None
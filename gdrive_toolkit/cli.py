@@ -8,19 +8,20 @@ import sys
 import click
 from typing import Optional
 
-# Import functions
-from .auth import quick_connect
-from .client import (
-    upload_file,
-    download_file,
-    create_folder,
-    list_folder,
-    search_files,
-    delete_file_or_folder,
-    share_anyone_reader,
-    zip_and_upload,
-)
-from .utils import format_size, print_progress_bar
+# Drive functions are imported inside each command, so --help, info and
+# forwarding to the daemon don't pay for importing pydrive2
+
+
+def _connect():
+    """Get the daemon's authenticated handle when running in it, else authenticate."""
+    state = click.get_current_context().find_object(dict)
+    if state and state.get('drive') is not None:
+        return state['drive']
+    
+    from .auth import quick_connect
+    
+    click.echo("🔐 Authenticating...")
+    return quick_connect()
 
 
 @click.group()
@@ -45,8 +46,9 @@ def cli():
 @click.option('--no-progress', is_flag=True, help='Disable progress display')
 def upload(file_path: str, folder: Optional[str], name: Optional[str], share: bool, no_progress: bool):
     """Upload a file to Google Drive."""
-    click.echo("🔐 Authenticating...")
-    drive = quick_connect()
+    from .client import upload_file, search_files, create_folder, share_anyone_reader
+    
+    drive = _connect()
     
     # Find or create folder
     folder_id = None
@@ -80,8 +82,9 @@ def upload(file_path: str, folder: Optional[str], name: Optional[str], share: bo
 @click.option('--no-progress', is_flag=True, help='Disable progress display')
 def download(file_id: str, output: str, no_progress: bool):
     """Download a file from Google Drive."""
-    click.echo("🔐 Authenticating...")
-    drive = quick_connect()
+    from .client import download_file
+    
+    drive = _connect()
     
     click.echo(f"📥 Downloading file ID: {file_id}")
     path = download_file(drive, file_id, output, show_progress=not no_progress)
@@ -96,8 +99,10 @@ def download(file_id: str, output: str, no_progress: bool):
 @click.option('--limit', '-l', default=20, help='Maximum results (default: 20)')
 def search(query: Optional[str], folder: Optional[str], type: Optional[str], limit: int):
     """Search files in Google Drive."""
-    click.echo("🔐 Authenticating...")
-    drive = quick_connect()
+    from .client import search_files
+    from .utils import format_size
+    
+    drive = _connect()
     
     click.echo(f"🔍 Searching...")
     results = search_files(
@@ -133,8 +138,9 @@ def search(query: Optional[str], folder: Optional[str], type: Optional[str], lim
 @click.option('--parent', '-p', help='Parent folder ID (default: root)')
 def mkdir(name: str, parent: Optional[str]):
     """Create a folder in Google Drive."""
-    click.echo("🔐 Authenticating...")
-    drive = quick_connect()
+    from .client import create_folder
+    
+    drive = _connect()
     
     click.echo(f"📁 Creating folder: {name}")
     folder_id = create_folder(drive, name, parent_id=parent or "root")
@@ -147,8 +153,10 @@ def mkdir(name: str, parent: Optional[str]):
 @click.option('--limit', '-l', default=50, help='Maximum results (default: 50)')
 def ls(folder_id: Optional[str], limit: int):
     """List files in a folder."""
-    click.echo("🔐 Authenticating...")
-    drive = quick_connect()
+    from .client import list_folder
+    from .utils import format_size
+    
+    drive = _connect()
     
     parent = folder_id or "root"
     click.echo(f"📂 Listing folder: {parent}")
@@ -180,8 +188,9 @@ def ls(folder_id: Optional[str], limit: int):
 @click.option('--yes', '-y', is_flag=True, help='Skip confirmation')
 def delete(file_id: str, yes: bool):
     """Delete a file or folder."""
-    click.echo("🔐 Authenticating...")
-    drive = quick_connect()
+    from .client import delete_file_or_folder
+    
+    drive = _connect()
     
     click.echo(f"🗑️  Deleting: {file_id}")
     delete_file_or_folder(drive, file_id, confirm=not yes)
@@ -193,8 +202,9 @@ def delete(file_id: str, yes: bool):
 @click.argument('file_id')
 def share(file_id: str):
     """Get shareable link for a file."""
-    click.echo("🔐 Authenticating...")
-    drive = quick_connect()
+    from .client import share_anyone_reader
+    
+    drive = _connect()
     
     click.echo(f"🔗 Sharing: {file_id}")
     link = share_anyone_reader(drive, file_id)
@@ -209,8 +219,9 @@ def share(file_id: str):
 @click.option('--folder', '-f', help='Upload to specific folder ID')
 def zip_upload(folder_path: str, name: Optional[str], folder: Optional[str]):
     """Zip a folder and upload to Google Drive."""
-    click.echo("🔐 Authenticating...")
-    drive = quick_connect()
+    from .client import zip_and_upload
+    
+    drive = _connect()
     
     click.echo(f"📦 Zipping and uploading: {folder_path}")
     file_id = zip_and_upload(drive, folder_path, parent_id=folder, zip_name=name)
@@ -218,6 +229,54 @@ def zip_upload(folder_path: str, name: Optional[str], folder: Optional[str]):
     click.echo(f"✅ Done! File ID: {file_id}")
 
 
+@cli.command()
+@click.argument('local_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('--folder', '-f', default='root', help='Destination folder ID (default: root)')
+@click.option('--delete', is_flag=True, help='Trash remote files that no longer exist locally')
+@click.option('--workers', '-w', default=4, help='Parallel uploads (default: 4)')
+@click.option('--exclude', '-x', multiple=True, help='Glob pattern to skip (repeatable)')
+@click.option('--dry-run', is_flag=True, help='Show what would change without changing anything')
+def sync(local_dir: str, folder: str, delete: bool, workers: int, exclude: tuple, dry_run: bool):
+    """Sync a local directory to a Drive folder (local → Drive)."""
+    from .sync import sync_to_drive
+    
+    drive = _connect()
+    
+    report = sync_to_drive(drive, local_dir, folder_id=folder, delete=delete,
+                           max_workers=workers, exclude=list(exclude), dry_run=dry_run)
+    
+    if report['failed']:
+        for path, error in report['failed'].items():
+            click.echo(f"✗ {path}: {error}")
+        sys.exit(1)
+    
+    click.echo("✅ Done!" if not dry_run else "✅ Dry run complete, nothing changed")
+
+
+@cli.command()
+@click.argument('folder_id')
+@click.argument('local_dir', type=click.Path(file_okay=False))
+@click.option('--delete', is_flag=True, help='Delete local files that no longer exist on Drive')
+@click.option('--workers', '-w', default=4, help='Parallel downloads (default: 4)')
+@click.option('--exclude', '-x', multiple=True, help='Glob pattern to skip (repeatable)')
+@click.option('--dry-run', is_flag=True, help='Show what would change without changing anything')
+def mirror(folder_id: str, local_dir: str, delete: bool, workers: int, exclude: tuple, dry_run: bool):
+    """Mirror a Drive folder into a local directory (Drive → local)."""
+    from .sync import mirror_from_drive
+    
+    drive = _connect()
+    
+    report = mirror_from_drive(drive, folder_id, local_dir, delete=delete,
+                               max_workers=workers, exclude=list(exclude), dry_run=dry_run)
+    
+    if report['failed']:
+        for path, error in report['failed'].items():
+            click.echo(f"✗ {path}: {error}")
+        sys.exit(1)
+    
+    click.echo("✅ Done!" if not dry_run else "✅ Dry run complete, nothing changed")
+
+
 @cli.command()
 def info():
     """Show authentication and environment info."""
@@ -246,9 +305,104 @@ def info():
     click.echo(f"{'='*60}\n")
 
 
+@cli.group()
+def daemon():
+    """Keep an authenticated session running in the background."""
+    pass
+
+
+@daemon.command('start')
+@click.option('--socket', 'socket_path', help='Socket path (default: in the cache directory)')
+@click.option('--foreground', is_flag=True, help='Run in this process instead of detaching')
+def daemon_start(socket_path: Optional[str], foreground: bool):
+    """Start the daemon; later commands are forwarded to it."""
+    import subprocess
+    import time
+    from .auth import quick_connect
+    from .cache import default_cache_dir
+    from .daemon import DriveDaemon, default_socket_path, request
+    
+    socket_path = socket_path or default_socket_path()
+    if request({'op': 'status'}, socket_path) is not None:
+        click.echo(f"✓ Daemon already running on {socket_path}")
+        return
+    
+    if foreground:
+        server = DriveDaemon(quick_connect(), socket_path)
+        server.bind()
+        click.echo(f"✓ Daemon listening on {socket_path}")
+        server.serve_forever()
+        return
+    
+    # Authenticate here, where a browser prompt can be answered; the
+    # detached daemon then starts from the cached credentials and token
+    click.echo("🔐 Authenticating...")
+    quick_connect(background_refresh=False)
+    
+    log_path = os.path.join(default_cache_dir(), 'daemon.log')
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, 'ab') as log:
+        subprocess.Popen(
+            [sys.executable, '-m', 'gdrive_toolkit.cli', 'daemon', 'start',
+             '--foreground', '--socket', socket_path],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if request({'op': 'status'}, socket_path) is not None:
+            click.echo(f"✅ Daemon started on {socket_path}")
+            return
+        time.sleep(0.1)
+    
+    raise click.ClickException(f"Daemon did not start; see {log_path}")
+
+
+@daemon.command('stop')
+@click.option('--socket', 'socket_path', help='Socket path (default: in the cache directory)')
+def daemon_stop(socket_path: Optional[str]):
+    """Stop the daemon."""
+    from .daemon import request
+    
+    if request({'op': 'stop'}, socket_path) is None:
+        click.echo("Daemon is not running.")
+        return
+    click.echo("✅ Daemon stopped")
+
+
+@daemon.command('status')
+@click.option('--socket', 'socket_path', help='Socket path (default: in the cache directory)')
+def daemon_status(socket_path: Optional[str]):
+    """Show whether the daemon is running."""
+    from .daemon import request
+    
+    status = request({'op': 'status'}, socket_path)
+    if status is None:
+        click.echo("Daemon is not running.")
+        sys.exit(1)
+    
+    click.echo(f"✓ Daemon running (PID {status['pid']})")
+    click.echo(f"   Socket: {status['socket']}")
+    click.echo(f"   Uptime: {status['uptime']:.0f}s | Commands served: {status['commands']}")
+    if status['metadata_cache']:
+        stats = status['metadata_cache']
+        click.echo(f"   Metadata cache: {stats['size']} entries, "
+                   f"{stats['hits']} hits, {stats['misses']} misses")
+
+
 def main():
     """Main entry point for CLI."""
+    from .daemon import FORWARDED_COMMANDS, NO_DAEMON_ENV, forward
+    
+    argv = sys.argv[1:]
     try:
+        # Hand the command to a running daemon, if any
+        if argv and argv[0] in FORWARDED_COMMANDS and not os.environ.get(NO_DAEMON_ENV):
+            code = forward(argv)
+            if code is not None:
+                sys.exit(code)
+        
         cli()
     except KeyboardInterrupt:
         click.echo("\n\n👋 Interrupted by user")
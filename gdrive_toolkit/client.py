@@ -3,14 +3,18 @@ Client module - Advanced Google Drive operations.
 Module client - Các thao tác nâng cao với Google Drive.
 """
 
+from __future__ import annotations
+
 import os
 import zipfile
 import shutil
 import time
 import threading
-from typing import Optional, List, Dict, Any, Callable
-from pydrive2.drive import GoogleDrive
-from pydrive2.files import GoogleDriveFile
+from typing import Optional, List, Dict, Any, Callable, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydrive2.drive import GoogleDrive
+    from pydrive2.files import GoogleDriveFile
 
 
 def _monitor_transfer_progress(
@@ -90,7 +94,9 @@ def upload_file(
     local_path: str,
     parent_id: Optional[str] = None,
     file_name: Optional[str] = None,
-    show_progress: bool = True
+    show_progress: bool = True,
+    if_changed: bool = False,
+    remote_files: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> str:
     """
     Upload a file to Google Drive.
@@ -102,6 +108,10 @@ def upload_file(
         parent_id: Parent folder ID (None for root)
         file_name: Custom name (None to use original)
         show_progress: Show upload progress (default: True)
+        if_changed: Skip the upload if a same-named file with the same size
+                    and MD5 exists in the folder, or update it in place if
+                    it differs (default: False)
+        remote_files: Pre-fetched folder listing {title: metadata} for if_changed
     
     Returns:
         str: File ID
@@ -119,6 +129,25 @@ def upload_file(
     # Get file size for progress tracking
     file_size = os.path.getsize(local_path)
     
+    # Skip or update in place when a file with the same name exists
+    action = 'create'
+    if if_changed:
+        from .operations import _list_folder_files, _compare_with_remote
+        
+        if remote_files is None:
+            remote_files = _list_folder_files(drive, parent_id)
+        
+        remote = remote_files.get(metadata['title'])
+        action = _compare_with_remote(local_path, remote)
+        
+        if action == 'skip':
+            print(f"⏭ Skipped '{metadata['title']}' (unchanged, ID: {remote['id']})")  # type: ignore
+            return remote['id']  # type: ignore
+        
+        if action == 'update':
+            metadata = {'title': metadata['title'], 'id': remote['id'],  # type: ignore
+                        'mimeType': remote.get('mimeType')}  # type: ignore
+    
     gfile = drive.CreateFile(metadata)
     gfile.SetContentFile(local_path)
     
@@ -141,15 +170,89 @@ def upload_file(
     else:
         gfile.Upload()
     
-    print(f"✓ Uploaded '{metadata['title']}' (ID: {gfile['id']})")
+    if action == 'update':
+        from .operations import _invalidate_metadata
+        _invalidate_metadata(gfile['id'])
+    
+    print(f"✓ {'Updated' if action == 'update' else 'Uploaded'} '{metadata['title']}' (ID: {gfile['id']})")
     return gfile['id']
 
 
+def _download_ranged(
+    drive: GoogleDrive,
+    gfile: GoogleDriveFile,
+    output_path: str,
+    connections: int = 1,
+    resume: bool = False,
+    show_progress: bool = True,
+    callback: Optional[Callable[[int, int], None]] = None
+) -> None:
+    """
+    Download a binary file with HTTP Range requests, with optional progress bar.
+    
+    With resume=True the file is fetched into '<output>.part' and continues
+    from an earlier partial download; otherwise it is split over
+    ``connections`` concurrent connections.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        gfile: File with fetched metadata
+        output_path: Local path to write to
+        connections: Number of concurrent connections
+        resume: Resume from a matching partial file
+        show_progress: Print a progress bar and speed
+        callback: Progress callback (current, total)
+    """
+    from .transfer import download_segmented, download_resumable
+    from .utils import format_size, print_progress_bar
+    
+    file_size = int(gfile['fileSize'])
+    first_offset: List[Optional[int]] = [None]
+    
+    def on_progress(current: int, total: int) -> None:
+        if first_offset[0] is None:
+            first_offset[0] = current
+            if show_progress and current:
+                print(f"  ↻ Resuming at {format_size(current)}")
+        if show_progress:
+            print_progress_bar(current, total, prefix='  ', length=30)
+        if callback:
+            callback(current, total)
+    
+    if show_progress:
+        via = "with resume" if resume else f"over {connections} connections"
+        print(f"📥 Downloading '{gfile['title']}' ({format_size(file_size)}) {via}...")
+    
+    start_time = time.time()
+    if resume:
+        download_resumable(
+            drive, gfile['id'], output_path, file_size,
+            md5_checksum=gfile.get('md5Checksum'),
+            modified_date=gfile.get('modifiedDate'),
+            callback=on_progress
+        )
+    else:
+        download_segmented(
+            drive, gfile['id'], output_path, file_size,
+            md5_checksum=gfile.get('md5Checksum'),
+            connections=connections,
+            callback=on_progress
+        )
+    elapsed = time.time() - start_time
+    
+    fetched = file_size - (first_offset[0] or 0)
+    if show_progress and elapsed > 0:
+        print(f"  ✓ Download complete! ({format_size(int(fetched / elapsed))}/s)")
+
+
 def download_file(
     drive: GoogleDrive,
     file_id: str,
     dest_path: str,
-    show_progress: bool = True
+    show_progress: bool = True,
+    connections: int = 1,
+    resume: bool = False,
+    skip_unchanged: bool = False
 ) -> str:
     """
     Download a file from Google Drive.
@@ -160,12 +263,21 @@ def download_file(
         file_id: File ID to download
         dest_path: Destination path
         show_progress: Show download progress (default: True)
+        connections: Number of concurrent HTTP Range connections (default: 1).
+                     Values > 1 split binary files into byte ranges fetched
+                     in parallel and verify the result against md5Checksum.
+        resume: Download via '<dest>.part' and continue an interrupted
+                download if the remote md5Checksum/modifiedDate still match
+                (default: False). Takes precedence over connections.
+        skip_unchanged: Skip the transfer if the destination already has the
+                        same size and MD5 as the remote file (default: False)
     
     Returns:
         str: Downloaded file path
     """
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    from .operations import _fetch_file
+    
+    gfile = _fetch_file(drive, file_id)
     
     # Determine output path
     if os.path.isdir(dest_path):
@@ -175,8 +287,19 @@ def download_file(
     
     os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
     
+    if skip_unchanged:
+        from .operations import _is_unchanged_local
+        
+        if _is_unchanged_local(output_path, gfile):
+            print(f"⏭ Skipped '{gfile['title']}' (unchanged at '{output_path}')")
+            return output_path
+    
+    # Range downloads only apply to binary files (Google Docs have no fileSize)
+    if (resume or connections > 1) and int(gfile.get('fileSize', 0)) > 0:
+        _download_ranged(drive, gfile, output_path, connections, resume, show_progress)
+    
     # Show progress for large files
-    if show_progress:
+    elif show_progress:
         file_size = int(gfile.get('fileSize', 0))
         
         if file_size > 1024 * 1024:  # Show progress for files > 1MB
@@ -235,71 +358,108 @@ def create_folder(
         'parents': [{'id': parent_id}]
     }
     
+    from .folder import _remember_created_folder
+    
     folder = drive.CreateFile(metadata)
     folder.Upload()
+    _remember_created_folder(parent_id, name, folder['id'])
     
     print(f"✓ Created folder '{name}' (ID: {folder['id']})")
     return folder['id']
 
 
-def list_folder(
+def iter_list_folder(
     drive: GoogleDrive,
     parent_id: str = "root",
-    max_results: int = 100
-) -> List[Dict[str, Any]]:
+    page_size: int = 100,
+    max_results: Optional[int] = None,
+    fields: Optional[str] = 'basic'
+) -> Iterator[Dict[str, Any]]:
     """
-    List files in a folder.
-    Liệt kê file trong folder.
+    List files in a folder lazily, one page at a time.
+    Liệt kê file trong folder theo từng trang.
     
     Args:
         drive: Authenticated GoogleDrive instance
         parent_id: Folder ID (default: "root")
-        max_results: Maximum results
+        page_size: Results per request (default: 100, max: 1000)
+        max_results: Stop after this many results (default: None, all)
+        fields: Fields to request: a FIELD_PRESETS name, a comma-separated
+            field list, or 'full' (default: 'basic')
     
-    Returns:
-        List[Dict]: List of files
+    Yields:
+        Dict: File metadata, as returned by list_folder()
+    
+    Example:
+        >>> for f in iter_list_folder(drive, "folder_id", page_size=1000):
+        ...     print(f['title'])
     """
-    query = f"'{parent_id}' in parents and trashed = false"
+    from .operations import _iter_pages
     
-    file_list = drive.ListFile({
-        'q': query,
-        'maxResults': max_results
-    }).GetList()
+    query = f"'{parent_id}' in parents and trashed = false"
     
-    results = []
-    for f in file_list:
-        results.append({
+    for f in _iter_pages(drive, {'q': query}, page_size, max_results, fields):
+        yield {
             'id': f['id'],
-            'title': f['title'],
+            'title': f.get('title', 'N/A'),
             'mimeType': f.get('mimeType', 'unknown'),
             'size': f.get('fileSize', 'N/A'),
             'modifiedDate': f.get('modifiedDate', 'N/A')
-        })
+        }
+
+
+def list_folder(
+    drive: GoogleDrive,
+    parent_id: str = "root",
+    max_results: int = 100,
+    fields: Optional[str] = 'basic'
+) -> List[Dict[str, Any]]:
+    """
+    List files in a folder.
+    Liệt kê file trong folder.
     
-    return results
+    Args:
+        drive: Authenticated GoogleDrive instance
+        parent_id: Folder ID (default: "root")
+        max_results: Maximum results
+        fields: Fields to request (see iter_list_folder)
+    
+    Returns:
+        List[Dict]: List of files
+    """
+    return list(iter_list_folder(
+        drive, parent_id, page_size=max_results, max_results=max_results, fields=fields
+    ))
 
 
-def search_files(
+def iter_search_files(
     drive: GoogleDrive,
     name_contains: Optional[str] = None,
     mime_type: Optional[str] = None,
     parent_id: Optional[str] = None,
-    max_results: int = 100
-) -> List[Dict[str, Any]]:
+    page_size: int = 100,
+    max_results: Optional[int] = None,
+    fields: Optional[str] = 'basic'
+) -> Iterator[Dict[str, Any]]:
     """
-    Search files in Google Drive.
-    Tìm kiếm file trong Google Drive.
+    Search files lazily, one page at a time.
+    Tìm kiếm file theo từng trang.
     
     Args:
         drive: Authenticated GoogleDrive instance
         name_contains: Search by name
         mime_type: Filter by MIME type
         parent_id: Search in specific folder
-        max_results: Maximum results
+        page_size: Results per request (default: 100, max: 1000)
+        max_results: Stop after this many results (default: None, all)
+        fields: Fields to request: a FIELD_PRESETS name, a comma-separated
+            field list, or 'full' (default: 'basic')
     
-    Returns:
-        List[Dict]: List of matching files
+    Yields:
+        Dict: File metadata, as returned by search_files()
     """
+    from .operations import _iter_pages
+    
     query_parts = ["trashed = false"]
     
     if name_contains:
@@ -313,19 +473,42 @@ def search_files(
     
     query = " and ".join(query_parts)
     
-    file_list = drive.ListFile({
-        'q': query,
-        'maxResults': max_results
-    }).GetList()
-    
-    results = []
-    for f in file_list:
-        results.append({
+    for f in _iter_pages(drive, {'q': query}, page_size, max_results, fields):
+        yield {
             'id': f['id'],
-            'title': f['title'],
+            'title': f.get('title', 'N/A'),
             'mimeType': f.get('mimeType', 'unknown'),
             'size': f.get('fileSize', 'N/A'),
-        })
+        }
+
+
+def search_files(
+    drive: GoogleDrive,
+    name_contains: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    max_results: int = 100,
+    fields: Optional[str] = 'basic'
+) -> List[Dict[str, Any]]:
+    """
+    Search files in Google Drive.
+    Tìm kiếm file trong Google Drive.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        name_contains: Search by name
+        mime_type: Filter by MIME type
+        parent_id: Search in specific folder
+        max_results: Maximum results
+        fields: Fields to request (see iter_search_files)
+    
+    Returns:
+        List[Dict]: List of matching files
+    """
+    results = list(iter_search_files(
+        drive, name_contains, mime_type, parent_id,
+        page_size=max_results, max_results=max_results, fields=fields
+    ))
     
     print(f"✓ Found {len(results)} file(s)")
     return results
@@ -348,8 +531,10 @@ def delete_file_or_folder(
     Returns:
         bool: True if deleted
     """
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    from .operations import _fetch_file, _invalidate_metadata
+    from .folder import _forget_folder
+    
+    gfile = _fetch_file(drive, file_id)
     
     title = gfile['title']
     
@@ -360,6 +545,8 @@ def delete_file_or_folder(
             return False
     
     gfile.Delete()
+    _invalidate_metadata(file_id)
+    _forget_folder(file_id)
     print(f"✓ Deleted '{title}'")
     return True
 
@@ -379,14 +566,16 @@ def share_anyone_reader(
     Returns:
         str: Shareable link
     """
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    from .operations import _fetch_file, _invalidate_metadata
+    
+    gfile = _fetch_file(drive, file_id)
     
     gfile.InsertPermission({
         'type': 'anyone',
         'role': 'reader',
         'withLink': True
     })
+    _invalidate_metadata(file_id)
     
     link = gfile['alternateLink']
     print(f"✓ Shared '{gfile['title']}' (anyone can view)")
@@ -411,8 +600,9 @@ def get_shareable_link(
     Returns:
         str: Shareable link
     """
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    from .operations import _fetch_file, _invalidate_metadata
+    
+    gfile = _fetch_file(drive, file_id)
     
     # Ensure file is shared
     try:
@@ -423,25 +613,74 @@ def get_shareable_link(
         })
     except:
         pass  # May already be shared
+    _invalidate_metadata(file_id)
     
     return gfile.get('alternateLink', gfile.get('webViewLink', 'N/A'))
 
 
+def _write_folder_zip(
+    fileobj,
+    folder_path: str,
+    compresslevel: int = 6,
+    compress_workers: int = 1
+) -> None:
+    """
+    Write a ZIP of every file under folder_path to a binary stream.
+    
+    Already-compressed types (.npz, .pt, .jpg, .parquet, ...) are stored
+    instead of deflated. With compress_workers > 1, compression runs on a
+    process pool.
+    """
+    from .archive import collect_folder_entries, should_store, write_zip_parallel
+    
+    entries = collect_folder_entries(folder_path)
+    
+    if compress_workers > 1:
+        write_zip_parallel(
+            fileobj, entries,
+            compresslevel=compresslevel,
+            max_workers=compress_workers,
+            on_entry=lambda arcname: print(f"  Added: {arcname}")
+        )
+        return
+    
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+        for file_path, arcname in entries:
+            compress_type = zipfile.ZIP_STORED if should_store(file_path) else zipfile.ZIP_DEFLATED
+            zipf.write(file_path, arcname, compress_type=compress_type)
+            print(f"  Added: {arcname}")
+
+
 def zip_and_upload(
     drive: GoogleDrive,
     folder_path: str,
     parent_id: Optional[str] = None,
-    zip_name: Optional[str] = None
+    zip_name: Optional[str] = None,
+    stream: bool = False,
+    chunk_size: int = 8 * 1024 * 1024,  # 8 MB
+    compress_workers: int = 1,
+    compresslevel: int = 6
 ) -> str:
     """
     Zip a folder and upload to Google Drive.
     Nén folder và upload lên Google Drive.
     
+    Already-compressed files (.npz, .pt, .jpg, .parquet, ...) are stored
+    in the archive rather than deflated again.
+    
     Args:
         drive: Authenticated GoogleDrive instance
         folder_path: Path to folder to zip
         parent_id: Parent folder ID in Drive
         zip_name: Custom zip name (default: folder name)
+        stream: Compress straight into a resumable upload session instead of
+                writing a temporary archive to disk (default: False). Memory
+                use is bounded by chunk_size.
+        chunk_size: Upload chunk size for stream mode (default: 8 MB)
+        compress_workers: Processes used for compression (default: 1).
+                          Values > 1 deflate blocks in parallel and assemble
+                          the ZIP in order.
+        compresslevel: Deflate level 0-9 (default: 6)
     
     Returns:
         str: Uploaded zip file ID
@@ -455,18 +694,29 @@ def zip_and_upload(
     elif not zip_name.endswith('.zip'):
         zip_name += '.zip'
     
+    if stream:
+        from .transfer import ResumableUploadStream
+        
+        metadata = {'title': zip_name, 'mimeType': 'application/zip'}
+        if parent_id:
+            metadata['parents'] = [{'id': parent_id}]  # type: ignore
+        
+        print(f"Streaming zip archive to Drive: {zip_name}")
+        
+        with ResumableUploadStream(drive, metadata, chunk_size=chunk_size) as upload:
+            _write_folder_zip(upload, folder_path, compresslevel, compress_workers)
+        
+        file_id = upload.resource['id']  # type: ignore
+        print(f"✓ Zip streamed and uploaded (ID: {file_id})")
+        return file_id
+    
     # Create temporary zip file
     temp_zip = os.path.join(os.path.dirname(folder_path), zip_name)
     
     print(f"Creating zip archive: {zip_name}")
     
-    with zipfile.ZipFile(temp_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, folder_path)
-                zipf.write(file_path, arcname)
-                print(f"  Added: {arcname}")
+    with open(temp_zip, 'wb') as f:
+        _write_folder_zip(f, folder_path, compresslevel, compress_workers)
     
     # Upload zip
     print(f"Uploading {zip_name}...")
@@ -484,22 +734,32 @@ def upload_large_file(
     local_path: str,
     parent_id: Optional[str] = None,
     chunk_size: int = 256 * 1024 * 1024,  # 256 MB
-    callback: Optional[Callable[[int, int], None]] = None
+    callback: Optional[Callable[[int, int], None]] = None,
+    resume: bool = True
 ) -> str:
     """
     Upload large file with chunking.
     Upload file lớn với chunking.
     
+    The file is sent chunk by chunk through a resumable upload session.
+    The session URI is saved in '<file>.gdrive-upload.json' next to the
+    source, so if the process dies, calling this again resumes from the
+    last byte Drive acknowledged.
+    
     Args:
         drive: Authenticated GoogleDrive instance
         local_path: Path to file
         parent_id: Parent folder ID
-        chunk_size: Chunk size in bytes (default: 256 MB)
-        callback: Progress callback (current, total)
+        chunk_size: Chunk size in bytes, multiple of 256 KB (default: 256 MB)
+        callback: Progress callback (current, total), called after every chunk
+        resume: Resume a previously interrupted upload of this file (default: True)
     
     Returns:
         str: File ID
     """
+    from .transfer import upload_resumable
+    from .utils import format_size, print_progress_bar
+    
     if not os.path.exists(local_path):
         raise FileNotFoundError(f"File not found: {local_path}")
     
@@ -512,24 +772,40 @@ def upload_large_file(
     if parent_id:
         metadata['parents'] = [{'id': parent_id}]  # type: ignore
     
-    gfile = drive.CreateFile(metadata)
-    gfile.SetContentFile(local_path)
-    
-    # Set chunk size
-    gfile.Upload(param={'chunksize': chunk_size})
-    
-    if callback:
-        callback(file_size, file_size)
-    
-    print(f"✓ Uploaded '{file_name}' (ID: {gfile['id']})")
-    return gfile['id']
+    start_time = time.time()
+    first_offset: List[Optional[int]] = [None]
+    
+    def on_chunk(current: int, total: int) -> None:
+        if first_offset[0] is None:
+            first_offset[0] = current
+            if current and current < total:
+                print(f"  ↻ Resuming at {format_size(current)}")
+        print_progress_bar(current, total, prefix='  ', length=30)
+        if callback:
+            callback(current, total)
+    
+    resource = upload_resumable(
+        drive, local_path, metadata,
+        chunk_size=chunk_size,
+        callback=on_chunk,
+        resume=resume
+    )
+    
+    elapsed = time.time() - start_time
+    sent = file_size - (first_offset[0] or 0)
+    if elapsed > 0 and sent > 0:
+        print(f"  ✓ Upload complete! ({format_size(int(sent / elapsed))}/s)")
+    
+    print(f"✓ Uploaded '{file_name}' (ID: {resource['id']})")
+    return resource['id']
 
 
 def download_file_with_progress(
     drive: GoogleDrive,
     file_id: str,
     dest_path: str,
-    callback: Optional[Callable[[int, int], None]] = None
+    callback: Optional[Callable[[int, int], None]] = None,
+    connections: int = 1
 ) -> str:
     """
     Download file with progress tracking.
@@ -540,12 +816,15 @@ def download_file_with_progress(
         file_id: File ID
         dest_path: Destination path
         callback: Progress callback (current, total)
+        connections: Number of concurrent HTTP Range connections (default: 1).
+                     With > 1, callback is called after every byte range.
     
     Returns:
         str: Downloaded file path
     """
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    from .operations import _fetch_file
+    
+    gfile = _fetch_file(drive, file_id)
     
     file_name = gfile['title']
     file_size = int(gfile.get('fileSize', 0))
@@ -559,11 +838,15 @@ def download_file_with_progress(
     
     print(f"Downloading: {file_name} ({file_size:,} bytes)")
     
-    # Download with progress
-    gfile.GetContentFile(output_path)
-    
-    if callback:
-        callback(file_size, file_size)
+    if connections > 1 and file_size > 0:
+        _download_ranged(drive, gfile, output_path, connections,
+                         show_progress=False, callback=callback)
+    else:
+        # Download with progress
+        gfile.GetContentFile(output_path)
+        
+        if callback:
+            callback(file_size, file_size)
     
     print(f"✓ Downloaded to '{output_path}'")
     return output_path
@@ -588,8 +871,9 @@ def copy_file(
     Returns:
         str: Copied file ID
     """
-    source = drive.CreateFile({'id': file_id})
-    source.FetchMetadata()
+    from .operations import _fetch_file
+    
+    source = _fetch_file(drive, file_id)
     
     metadata = {
         'title': new_title or f"Copy of {source['title']}"
@@ -598,12 +882,82 @@ def copy_file(
     if parent_id:
         metadata['parents'] = [{'id': parent_id}]  # type: ignore
     
-    copied = source.Copy(metadata=metadata)  # type: ignore
+    copied = source.Copy(
+        target_folder={'id': parent_id} if parent_id else None,
+        new_title=metadata['title']
+    )
     
     print(f"✓ Copied '{source['title']}' to '{metadata['title']}'")
     return copied['id']
 
 
+def copy_files(
+    drive: GoogleDrive,
+    file_ids: List[str],
+    parent_id: Optional[str] = None,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    Copy many files with batched requests.
+    Sao chép nhiều file bằng batch request.
+    
+    Source titles are fetched in one batch (or served from the metadata
+    cache), then the copies are made in batches of up to 100.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_ids: Source file IDs
+        parent_id: Destination folder ID (None to copy next to each source)
+        verbose: Print a summary (default: True)
+    
+    Returns:
+        Dict: {source file ID: copied file ID, or the Exception raised for
+        that file}
+    
+    Example:
+        >>> copies = copy_files(drive, file_ids, parent_id="backup_folder_id")
+    """
+    from .batch import BatchExecutor
+    from .operations import _fetch_metadata_batch
+    
+    file_ids = list(dict.fromkeys(file_ids))
+    sources = _fetch_metadata_batch(drive, file_ids, fields='id,title')
+    
+    executor = BatchExecutor(drive)
+    results: Dict[str, Any] = {}
+    
+    for file_id in file_ids:
+        source = sources[file_id]
+        if isinstance(source, Exception):
+            results[file_id] = source
+            continue
+        
+        body: Dict[str, Any] = {'title': f"Copy of {source['title']}"}
+        if parent_id:
+            body['parents'] = [{'id': parent_id}]
+        
+        executor.add(
+            executor.service.files().copy(
+                fileId=file_id, body=body, fields='id', supportsAllDrives=True
+            ),
+            key=file_id
+        )
+    
+    for file_id, copied in executor.execute().items():
+        results[file_id] = copied if isinstance(copied, Exception) else copied['id']
+    
+    results = {file_id: results[file_id] for file_id in file_ids}
+    
+    if verbose:
+        copied_count = sum(1 for r in results.values() if not isinstance(r, Exception))
+        print(f"✓ Copied {copied_count}/{len(file_ids)} files")
+        for file_id, result in results.items():
+            if isinstance(result, Exception):
+                print(f"  ✗ {file_id}: {result}")
+    
+    return results
+
+
 def move_file(
     drive: GoogleDrive,
     file_id: str,
@@ -621,8 +975,10 @@ def move_file(
     Returns:
         bool: True if moved
     """
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    from .operations import _fetch_file, _invalidate_metadata, _clear_path_cache
+    from .folder import _forget_folder
+    
+    gfile = _fetch_file(drive, file_id)
     
     # Get current parents
     current_parents = gfile.get('parents', [])
@@ -634,6 +990,9 @@ def move_file(
     # Add new parent
     gfile['parents'] = [{'id': new_parent_id}]
     gfile.Upload()
+    _invalidate_metadata(file_id)
+    _clear_path_cache()
+    _forget_folder(file_id)
     
     print(f"✓ Moved '{gfile['title']}' to new folder")
     return True
@@ -641,34 +1000,32 @@ def move_file(
 
 def get_folder_size(
     drive: GoogleDrive,
-    folder_id: str
-) -> int:
+    folder_id: str,
+    detailed: bool = False,
+    max_workers: int = 4
+) -> Any:
     """
     Calculate total size of a folder.
     Tính tổng kích thước folder.
     
+    The tree is walked breadth-first with several folders per query
+    (see gdrive_toolkit.walk.walk_tree).
+    
     Args:
         drive: Authenticated GoogleDrive instance
         folder_id: Folder ID
+        detailed: Return size, file count and folder count (default: False)
+        max_workers: Concurrent queries (default: 4)
     
     Returns:
-        int: Total size in bytes
-    """
-    total_size = 0
+        int: Total size in bytes, or with detailed=True a dict
+        {'size', 'files', 'folders'}
     
-    query = f"'{folder_id}' in parents and trashed = false"
-    file_list = drive.ListFile({'q': query}).GetList()
-    
-    for f in file_list:
-        mime_type = f.get('mimeType', '')
-        
-        if mime_type == 'application/vnd.google-apps.folder':
-            # Recursive for subfolders
-            total_size += get_folder_size(drive, f['id'])
-        else:
-            # Add file size
-            size = f.get('fileSize')
-            if size:
-                total_size += int(size)
+    Example:
+        >>> stats = get_folder_size(drive, folder_id, detailed=True)
+        >>> print(stats['size'], stats['files'], stats['folders'])
+    """
+    from .walk import folder_stats
     
-    return total_size
+    stats = folder_stats(drive, folder_id, max_workers=max_workers)
+    return stats if detailed else stats['size']
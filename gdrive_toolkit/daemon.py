@@ -0,0 +1,432 @@
+"""
+Background daemon that serves CLI commands from one authenticated session.
+Tiến trình chạy nền phục vụ lệnh CLI bằng một phiên đã xác thực sẵn.
+
+``gdrive-toolkit daemon start`` authenticates once and listens on a Unix
+socket. While it runs, CLI commands are forwarded to it instead of
+authenticating again, so each call skips the token refresh and reuses
+the daemon's warm metadata and folder caches. Output and confirmation
+prompts are relayed to the calling terminal. Commands run one at a time,
+in the caller's working directory; while one runs, other callers run
+their command locally instead of waiting.
+
+The client side of this module uses only the standard library, so
+forwarding a command stays cheap.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import threading
+from typing import Optional, List, Dict, Any, TextIO
+
+
+# Commands the CLI forwards to a running daemon
+FORWARDED_COMMANDS = {
+    'upload', 'download', 'search', 'mkdir', 'ls', 'delete', 'share',
+    'zip-upload', 'sync', 'mirror',
+}
+
+# Set to any value to never forward commands
+NO_DAEMON_ENV = 'GDRIVE_TOOLKIT_NO_DAEMON'
+
+# Seconds to wait for the daemon to accept a connection or a command
+TIMEOUT = 5.0
+
+
+def default_socket_path() -> str:
+    """
+    Get the daemon's socket path.
+    Lấy đường dẫn socket của daemon.
+    
+    Uses $GDRIVE_TOOLKIT_SOCKET if set, else daemon.sock in the cache directory.
+    
+    Returns:
+        str: Socket path
+    """
+    if os.environ.get('GDRIVE_TOOLKIT_SOCKET'):
+        return os.environ['GDRIVE_TOOLKIT_SOCKET']
+    
+    from .cache import default_cache_dir
+    return os.path.join(default_cache_dir(), 'daemon.sock')
+
+
+def _send(stream, message: Dict[str, Any]) -> None:
+    stream.write(json.dumps(message).encode('utf-8') + b'\n')
+    stream.flush()
+
+
+def _receive(stream) -> Optional[Dict[str, Any]]:
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+
+def _open_connection(
+    socket_path: Optional[str] = None,
+    timeout: Optional[float] = TIMEOUT
+) -> Optional[socket.socket]:
+    """Connect to a running daemon; returns None if none is listening."""
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path or default_socket_path())
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: Dict[str, Any], socket_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Send one control message to the daemon and return its reply.
+    
+    Args:
+        message: e.g. {'op': 'status'} or {'op': 'stop'}
+        socket_path: Socket path (default: default_socket_path())
+    
+    Returns:
+        Optional[Dict]: The reply, or None if no daemon is running or it
+        did not answer within TIMEOUT seconds
+    """
+    sock = _open_connection(socket_path)
+    if sock is None:
+        return None
+    
+    with sock, sock.makefile('rwb') as stream:
+        try:
+            _send(stream, message)
+            return _receive(stream)
+        except OSError:  # includes socket.timeout
+            return None
+
+
+def forward(
+    argv: List[str],
+    socket_path: Optional[str] = None,
+    stdin: Optional[TextIO] = None,
+    stdout: Optional[TextIO] = None,
+    stderr: Optional[TextIO] = None,
+    timeout: float = TIMEOUT
+) -> Optional[int]:
+    """
+    Run a CLI command in the daemon, relaying its output and prompts.
+    Chạy một lệnh CLI trong daemon.
+    
+    Args:
+        argv: Command line arguments, e.g. ['ls', 'FOLDER_ID']
+        socket_path: Socket path (default: default_socket_path())
+        stdin, stdout, stderr: Streams to relay to (default: sys.*)
+        timeout: Seconds to wait for the daemon to connect and accept the
+                 command (default: TIMEOUT); the command itself may run
+                 for as long as it needs
+    
+    Returns:
+        Optional[int]: The command's exit code, or None if no daemon is
+        running, it is busy with another command or it did not answer in
+        time (run the command locally instead)
+    
+    Example:
+        >>> code = forward(sys.argv[1:])
+        >>> if code is not None:
+        ...     sys.exit(code)
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    
+    sock = _open_connection(socket_path, timeout)
+    if sock is None:
+        return None
+    
+    with sock, sock.makefile('rwb') as stream:
+        # Nothing has run until the daemon says so, so it's safe to fall back
+        try:
+            _send(stream, {'op': 'run', 'argv': argv, 'cwd': os.getcwd()})
+            reply = _receive(stream)
+        except OSError:  # includes socket.timeout
+            return None
+        if not reply or not reply.get('started'):
+            return None
+        sock.settimeout(None)
+        
+        while True:
+            message = _receive(stream)
+            if message is None:
+                raise RuntimeError("Daemon closed the connection before the command finished")
+            
+            if 'out' in message:
+                stdout.write(message['out'])
+                stdout.flush()
+            elif 'err' in message:
+                stderr.write(message['err'])
+                stderr.flush()
+            elif 'input' in message:
+                _send(stream, {'line': stdin.readline()})
+            elif 'exit' in message:
+                return message['exit']
+
+
+class _RelayWriter(io.TextIOBase):
+    """Text stream that sends everything written to the client."""
+    
+    encoding = 'utf-8'
+    
+    def __init__(self, stream, key: str):
+        self._stream = stream
+        self._key = key
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, text: str) -> int:
+        # Refusing bytes keeps click from treating this as a binary stream
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        if text:
+            _send(self._stream, {self._key: text})
+        return len(text)
+
+
+class _RelayReader(io.TextIOBase):
+    """Text stream that reads lines from the client's stdin, e.g. for input()."""
+    
+    encoding = 'utf-8'
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readline(self, size: int = -1) -> str:
+        _send(self._stream, {'input': True})
+        reply = _receive(self._stream)
+        return (reply or {}).get('line', '')
+
+
+class _CommandStream(io.TextIOBase):
+    """
+    Stand-in for sys.stdout/stderr/stdin while a command runs.
+    
+    Reads and writes from the running command's thread, and from threads
+    it starts, go to the command's relay. Other threads, e.g. the token
+    refresher, keep using the daemon's own stream.
+    """
+    
+    def __init__(self, default):
+        self.default = default
+        self._target = None
+        self._outside: frozenset = frozenset()
+    
+    @property
+    def encoding(self) -> str:
+        return getattr(self._stream(), 'encoding', 'utf-8')
+    
+    def route(self, target) -> None:
+        """Send the calling thread's I/O to target; None to stop."""
+        if target is not None:
+            # Threads already running belong to the daemon, not the command
+            self._outside = frozenset(threading.enumerate()) - {threading.current_thread()}
+        self._target = target
+    
+    def _stream(self):
+        target = self._target
+        if target is not None and threading.current_thread() not in self._outside:
+            return target
+        return self.default
+    
+    def readable(self) -> bool:
+        return True
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, text: str) -> int:
+        return self._stream().write(text)
+    
+    def flush(self) -> None:
+        self._stream().flush()
+    
+    def readline(self, size: int = -1) -> str:
+        return self._stream().readline(size)
+
+
+class DriveDaemon:
+    """
+    Unix socket server that runs CLI commands with one authenticated handle.
+    Server Unix socket chạy lệnh CLI bằng một GoogleDrive handle dùng chung.
+    
+    Example:
+        >>> daemon = DriveDaemon(quick_connect())
+        >>> daemon.serve_forever()  # until a {'op': 'stop'} message
+    """
+    
+    def __init__(self, drive, socket_path: Optional[str] = None):
+        """
+        Args:
+            drive: Authenticated GoogleDrive instance
+            socket_path: Socket path (default: default_socket_path())
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("The daemon needs Unix domain sockets, which this platform lacks")
+        
+        self.drive = drive
+        self.socket_path = socket_path or default_socket_path()
+        self.started_at = time.time()
+        self.commands = 0
+        self._running = False
+        self._sock: Optional[socket.socket] = None
+        # Commands chdir into the caller's directory, so run one at a time
+        self._run_lock = threading.Lock()
+    
+    def bind(self) -> None:
+        """Create the socket, usable by the current user only."""
+        if os.path.exists(self.socket_path):
+            if request({'op': 'status'}, self.socket_path) is not None:
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            # Left behind by a daemon that didn't shut down cleanly
+            os.unlink(self.socket_path)
+        
+        import tempfile
+        
+        directory = os.path.dirname(os.path.abspath(self.socket_path))
+        os.makedirs(directory, exist_ok=True)
+        
+        # bind() creates the socket with the umask's mode, so create it inside
+        # a 0700 directory and only move it into place once it is 0600
+        private_dir = tempfile.mkdtemp(prefix='.gdrive-', dir=directory)
+        private_path = os.path.join(private_dir, 's')
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(private_path)
+            os.chmod(private_path, 0o600)
+            os.replace(private_path, self.socket_path)
+        except BaseException:
+            sock.close()
+            if os.path.exists(private_path):
+                os.unlink(private_path)
+            raise
+        finally:
+            os.rmdir(private_dir)
+        
+        sock.listen(16)
+        self._sock = sock
+    
+    def serve_forever(self) -> None:
+        """Handle each connection in its own thread until stopped."""
+        if self._sock is None:
+            self.bind()
+        
+        self._running = True
+        try:
+            while self._running:
+                conn, _ = self._sock.accept()
+                if not self._running:
+                    conn.close()
+                    break
+                threading.Thread(target=self._serve_connection, args=(conn,),
+                                 name='gdrive-daemon-connection', daemon=True).start()
+        finally:
+            self._sock.close()
+            self._sock = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+    
+    def _serve_connection(self, conn: socket.socket) -> None:
+        with conn, conn.makefile('rwb') as stream:
+            try:
+                self._handle(stream)
+            except (OSError, ValueError):
+                # Client went away mid-command
+                pass
+    
+    def status(self) -> Dict[str, Any]:
+        """Describe the running daemon."""
+        from .cache import get_metadata_cache
+        
+        cache = get_metadata_cache()
+        return {
+            'pid': os.getpid(),
+            'socket': self.socket_path,
+            'uptime': time.time() - self.started_at,
+            'commands': self.commands,
+            'metadata_cache': cache.stats() if cache is not None else None,
+        }
+    
+    def _handle(self, stream) -> None:
+        message = _receive(stream)
+        if message is None:
+            return
+        
+        op = message.get('op')
+        if op == 'run':
+            if not self._run_lock.acquire(blocking=False):
+                # Busy: the client runs the command itself
+                _send(stream, {'busy': True})
+                return
+            try:
+                _send(stream, {'started': True})
+                code = self._run(message['argv'], message.get('cwd'), stream)
+            finally:
+                self._run_lock.release()
+            _send(stream, {'exit': code})
+        elif op == 'status':
+            _send(stream, self.status())
+        elif op == 'stop':
+            self._running = False
+            _send(stream, {'stopped': True})
+            # Wake up the accept() in serve_forever()
+            sock = _open_connection(self.socket_path)
+            if sock is not None:
+                sock.close()
+        else:
+            _send(stream, {'error': f"Unknown op: {op!r}"})
+    
+    def _run(self, argv: List[str], cwd: Optional[str], stream) -> int:
+        """Run one CLI command with output and stdin relayed over stream."""
+        import click
+        from .cli import cli
+        
+        self.commands += 1
+        previous_cwd = os.getcwd()
+        relays = {
+            'stdin': _RelayReader(stream),
+            'stdout': _RelayWriter(stream, 'out'),
+            'stderr': _RelayWriter(stream, 'err'),
+        }
+        streams = {name: _CommandStream(getattr(sys, name)) for name in relays}
+        
+        try:
+            if cwd:
+                os.chdir(cwd)
+            # Only this command's threads are relayed; see _CommandStream
+            for name, command_stream in streams.items():
+                command_stream.route(relays[name])
+                setattr(sys, name, command_stream)
+            try:
+                cli.main(args=argv, prog_name='gdrive-toolkit', obj={'drive': self.drive},
+                         standalone_mode=False)
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else 1
+            except click.exceptions.Abort:
+                click.echo("Aborted!", err=True)
+                return 1
+            except click.exceptions.ClickException as e:
+                e.show()
+                return e.exit_code
+            except Exception as e:
+                click.echo(f"\n❌ Error: {e}", err=True)
+                return 1
+            return 0
+        finally:
+            for name, command_stream in streams.items():
+                command_stream.route(None)
+                if getattr(sys, name) is command_stream:
+                    setattr(sys, name, command_stream.default)
+            os.chdir(previous_cwd)
@@ -3,8 +3,12 @@ Folder operations module for Google Drive.
 Các thao tác với thư mục trên Google Drive.
 """
 
-from typing import Optional, List, Dict, Any
-from pydrive2.drive import GoogleDrive
+from __future__ import annotations
+
+from typing import Optional, List, Dict, Any, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydrive2.drive import GoogleDrive
 
 
 def create_folder(
@@ -40,11 +44,65 @@ def create_folder(
     folder.Upload()
     
     folder_id = folder['id']
+    _remember_created_folder(parent_id, folder_name, folder_id)
     print(f"✓ Created folder '{folder_name}' (ID: {folder_id})")
     
     return folder_id
 
 
+def _remember_created_folder(
+    parent_id: Optional[str],
+    folder_name: str,
+    folder_id: str
+) -> None:
+    """Record a new folder in the folder cache; it starts out empty."""
+    from .cache import get_folder_cache
+    
+    cache = get_folder_cache()
+    if cache is None:
+        return
+    
+    for parent in {parent_id, parent_id or 'root'}:
+        cache.put(parent, folder_name, folder_id)
+    cache.prefill(folder_id, [])
+
+
+def prefill_folder_cache(
+    drive: GoogleDrive,
+    parent_id: str = 'root'
+) -> int:
+    """
+    Load every subfolder of a parent into the folder cache with one listing.
+    Nạp toàn bộ folder con vào cache bằng một lần liệt kê.
+    
+    Afterwards get_folder_id_by_name() and create_folder_path() answer
+    lookups in this parent without a request, including "not found".
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        parent_id: Parent folder ID (default: "root")
+    
+    Returns:
+        int: Number of subfolders found
+        
+    Example:
+        >>> prefill_folder_cache(drive, projects_id)
+        >>> for run in runs:
+        ...     create_folder_path(drive, f"{run}/logs", parent_id=projects_id)
+    """
+    from .cache import get_folder_cache
+    
+    folders = [
+        (f['title'], f['id'])
+        for f in iter_list_folders(drive, parent_id, page_size=1000, fields='minimal')
+    ]
+    
+    cache = get_folder_cache()
+    if cache is not None:
+        cache.prefill(parent_id, folders)
+    return len(folders)
+
+
 def share_file(
     drive: GoogleDrive,
     file_id: str,
@@ -79,9 +137,10 @@ def share_file(
             f"Must be one of: {', '.join(valid_permissions)}"
         )
     
+    from .operations import _fetch_file, _invalidate_metadata
+    
     # Get file
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    gfile = _fetch_file(drive, file_id)
     
     # Set permissions
     permission_data = {
@@ -92,6 +151,7 @@ def share_file(
     
     # Insert permission
     gfile.InsertPermission(permission_data)
+    _invalidate_metadata(file_id)
     
     # Get shareable link
     link = gfile['alternateLink']
@@ -103,19 +163,111 @@ def share_file(
     return link
 
 
+def share_files(
+    drive: GoogleDrive,
+    file_ids: List[str],
+    permission: str = "reader",
+    share_type: str = "anyone",
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    Share many files or folders with batched requests.
+    Chia sẻ nhiều file/folder bằng batch request.
+    
+    Each file's permission insert and link lookup go into the same batch,
+    so 100 files cost about two HTTP round trips instead of 200.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_ids: IDs of files/folders to share
+        permission: Permission level - "reader", "writer", "commenter" (default: "reader")
+        share_type: Who can access - "anyone", "user", "group", "domain" (default: "anyone")
+        verbose: Print a summary (default: True)
+    
+    Returns:
+        Dict: {file_id: shareable link, or the Exception raised for that ID}
+    
+    Example:
+        >>> links = share_files(drive, file_ids)
+        >>> for file_id, link in links.items():
+        ...     print(file_id, link)
+    """
+    valid_permissions = ["reader", "writer", "commenter"]
+    if permission not in valid_permissions:
+        raise ValueError(
+            f"Invalid permission: {permission}. "
+            f"Must be one of: {', '.join(valid_permissions)}"
+        )
+    
+    from .batch import BatchExecutor
+    from .operations import _invalidate_metadata
+    
+    file_ids = list(dict.fromkeys(file_ids))
+    executor = BatchExecutor(drive)
+    
+    for file_id in file_ids:
+        executor.add(
+            executor.service.permissions().insert(
+                fileId=file_id,
+                body={'type': share_type, 'role': permission, 'withLink': True},
+                supportsAllDrives=True
+            ),
+            key=(file_id, 'permission')
+        )
+        executor.add(
+            executor.service.files().get(
+                fileId=file_id, fields='alternateLink', supportsAllDrives=True
+            ),
+            key=(file_id, 'link')
+        )
+    
+    responses = executor.execute()
+    results: Dict[str, Any] = {}
+    
+    for file_id in file_ids:
+        inserted = responses[(file_id, 'permission')]
+        link = responses[(file_id, 'link')]
+        
+        if isinstance(inserted, Exception):
+            results[file_id] = inserted
+        elif isinstance(link, Exception):
+            results[file_id] = link
+        else:
+            results[file_id] = link['alternateLink']
+        
+        if not isinstance(inserted, Exception):
+            _invalidate_metadata(file_id)
+    
+    if verbose:
+        shared = sum(1 for r in results.values() if not isinstance(r, Exception))
+        print(f"✓ Shared {shared}/{len(file_ids)} files with {permission} access")
+        for file_id, result in results.items():
+            if isinstance(result, Exception):
+                print(f"  ✗ {file_id}: {result}")
+    
+    return results
+
+
 def get_folder_id_by_name(
     drive: GoogleDrive,
     folder_name: str,
-    parent_id: Optional[str] = None
+    parent_id: Optional[str] = None,
+    use_cache: bool = True,
+    index: Optional[Any] = None
 ) -> Optional[str]:
     """
     Find folder ID by name.
     Tìm ID của folder theo tên.
     
+    Results are kept in the session folder cache (see FolderCache), so
+    repeat lookups of the same name in the same parent make no request.
+    
     Args:
         drive: Authenticated GoogleDrive instance
         folder_name: Name of the folder to find
         parent_id: ID of parent folder to search in (None for root)
+        use_cache: Use the folder cache (default: True)
+        index: DriveIndex to answer from instead of the API (default: None)
     
     Returns:
         Optional[str]: Folder ID if found, None otherwise
@@ -123,6 +275,17 @@ def get_folder_id_by_name(
     Example:
         >>> folder_id = get_folder_id_by_name(drive, "My Folder")
     """
+    from .cache import get_folder_cache
+    
+    if index is not None:
+        return index.folder_id(folder_name, parent_id)
+    
+    cache = get_folder_cache() if use_cache else None
+    if cache is not None:
+        known, folder_id = cache.get(parent_id, folder_name)
+        if known:
+            return folder_id
+    
     query_parts = [
         f"title = '{folder_name}'",
         "mimeType = 'application/vnd.google-apps.folder'",
@@ -134,30 +297,39 @@ def get_folder_id_by_name(
     
     query = " and ".join(query_parts)
     
-    folder_list = drive.ListFile({'q': query}).GetList()
+    folder_list = drive.ListFile({'q': query, 'fields': 'nextPageToken,items(id)'}).GetList()
     
-    if not folder_list:
-        return None
+    folder_id = folder_list[0]['id'] if folder_list else None
+    if cache is not None:
+        cache.put(parent_id, folder_name, folder_id)
     
     if len(folder_list) > 1:
         print(f"⚠ Found {len(folder_list)} folders named '{folder_name}', returning first")
     
-    return folder_list[0]['id']
+    return folder_id
 
 
 def create_folder_path(
     drive: GoogleDrive,
     path: str,
-    parent_id: Optional[str] = None
+    parent_id: Optional[str] = None,
+    prefill: bool = False
 ) -> Optional[str]:
     """
     Create a folder path (like mkdir -p).
     Tạo đường dẫn thư mục (giống mkdir -p).
     
+    Existing folders are looked up through the folder cache, and folders
+    created here are known to be empty, so creating many paths under a
+    shared prefix costs about one request per new folder.
+    
     Args:
         drive: Authenticated GoogleDrive instance
         path: Folder path to create (e.g., "Folder1/Folder2/Folder3")
         parent_id: ID of parent folder (None for root)
+        prefill: List each existing parent's subfolders once instead of
+                 querying name by name (default: False). Worth it when
+                 many paths share parents with many subfolders.
     
     Returns:
         str: ID of the final folder in the path
@@ -165,14 +337,22 @@ def create_folder_path(
     Example:
         >>> folder_id = create_folder_path(drive, "Projects/2025/Data")
     """
+    from .cache import get_folder_cache
+    
     folder_names = path.split('/')
     current_parent_id = parent_id
+    cache = get_folder_cache()
     
     for folder_name in folder_names:
         folder_name = folder_name.strip()
         if not folder_name:
             continue
         
+        if prefill and cache is not None and current_parent_id is not None:
+            known, _ = cache.get(current_parent_id, folder_name)
+            if not known:
+                prefill_folder_cache(drive, current_parent_id)
+        
         # Check if folder already exists
         existing_id = get_folder_id_by_name(
             drive, folder_name, current_parent_id
@@ -190,28 +370,34 @@ def create_folder_path(
     return current_parent_id
 
 
-def list_folders(
+def iter_list_folders(
     drive: GoogleDrive,
     parent_id: Optional[str] = None,
-    max_results: int = 100
-) -> List[Dict[str, Any]]:
+    page_size: int = 100,
+    max_results: Optional[int] = None,
+    fields: Optional[str] = 'folder'
+) -> Iterator[Dict[str, Any]]:
     """
-    List all folders in a location.
-    Liệt kê tất cả thư mục.
+    List folders lazily, one page at a time.
+    Liệt kê thư mục theo từng trang.
     
     Args:
         drive: Authenticated GoogleDrive instance
         parent_id: ID of parent folder (None for root)
-        max_results: Maximum number of results
+        page_size: Results per request (default: 100, max: 1000)
+        max_results: Stop after this many results (default: None, all)
+        fields: Fields to request: a FIELD_PRESETS name, a comma-separated
+            field list, or 'full' (default: 'folder')
     
-    Returns:
-        List[Dict]: List of folder metadata
+    Yields:
+        Dict: Folder metadata, as returned by list_folders()
         
     Example:
-        >>> folders = list_folders(drive)
-        >>> for folder in folders:
+        >>> for folder in iter_list_folders(drive, page_size=1000):
         ...     print(folder['title'], folder['id'])
     """
+    from .operations import _iter_pages
+    
     query_parts = [
         "mimeType = 'application/vnd.google-apps.folder'",
         "trashed = false"
@@ -222,26 +408,58 @@ def list_folders(
     
     query = " and ".join(query_parts)
     
-    folder_list = drive.ListFile({
-        'q': query,
-        'maxResults': max_results
-    }).GetList()
-    
-    results = []
-    for folder in folder_list:
-        results.append({
+    for folder in _iter_pages(drive, {'q': query}, page_size, max_results, fields):
+        yield {
             'id': folder['id'],
-            'title': folder['title'],
+            'title': folder.get('title', 'N/A'),
             'createdDate': folder.get('createdDate', 'N/A'),
             'modifiedDate': folder.get('modifiedDate', 'N/A'),
             'webViewLink': folder.get('webViewLink', None),
-        })
+        }
+
+
+def list_folders(
+    drive: GoogleDrive,
+    parent_id: Optional[str] = None,
+    max_results: int = 100,
+    fields: Optional[str] = 'folder'
+) -> List[Dict[str, Any]]:
+    """
+    List all folders in a location.
+    Liệt kê tất cả thư mục.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        parent_id: ID of parent folder (None for root)
+        max_results: Maximum number of results
+        fields: Fields to request (see iter_list_folders)
+    
+    Returns:
+        List[Dict]: List of folder metadata
+        
+    Example:
+        >>> folders = list_folders(drive)
+        >>> for folder in folders:
+        ...     print(folder['title'], folder['id'])
+    """
+    results = list(iter_list_folders(
+        drive, parent_id, page_size=max_results, max_results=max_results, fields=fields
+    ))
     
     print(f"✓ Found {len(results)} folder(s)")
     
     return results
 
 
+def _forget_folder(folder_id: str) -> None:
+    """Drop a deleted or moved folder from the folder cache."""
+    from .cache import get_folder_cache
+    
+    cache = get_folder_cache()
+    if cache is not None:
+        cache.invalidate(folder_id)
+
+
 def delete_folder(
     drive: GoogleDrive,
     folder_id: Optional[str] = None,
@@ -270,16 +488,16 @@ def delete_folder(
     if folder_id is None and folder_name is None:
         raise ValueError("Either folder_id or folder_name must be provided")
     
+    from .operations import _fetch_file, _invalidate_metadata
+    
     # Get folder
     if folder_id:
-        folder = drive.CreateFile({'id': folder_id})
-        folder.FetchMetadata()
+        folder = _fetch_file(drive, folder_id)
     else:
         folder_id = get_folder_id_by_name(drive, folder_name)  # type: ignore
         if not folder_id:
             raise FileNotFoundError(f"Folder not found: {folder_name}")
-        folder = drive.CreateFile({'id': folder_id})
-        folder.FetchMetadata()
+        folder = _fetch_file(drive, folder_id)
     
     title = folder['title']
     fid = folder['id']
@@ -295,6 +513,8 @@ def delete_folder(
     
     # Delete folder
     folder.Delete()
+    _invalidate_metadata(fid)
+    _forget_folder(fid)
     
     print(f"✓ Deleted folder '{title}' (ID: {fid})")
     
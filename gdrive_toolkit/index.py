@@ -0,0 +1,663 @@
+"""
+Local SQLite index of the Drive file tree.
+Chỉ mục (index) SQLite của cây file trên Google Drive.
+
+A full crawl stores id, parents, title, MIME type, size, MD5 and modified
+time of every item below a folder, so name, path, prefix and size
+queries run offline in milliseconds. The index records when it was built
+so callers can decide whether it is fresh enough.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional, List, Dict, Any, Iterable, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydrive2.drive import GoogleDrive
+
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+INDEX_FIELDS = 'id,title,mimeType,fileSize,md5Checksum,modifiedDate,parents(id)'
+
+CHANGE_FIELDS = (
+    'nextPageToken,newStartPageToken,'
+    f'items(fileId,deleted,file({INDEX_FIELDS},labels(trashed)))'
+)
+
+# Item columns; parents are folded into a comma-separated list in order
+ITEM_COLUMNS = (
+    "f.id, f.title, f.mime_type, f.size, f.md5, f.modified, "
+    "(SELECT group_concat(parent_id) FROM "
+    "(SELECT parent_id FROM parents WHERE id = f.id ORDER BY position))"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    mime_type TEXT,
+    size INTEGER,
+    md5 TEXT,
+    modified TEXT
+);
+CREATE TABLE IF NOT EXISTS parents (
+    id TEXT NOT NULL,
+    parent_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (id, parent_id)
+);
+CREATE INDEX IF NOT EXISTS files_title ON files (title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS files_size ON files (size);
+CREATE INDEX IF NOT EXISTS parents_parent ON parents (parent_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _like_escape(text: str) -> str:
+    """Escape LIKE wildcards so user text matches literally."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _start_page_token(drive: GoogleDrive) -> str:
+    """Get the Changes feed position of "now"."""
+    if drive.auth.service is None:
+        drive.auth.Authorize()
+    
+    response = drive.auth.service.changes().getStartPageToken(
+        supportsAllDrives=True
+    ).execute(http=drive.auth.http)
+    return response['startPageToken']
+
+
+def _list_changes(drive: GoogleDrive, page_token: str) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Read every change after a page token.
+    
+    Returns:
+        Tuple: (changes in order, page token to resume from next time)
+    """
+    if drive.auth.service is None:
+        drive.auth.Authorize()
+    
+    changes: List[Dict[str, Any]] = []
+    while True:
+        response = drive.auth.service.changes().list(
+            pageToken=page_token,
+            maxResults=1000,
+            includeDeleted=True,
+            supportsAllDrives=True,
+            fields=CHANGE_FIELDS
+        ).execute(http=drive.auth.http)
+        
+        changes.extend(response.get('items', []))
+        if 'newStartPageToken' in response:
+            return changes, response['newStartPageToken']
+        page_token = response['nextPageToken']
+
+
+class DriveIndex:
+    """
+    SQLite index of a Drive folder tree.
+    Chỉ mục SQLite của cây thư mục Drive.
+    
+    Example:
+        >>> index = DriveIndex()
+        >>> index.build(drive)                       # full crawl of My Drive
+        >>> index.search(name_contains="report")     # offline
+        >>> index.folder_id("2025", parent_id=index.resolve_path("Projects"))
+        >>> index.folder_stats(index.resolve_path("Projects"))
+        >>> search_files(drive, file_name="report", index=index)
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (or create) an index.
+        
+        Args:
+            db_path: SQLite file path (default: <cache dir>/index.sqlite)
+        """
+        from .cache import default_cache_dir
+        
+        if db_path is None:
+            db_path = os.path.join(default_cache_dir(), 'index.sqlite')
+        
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+    
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, key: str, value: Any) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, None if value is None else str(value))
+        )
+    
+    @property
+    def root_id(self) -> Optional[str]:
+        """ID of the indexed root folder, or None if never built."""
+        return self._get_meta('root_id')
+    
+    @property
+    def built_at(self) -> Optional[float]:
+        """Unix time of the last full crawl, or None if never built."""
+        value = self._get_meta('built_at')
+        return float(value) if value else None
+    
+    @property
+    def updated_at(self) -> Optional[float]:
+        """Unix time of the last full crawl or incremental update."""
+        value = self._get_meta('updated_at')
+        return float(value) if value else None
+    
+    def age(self) -> Optional[float]:
+        """
+        Get how old the index is.
+        
+        Returns:
+            Optional[float]: Seconds since the last crawl or update, or None if never built
+        """
+        updated_at = self.updated_at
+        return time.time() - updated_at if updated_at else None
+    
+    def info(self) -> Dict[str, Any]:
+        """
+        Summarize the index.
+        
+        Returns:
+            Dict: {'root_id', 'files', 'folders', 'built_at', 'updated_at', 'age'}
+        """
+        with self._lock:
+            folders, total = self._conn.execute(
+                "SELECT COALESCE(SUM(mime_type = ?), 0), COUNT(*) FROM files WHERE id != ?",
+                (FOLDER_MIME, self.root_id or '')
+            ).fetchone()
+        return {
+            'root_id': self.root_id,
+            'files': total - folders,
+            'folders': folders,
+            'built_at': self.built_at,
+            'updated_at': self.updated_at,
+            'age': self.age(),
+        }
+    
+    def _insert(self, items: Iterable[Dict[str, Any]], suffix: str = '') -> None:
+        """Insert or replace items (Drive resources with INDEX_FIELDS)."""
+        file_rows = []
+        parent_rows = []
+        for item in items:
+            size = item.get('fileSize')
+            file_rows.append((
+                item['id'], item.get('title', ''), item.get('mimeType'),
+                int(size) if size else None, item.get('md5Checksum'), item.get('modifiedDate')
+            ))
+            for position, parent in enumerate(item.get('parents') or []):
+                parent_rows.append((item['id'], parent['id'], position))
+        
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO files{suffix} (id, title, mime_type, size, md5, modified) "
+                "VALUES (?, ?, ?, ?, ?, ?)", file_rows
+            )
+            self._conn.executemany(
+                f"DELETE FROM parents{suffix} WHERE id = ?", [(row[0],) for row in file_rows]
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO parents{suffix} (id, parent_id, position) VALUES (?, ?, ?)",
+                parent_rows
+            )
+    
+    def build(
+        self,
+        drive: GoogleDrive,
+        folder_id: str = 'root',
+        max_workers: int = 4,
+        verbose: bool = True
+    ) -> int:
+        """
+        Rebuild the index with a full crawl below a folder.
+        Xây dựng lại index bằng cách duyệt toàn bộ cây thư mục.
+        
+        The previous contents stay readable until the crawl has finished
+        and the new contents are committed.
+        
+        Args:
+            drive: Authenticated GoogleDrive instance
+            folder_id: Folder to index (default: "root", all of My Drive)
+            max_workers: Concurrent listing queries (default: 4)
+            verbose: Print progress (default: True)
+        
+        Returns:
+            int: Number of indexed items (excluding the root folder)
+        """
+        from .operations import _fetch_file
+        from .walk import walk_tree
+        
+        started = time.time()
+        root = _fetch_file(drive, folder_id)
+        # Taken before the crawl so changes made during it are replayed by update()
+        page_token = _start_page_token(drive)
+        root_item = {
+            'id': root['id'],
+            'title': 'My Drive' if folder_id == 'root' else root.get('title', ''),
+            'mimeType': FOLDER_MIME,
+        }
+        
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        
+        # Crawl into staging tables, then swap them in with one transaction
+        with self._lock:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS files_build; DROP TABLE IF EXISTS parents_build;"
+                "CREATE TABLE files_build AS SELECT * FROM files WHERE 0;"
+                "CREATE TABLE parents_build AS SELECT * FROM parents WHERE 0;"
+            )
+        
+        try:
+            self._insert([root_item], '_build')
+            
+            for item in walk_tree(drive, root['id'], fields=INDEX_FIELDS, max_workers=max_workers):
+                batch.append(item)
+                count += 1
+                if len(batch) >= 1000:
+                    self._insert(batch, '_build')
+                    batch = []
+                    if verbose:
+                        print(f"  Indexed {count:,} items...")
+            self._insert(batch, '_build')
+            
+            with self._lock:
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute("DELETE FROM parents")
+                self._conn.execute("INSERT INTO files SELECT * FROM files_build")
+                self._conn.execute("INSERT INTO parents SELECT * FROM parents_build")
+                self._set_meta('root_id', root['id'])
+                self._set_meta('page_token', page_token)
+                self._set_meta('built_at', started)
+                self._set_meta('updated_at', started)
+                self._conn.commit()
+        except BaseException:
+            with self._lock:
+                self._conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS files_build; DROP TABLE IF EXISTS parents_build;"
+                )
+        
+        if verbose:
+            print(f"✓ Indexed {count:,} items in {time.time() - started:.1f}s")
+        
+        return count
+    
+    def _remove_subtrees(self, item_ids: List[str]) -> int:
+        """Delete items and everything below them; returns the number removed."""
+        removed = 0
+        for item_id in item_ids:
+            ids = [(row[0],) for row in self._conn.execute(
+                self._descendants_sql() + "SELECT id FROM files WHERE id IN tree", (item_id,)
+            )]
+            self._conn.executemany("DELETE FROM files WHERE id = ?", ids)
+            self._conn.executemany("DELETE FROM parents WHERE id = ?", ids)
+            removed += len(ids)
+        return removed
+    
+    def update(
+        self,
+        drive: GoogleDrive,
+        max_age: Optional[float] = None,
+        max_workers: int = 4,
+        verbose: bool = True
+    ) -> Dict[str, int]:
+        """
+        Apply changes since the last build or update from the Changes feed.
+        Cập nhật index theo các thay đổi kể từ lần đồng bộ trước.
+        
+        Created, modified, trashed, deleted and moved items are applied in
+        one transaction, usually in a request or two. Folders that move
+        into the indexed tree are crawled, and items that leave it
+        (including everything below them) are removed.
+        
+        Args:
+            drive: Authenticated GoogleDrive instance
+            max_age: Skip the update if the index is younger than this many
+                     seconds (default: None, always update)
+            max_workers: Concurrent queries when crawling moved-in folders
+            verbose: Print a summary (default: True)
+        
+        Returns:
+            Dict: {'changes', 'updated', 'removed'} counts
+        
+        Raises:
+            RuntimeError: If the index has never been built
+        
+        Example:
+            >>> index.update(drive, max_age=60)  # at most once a minute
+        """
+        from .walk import walk_tree
+        
+        page_token = self._get_meta('page_token')
+        root_id = self.root_id
+        if not page_token or not root_id:
+            raise RuntimeError("Index has not been built; call build() first")
+        
+        stats = {'changes': 0, 'updated': 0, 'removed': 0}
+        age = self.age()
+        if max_age is not None and age is not None and age <= max_age:
+            return stats
+        
+        started = time.time()
+        changes, new_token = _list_changes(drive, page_token)
+        stats['changes'] = len(changes)
+        
+        # Keep the last change per item
+        latest: Dict[str, Dict[str, Any]] = {}
+        for change in changes:
+            latest[change['fileId']] = change
+        
+        with self._lock:
+            try:
+                gone = []
+                pending = {}
+                for file_id, change in latest.items():
+                    item = change.get('file')
+                    if change.get('deleted') or not item or item.get('labels', {}).get('trashed'):
+                        gone.append(file_id)
+                    else:
+                        pending[file_id] = item
+                
+                def known(file_id):
+                    return self._conn.execute(
+                        "SELECT 1 FROM files WHERE id = ?", (file_id,)
+                    ).fetchone() is not None
+                
+                # Insert items whose parent is indexed; repeat so new folders
+                # admit their new children regardless of change order
+                moved_in = []
+                progress = True
+                while pending and progress:
+                    progress = False
+                    for file_id, item in list(pending.items()):
+                        if any(known(p['id']) for p in item.get('parents') or []):
+                            if not known(file_id) and item.get('mimeType') == FOLDER_MIME:
+                                moved_in.append(file_id)
+                            self._insert([item])
+                            stats['updated'] += 1
+                            del pending[file_id]
+                            progress = True
+                
+                # Whatever is left now lives outside the tree
+                gone.extend(fid for fid in pending if known(fid))
+                stats['removed'] = self._remove_subtrees([fid for fid in gone if fid != root_id])
+                
+                # Folders new to the index may bring existing children with them
+                if moved_in:
+                    batch = list(walk_tree(drive, moved_in, fields=INDEX_FIELDS, max_workers=max_workers))
+                    self._insert(batch)
+                    stats['updated'] += len(batch)
+                
+                self._set_meta('page_token', new_token)
+                self._set_meta('updated_at', started)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        
+        if verbose:
+            print(f"✓ Index updated: {stats['changes']} change(s), "
+                  f"{stats['updated']} updated, {stats['removed']} removed")
+        
+        return stats
+    
+    def _resolve_parent(self, parent_id: Optional[str]) -> Optional[str]:
+        return self.root_id if parent_id == 'root' else parent_id
+    
+    def _query_items(self, sql: str, params: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Run a query selecting ITEM_COLUMNS and convert the rows to dicts."""
+        with self._lock:
+            rows = self._conn.execute(sql, list(params)).fetchall()
+        
+        return [{
+            'id': row[0],
+            'title': row[1],
+            'mimeType': row[2],
+            'fileSize': row[3],
+            'md5Checksum': row[4],
+            'modifiedDate': row[5],
+            'parents': row[6].split(',') if row[6] else [],
+        } for row in rows]
+    
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one indexed item.
+        
+        Args:
+            file_id: File or folder ID
+        
+        Returns:
+            Optional[Dict]: Item with 'id', 'title', 'mimeType', 'fileSize',
+            'md5Checksum', 'modifiedDate' and 'parents' (list of IDs), or None
+        """
+        items = self._query_items(
+            f"SELECT {ITEM_COLUMNS} FROM files f WHERE f.id = ?",
+            (self._resolve_parent(file_id),)
+        )
+        return items[0] if items else None
+    
+    def search(
+        self,
+        name: Optional[str] = None,
+        name_contains: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        folders: Optional[bool] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the index.
+        Tìm kiếm trong index.
+        
+        Name matching is case-insensitive. All given filters must match.
+        
+        Args:
+            name: Exact name
+            name_contains: Substring of the name
+            name_prefix: Start of the name
+            mime_type: Exact MIME type
+            parent_id: Direct parent folder ID ("root" for the index root)
+            min_size: Minimum size in bytes
+            max_size: Maximum size in bytes
+            folders: True for folders only, False for files only (default: both)
+            limit: Maximum results (largest first when size filters are given)
+        
+        Returns:
+            List[Dict]: Matching items (see get())
+        """
+        clauses = ["f.id != ?"]
+        params: List[Any] = [self.root_id or '']
+        
+        if name is not None:
+            clauses.append("f.title = ? COLLATE NOCASE")
+            params.append(name)
+        if name_contains is not None:
+            clauses.append("f.title LIKE ? ESCAPE '\\'")
+            params.append(f"%{_like_escape(name_contains)}%")
+        if name_prefix is not None:
+            clauses.append("f.title LIKE ? ESCAPE '\\'")
+            params.append(f"{_like_escape(name_prefix)}%")
+        if mime_type is not None:
+            clauses.append("f.mime_type = ?")
+            params.append(mime_type)
+        if parent_id is not None:
+            clauses.append("f.id IN (SELECT id FROM parents WHERE parent_id = ?)")
+            params.append(self._resolve_parent(parent_id))
+        if min_size is not None:
+            clauses.append("f.size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            clauses.append("f.size <= ?")
+            params.append(max_size)
+        if folders is not None:
+            clauses.append("f.mime_type = ?" if folders else "f.mime_type IS NOT ?")
+            params.append(FOLDER_MIME)
+        
+        sql = f"SELECT {ITEM_COLUMNS} FROM files f WHERE " + " AND ".join(clauses)
+        if min_size is not None or max_size is not None:
+            sql += " ORDER BY f.size DESC"
+        else:
+            sql += " ORDER BY f.title"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        
+        return self._query_items(sql, params)
+    
+    def folder_id(self, name: str, parent_id: Optional[str] = None) -> Optional[str]:
+        """
+        Find a folder ID by name, like get_folder_id_by_name().
+        
+        Args:
+            name: Folder name (exact)
+            parent_id: Parent folder ID (None for anywhere)
+        
+        Returns:
+            Optional[str]: First matching folder ID, or None
+        """
+        matches = self.search(name=name, parent_id=parent_id, folders=True, limit=1)
+        return matches[0]['id'] if matches else None
+    
+    def path(self, file_id: str) -> Optional[str]:
+        """
+        Get the path of an item, following first parents.
+        
+        Args:
+            file_id: File or folder ID
+        
+        Returns:
+            Optional[str]: Path starting with the root's title
+            (e.g. "My Drive/Projects/data.csv"), or None if not indexed
+        """
+        parts = []
+        current = self._resolve_parent(file_id)
+        seen = set()
+        
+        with self._lock:
+            while current and current not in seen:
+                seen.add(current)
+                row = self._conn.execute(
+                    "SELECT title FROM files WHERE id = ?", (current,)
+                ).fetchone()
+                if row is None:
+                    break
+                parts.append(row[0])
+                parent = self._conn.execute(
+                    "SELECT parent_id FROM parents WHERE id = ? ORDER BY position LIMIT 1",
+                    (current,)
+                ).fetchone()
+                current = parent[0] if parent else None
+        
+        return "/".join(reversed(parts)) if parts else None
+    
+    def resolve_path(self, path: str, parent_id: Optional[str] = None) -> Optional[str]:
+        """
+        Find the ID of the item at a path.
+        
+        Args:
+            path: Path relative to parent_id (e.g. "Projects/2025/data.csv")
+            parent_id: Starting folder (default: the index root)
+        
+        Returns:
+            Optional[str]: Item ID, or None if no such path is indexed
+        """
+        current = self._resolve_parent(parent_id) or self.root_id
+        
+        for part in path.strip('/').split('/'):
+            if not part or current is None:
+                continue
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT f.id FROM files f JOIN parents p ON p.id = f.id "
+                    "WHERE p.parent_id = ? AND f.title = ? ORDER BY f.modified DESC LIMIT 1",
+                    (current, part)
+                ).fetchone()
+            current = row[0] if row else None
+        
+        return current
+    
+    def _descendants_sql(self) -> str:
+        return (
+            "WITH RECURSIVE tree(id) AS ("
+            "SELECT ? UNION SELECT p.id FROM parents p JOIN tree t ON p.parent_id = t.id"
+            ") "
+        )
+    
+    def list_path(self, path: str) -> List[Dict[str, Any]]:
+        """
+        List everything below a folder path (a path-prefix query).
+        
+        Args:
+            path: Folder path relative to the index root (e.g. "Projects/2025")
+        
+        Returns:
+            List[Dict]: Items below the folder (see get()), each with a 'path' key
+        """
+        folder_id = self.resolve_path(path)
+        if folder_id is None:
+            return []
+        
+        items = self._query_items(
+            self._descendants_sql()
+            + f"SELECT {ITEM_COLUMNS} FROM files f JOIN tree USING (id) WHERE f.id != ?",
+            (folder_id, folder_id)
+        )
+        for item in items:
+            item['path'] = self.path(item['id'])
+        return items
+    
+    def folder_stats(self, folder_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Count size, files and folders below a folder, offline.
+        
+        Args:
+            folder_id: Folder ID (default: the index root)
+        
+        Returns:
+            Dict: {'size', 'files', 'folders'}, as from walk.folder_stats()
+        """
+        folder_id = self._resolve_parent(folder_id) or self.root_id
+        
+        with self._lock:
+            size, files, folders = self._conn.execute(
+                self._descendants_sql()
+                + "SELECT COALESCE(SUM(f.size), 0), "
+                "COALESCE(SUM(f.mime_type IS NOT ?), 0), COALESCE(SUM(f.mime_type = ?), 0) "
+                "FROM files f JOIN tree USING (id) WHERE f.id != ?",
+                (folder_id, FOLDER_MIME, FOLDER_MIME, folder_id)
+            ).fetchone()
+        
+        return {'size': size, 'files': files, 'folders': folders}
+    
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
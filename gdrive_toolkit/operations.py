@@ -3,11 +3,186 @@ File operations module for Google Drive.
 Các thao tác với file trên Google Drive.
 """
 
+from __future__ import annotations
+
 import os
+import re
 import time
-from typing import Optional, List, Dict, Any
-from pydrive2.drive import GoogleDrive
-from pydrive2.files import GoogleDriveFile
+import weakref
+import threading
+from typing import Optional, List, Dict, Any, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydrive2.drive import GoogleDrive
+    from pydrive2.files import GoogleDriveFile
+
+
+# Partial-response presets for listing calls. Values are comma-separated
+# Files fields; None requests the full resource.
+FIELD_PRESETS: Dict[str, Optional[str]] = {
+    'minimal': 'id,title',
+    'basic': 'id,title,mimeType,fileSize,modifiedDate',
+    'standard': 'id,title,mimeType,fileSize,createdDate,modifiedDate,downloadUrl,webViewLink',
+    'folder': 'id,title,createdDate,modifiedDate,webViewLink',
+    'sync': 'id,title,fileSize,md5Checksum,mimeType,modifiedDate',
+    'full': None,
+}
+
+
+def _list_fields(fields: Optional[str]) -> Optional[str]:
+    """
+    Build the Files.list `fields` parameter from a preset or field list.
+    
+    Args:
+        fields: Preset name (see FIELD_PRESETS), comma-separated file fields,
+            or a raw `fields` value containing `items(...)`
+    
+    Returns:
+        Optional[str]: Value for the `fields` parameter, or None for full resources
+    """
+    item_fields = FIELD_PRESETS[fields] if fields in FIELD_PRESETS else fields
+    if not item_fields or item_fields == '*' or 'items(' in item_fields:
+        return item_fields or None
+    
+    if not re.search(r'(^|,)\s*id\s*(,|$)', item_fields):
+        item_fields = 'id,' + item_fields
+    return f"nextPageToken,items({item_fields.replace(' ', '')})"
+
+
+def _list_folder_files(
+    drive: GoogleDrive,
+    folder_id: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    List the non-folder files directly inside a folder, keyed by title.
+    Liệt kê file trong folder theo tên.
+    
+    Only the fields needed for change detection are requested. If several
+    files share a title, the most recently modified one wins.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        folder_id: Folder ID (None for root)
+    
+    Returns:
+        Dict: {title: {'id', 'title', 'fileSize', 'md5Checksum', 'mimeType', 'modifiedDate'}}
+    """
+    query = (
+        f"'{folder_id or 'root'}' in parents and trashed = false "
+        "and mimeType != 'application/vnd.google-apps.folder'"
+    )
+    
+    file_list = drive.ListFile({
+        'q': query,
+        'orderBy': 'modifiedDate',
+        'fields': _list_fields('sync')
+    }).GetList()
+    
+    # Ordered by modifiedDate ascending, so later entries override earlier ones
+    return {f['title']: dict(f) for f in file_list}
+
+
+def _compare_with_remote(
+    file_path: str,
+    remote: Optional[Dict[str, Any]]
+) -> str:
+    """
+    Decide how to upload a local file given the remote file of the same name.
+    
+    Args:
+        file_path: Path to the local file
+        remote: Remote file metadata (from _list_folder_files) or None
+    
+    Returns:
+        str: 'create' (no remote file), 'skip' (same size and MD5) or
+        'update' (remote file exists but differs)
+    """
+    if remote is None:
+        return 'create'
+    
+    remote_size = remote.get('fileSize')
+    remote_md5 = remote.get('md5Checksum')
+    
+    # Google Docs have no size/MD5 and can't be compared
+    if remote_size is None or remote_md5 is None:
+        return 'update'
+    
+    if int(remote_size) != os.path.getsize(file_path):
+        return 'update'
+    
+    from .cache import get_hash_cache
+    return 'skip' if get_hash_cache().md5(file_path) == remote_md5 else 'update'
+
+
+def _fetch_file(drive: GoogleDrive, file_id: str) -> GoogleDriveFile:
+    """
+    Get a file with its metadata, using the metadata cache when possible.
+    
+    Equivalent to ``CreateFile({'id': file_id})`` followed by
+    ``FetchMetadata()``, except that a cached resource costs no request.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_id: Drive file ID
+    
+    Returns:
+        GoogleDriveFile: File with full metadata loaded
+    """
+    from .cache import get_metadata_cache
+    
+    cache = get_metadata_cache()
+    if cache is not None:
+        metadata = cache.get(file_id)
+        if metadata is not None:
+            from pydrive2.files import GoogleDriveFile
+            return GoogleDriveFile(auth=drive.auth, metadata=metadata, uploaded=True)
+    
+    gfile = drive.CreateFile({'id': file_id})
+    gfile.FetchMetadata()
+    
+    if cache is not None:
+        cache.put(file_id, gfile)
+    return gfile
+
+
+def _invalidate_metadata(*file_ids: str) -> None:
+    """Drop cached metadata for files changed through the toolkit."""
+    from .cache import get_metadata_cache
+    
+    cache = get_metadata_cache()
+    if cache is not None:
+        for file_id in file_ids:
+            cache.invalidate(file_id)
+
+
+def _is_unchanged_local(
+    local_path: str,
+    remote: Dict[str, Any]
+) -> bool:
+    """
+    Check whether a local file already matches a remote file.
+    
+    Compares size first, then the MD5 from the persistent hash cache, so
+    unchanged files are not re-hashed on every run.
+    
+    Args:
+        local_path: Path to the local copy
+        remote: Remote file metadata with 'fileSize' and 'md5Checksum'
+    
+    Returns:
+        bool: True if the local file has the same size and MD5
+    """
+    remote_size = remote.get('fileSize')
+    remote_md5 = remote.get('md5Checksum')
+    
+    if remote_size is None or remote_md5 is None or not os.path.isfile(local_path):
+        return False
+    
+    if int(remote_size) != os.path.getsize(local_path):
+        return False
+    
+    from .cache import get_hash_cache
+    return get_hash_cache().md5(local_path) == remote_md5
 
 
 def upload_file(
@@ -15,7 +190,9 @@ def upload_file(
     file_path: str,
     folder_id: Optional[str] = None,
     file_name: Optional[str] = None,
-    show_progress: bool = True
+    show_progress: bool = True,
+    if_changed: bool = False,
+    remote_files: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> str:
     """
     Upload a file to Google Drive.
@@ -27,13 +204,21 @@ def upload_file(
         folder_id: ID of the target folder (None for root)
         file_name: Custom name for uploaded file (None to use original name)
         show_progress: Show upload progress bar (default: True)
+        if_changed: If a file with the same name exists in the folder, skip
+                    the upload when size and MD5 match, otherwise update it
+                    in place instead of creating a duplicate (default: False)
+        remote_files: Pre-fetched folder listing {title: metadata} used by
+                      if_changed, to avoid listing the folder for every file
     
     Returns:
-        str: ID of the uploaded file
+        str: ID of the uploaded (or unchanged) file
         
     Example:
         >>> file_id = upload_file(drive, "data.csv")
         >>> print(f"Uploaded with ID: {file_id}")
+        >>> 
+        >>> # Nightly export: only send files whose content changed
+        >>> file_id = upload_file(drive, "data.csv", folder_id="xyz789", if_changed=True)
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
@@ -51,6 +236,22 @@ def upload_file(
     if folder_id:
         metadata['parents'] = [{'id': folder_id}]  # type: ignore
     
+    # Skip or update in place when a file with the same name exists
+    action = 'create'
+    if if_changed:
+        if remote_files is None:
+            remote_files = _list_folder_files(drive, folder_id)
+        
+        remote = remote_files.get(file_name)
+        action = _compare_with_remote(file_path, remote)
+        
+        if action == 'skip':
+            print(f"⏭ Skipped '{file_name}' (unchanged, ID: {remote['id']})")  # type: ignore
+            return remote['id']  # type: ignore
+        
+        if action == 'update':
+            metadata = {'id': remote['id'], 'mimeType': remote.get('mimeType')}  # type: ignore
+    
     # Create and upload file
     gfile = drive.CreateFile(metadata)
     gfile.SetContentFile(file_path)
@@ -73,14 +274,15 @@ def upload_file(
     
     file_id = gfile['id']
     
-    # Get file info to show location
-    gfile.FetchMetadata()
+    # Get file info to show location (and refresh the cached metadata)
+    _invalidate_metadata(file_id)
+    gfile = _fetch_file(drive, file_id)
     
     # Build Google Drive URL
     web_url = f"https://drive.google.com/file/d/{file_id}/view"
     
     # Show upload info
-    print(f"✓ Uploaded '{file_name}'")
+    print(f"✓ {'Updated' if action == 'update' else 'Uploaded'} '{file_name}'")
     print(f"  File ID: {file_id}")
     print(f"  View URL: {web_url}")
     
@@ -104,7 +306,9 @@ def download_file(
     file_name: Optional[str] = None,
     save_path: str = ".",
     query: Optional[str] = None,
-    show_progress: bool = True
+    show_progress: bool = True,
+    resume: bool = False,
+    skip_unchanged: bool = False
 ) -> str:
     """
     Download a file from Google Drive.
@@ -117,6 +321,11 @@ def download_file(
         save_path: Local path to save the file (directory or full path)
         query: Custom search query (advanced usage)
         show_progress: Show download progress (default: True)
+        resume: Download via '<file>.part' and continue an interrupted
+                download if the remote md5Checksum/modifiedDate still match
+                (default: False)
+        skip_unchanged: Skip the transfer if the destination already has the
+                        same size and MD5 as the remote file (default: False)
     
     Returns:
         str: Path to the downloaded file
@@ -130,8 +339,7 @@ def download_file(
     
     # Get file by ID or search by name/query
     if file_id:
-        gfile = drive.CreateFile({'id': file_id})
-        gfile.FetchMetadata()
+        gfile = _fetch_file(drive, file_id)
     else:
         # Search for file
         if query is None:
@@ -160,8 +368,18 @@ def download_file(
     # Create directory if needed
     os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
     
+    if skip_unchanged and _is_unchanged_local(output_path, gfile):
+        print(f"⏭ Skipped '{title}' (unchanged at '{output_path}')")
+        return output_path
+    
+    # Resume only applies to binary files (Google Docs have no fileSize)
+    if resume and int(gfile.get('fileSize', 0)) > 0:
+        from .client import _download_ranged
+        _download_ranged(drive, gfile, output_path, resume=True,
+                         show_progress=show_progress)
+    
     # Show progress for large files
-    if show_progress:
+    elif show_progress:
         file_size = int(gfile.get('fileSize', 0))
         
         if file_size > 1024 * 1024:  # Show progress for files > 1MB
@@ -199,13 +417,223 @@ def download_file(
     return output_path
 
 
+def _fetch_metadata_batch(
+    drive: GoogleDrive,
+    file_ids: List[str],
+    fields: Optional[str] = None,
+    batch_size: int = 100
+) -> Dict[str, Any]:
+    """
+    Fetch metadata for many files using batched HTTP requests.
+    Lấy metadata của nhiều file bằng batch request.
+    
+    Up to ``batch_size`` (max 100) files.get calls are packed into a
+    single multipart request, so N files cost about N/100 round trips.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_ids: File IDs to fetch (duplicates are fetched once, cached files not at all)
+        fields: Partial-response fields (None for the full resource)
+        batch_size: Calls per batch request (default: 100)
+    
+    Returns:
+        Dict: {file_id: metadata dict, or the Exception raised for that ID}
+    """
+    from .batch import BatchExecutor
+    from .cache import get_metadata_cache
+    
+    results: Dict[str, Any] = {}
+    
+    # Cached entries are full resources, so they satisfy any `fields`
+    cache = get_metadata_cache()
+    unique_ids = []
+    for file_id in dict.fromkeys(file_ids):
+        metadata = cache.get(file_id) if cache is not None else None
+        if metadata is not None:
+            results[file_id] = metadata
+        else:
+            unique_ids.append(file_id)
+    
+    if not unique_ids:
+        return results
+    
+    executor = BatchExecutor(drive, batch_size=batch_size)
+    for file_id in unique_ids:
+        executor.add(
+            executor.service.files().get(fileId=file_id, fields=fields, supportsAllDrives=True),
+            key=file_id
+        )
+    results.update(executor.execute())
+    
+    if cache is not None and fields is None:
+        for file_id in unique_ids:
+            if isinstance(results.get(file_id), dict):
+                cache.put(file_id, results[file_id])
+    
+    return results
+
+
+def _format_file(gfile: GoogleDriveFile) -> Dict[str, Any]:
+    """Convert a listed file into the dict returned by search_files()."""
+    return {
+        'id': gfile['id'],
+        'title': gfile.get('title', 'N/A'),
+        'mimeType': gfile.get('mimeType', 'unknown'),
+        'size': gfile.get('fileSize', 'N/A'),
+        'createdDate': gfile.get('createdDate', 'N/A'),
+        'modifiedDate': gfile.get('modifiedDate', 'N/A'),
+        'downloadUrl': gfile.get('downloadUrl', None),
+        'webViewLink': gfile.get('webViewLink', None),
+    }
+
+
+def _iter_pages(
+    drive: GoogleDrive,
+    params: Dict[str, Any],
+    page_size: int = 100,
+    max_results: Optional[int] = None,
+    fields: Optional[str] = None
+) -> Iterator[GoogleDriveFile]:
+    """
+    Yield listed files one page at a time, stopping after max_results.
+    
+    Each page is requested only when the previous one is exhausted, so
+    callers that stop early never fetch the remaining pages.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        params: Files.list parameters (q, orderBy, fields, ...)
+        page_size: Results per request (max 1000)
+        max_results: Stop after this many results (None for all)
+        fields: Preset name or field list passed to _list_fields()
+    
+    Yields:
+        GoogleDriveFile: Listed files in API order
+    """
+    if max_results is not None:
+        if max_results <= 0:
+            return
+        page_size = min(page_size, max_results)
+    
+    params = dict(params, maxResults=min(page_size, 1000))
+    list_fields = _list_fields(fields)
+    if list_fields:
+        params['fields'] = list_fields
+    count = 0
+    
+    for page in drive.ListFile(params):
+        for gfile in page:
+            yield gfile
+            count += 1
+            if max_results is not None and count >= max_results:
+                return
+
+
+def _build_search_query(
+    query: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    file_name: Optional[str] = None,
+    trashed: bool = False
+) -> Optional[str]:
+    """Combine search_files() filters into one Drive query string."""
+    query_parts = []
+    
+    if query:
+        query_parts.append(query)
+    
+    if folder_id:
+        query_parts.append(f"'{folder_id}' in parents")
+    
+    if file_name:
+        query_parts.append(f"title contains '{file_name}'")
+    
+    if not trashed:
+        query_parts.append("trashed = false")
+    
+    return " and ".join(query_parts) if query_parts else None
+
+
+def _search_index(
+    index: Any,
+    query: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    file_name: Optional[str] = None,
+    max_results: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """Answer a search_files() call from a DriveIndex."""
+    if query:
+        raise ValueError("Custom queries can't be answered from an index; use file_name/folder_id")
+    
+    for item in index.search(name_contains=file_name, parent_id=folder_id, limit=max_results):
+        item = {k: v for k, v in item.items() if v is not None}
+        if 'fileSize' in item:
+            item['fileSize'] = str(item['fileSize'])
+        yield _format_file(item)  # type: ignore
+
+
+def iter_search_files(
+    drive: GoogleDrive,
+    query: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    file_name: Optional[str] = None,
+    page_size: int = 100,
+    max_results: Optional[int] = None,
+    trashed: bool = False,
+    fields: Optional[str] = 'standard',
+    index: Optional[Any] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Search files lazily, fetching one page at a time.
+    Tìm kiếm file theo từng trang (lazy).
+    
+    Same filters and result dicts as search_files(), but results are
+    yielded as each page arrives instead of being collected in a list.
+    Memory stays flat however many files match, and breaking out of the
+    loop stops further requests.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        query: Custom search query (Google Drive query syntax)
+        folder_id: Search within specific folder
+        file_name: Search by file name (supports 'contains')
+        page_size: Results per request (default: 100, max: 1000)
+        max_results: Stop after this many results (default: None, all)
+        trashed: Include trashed files (default: False)
+        fields: Fields to request: a FIELD_PRESETS name, a comma-separated
+            field list, or 'full' (default: 'standard')
+        index: DriveIndex to answer from instead of the API (default: None).
+            Supports folder_id and file_name, not query.
+    
+    Yields:
+        Dict: File metadata dictionary
+        
+    Example:
+        >>> for f in iter_search_files(drive, folder_id="xyz789", page_size=1000):
+        ...     if f['title'].endswith('.csv'):
+        ...         break
+    """
+    if index is not None:
+        yield from _search_index(index, query, folder_id, file_name, max_results)
+        return
+    
+    params: Dict[str, Any] = {}
+    final_query = _build_search_query(query, folder_id, file_name, trashed)
+    if final_query:
+        params['q'] = final_query
+    
+    for gfile in _iter_pages(drive, params, page_size, max_results, fields):
+        yield _format_file(gfile)
+
+
 def search_files(
     drive: GoogleDrive,
     query: Optional[str] = None,
     folder_id: Optional[str] = None,
     file_name: Optional[str] = None,
     max_results: int = 100,
-    trashed: bool = False
+    trashed: bool = False,
+    fields: Optional[str] = 'standard',
+    index: Optional[Any] = None
 ) -> List[Dict[str, Any]]:
     """
     Search files in Google Drive.
@@ -218,6 +646,10 @@ def search_files(
         file_name: Search by file name (supports 'contains')
         max_results: Maximum number of results (default: 100)
         trashed: Include trashed files (default: False)
+        fields: Fields to request: a FIELD_PRESETS name, a comma-separated
+            field list, or 'full' (default: 'standard')
+        index: DriveIndex to answer from instead of the API (default: None).
+            Supports folder_id and file_name, not query.
     
     Returns:
         List[Dict]: List of file metadata dictionaries
@@ -231,44 +663,24 @@ def search_files(
         >>> 
         >>> # Custom query
         >>> files = search_files(drive, query="title contains 'data' and mimeType = 'text/csv'")
+        >>> 
+        >>> # Only IDs and names, for a smaller response
+        >>> files = search_files(drive, folder_id="folder_id_here", fields='minimal')
+        >>> 
+        >>> # Offline, from a local index
+        >>> files = search_files(drive, file_name="report", index=DriveIndex())
     """
-    # Build query
-    query_parts = []
-    
-    if query:
-        query_parts.append(query)
-    
-    if folder_id:
-        query_parts.append(f"'{folder_id}' in parents")
-    
-    if file_name:
-        query_parts.append(f"title contains '{file_name}'")
-    
-    if not trashed:
-        query_parts.append("trashed = false")
-    
-    final_query = " and ".join(query_parts) if query_parts else None
-    
-    # Execute search
-    params = {'maxResults': max_results}
-    if final_query:
-        params['q'] = final_query  # type: ignore
-    
-    file_list = drive.ListFile(params).GetList()
-    
-    # Format results
-    results = []
-    for gfile in file_list:
-        results.append({
-            'id': gfile['id'],
-            'title': gfile['title'],
-            'mimeType': gfile.get('mimeType', 'unknown'),
-            'size': gfile.get('fileSize', 'N/A'),
-            'createdDate': gfile.get('createdDate', 'N/A'),
-            'modifiedDate': gfile.get('modifiedDate', 'N/A'),
-            'downloadUrl': gfile.get('downloadUrl', None),
-            'webViewLink': gfile.get('webViewLink', None),
-        })
+    results = list(iter_search_files(
+        drive,
+        query=query,
+        folder_id=folder_id,
+        file_name=file_name,
+        page_size=max_results,
+        max_results=max_results,
+        trashed=trashed,
+        fields=fields,
+        index=index
+    ))
     
     print(f"✓ Found {len(results)} file(s)")
     
@@ -298,13 +710,14 @@ def delete_file(
         >>> delete_file(drive, file_id="abc123")
         >>> delete_file(drive, file_name="old_data.csv", confirm=False)
     """
+    from .folder import _forget_folder
+    
     if file_id is None and file_name is None:
         raise ValueError("Either file_id or file_name must be provided")
     
     # Get file
     if file_id:
-        gfile = drive.CreateFile({'id': file_id})
-        gfile.FetchMetadata()
+        gfile = _fetch_file(drive, file_id)
     else:
         # Search for file
         file_list = drive.ListFile({
@@ -332,6 +745,9 @@ def delete_file(
     
     # Delete file
     gfile.Delete()
+    _invalidate_metadata(fid)
+    # The ID may have been a folder's
+    _forget_folder(fid)
     
     print(f"✓ Deleted '{title}' (ID: {fid})")
     
@@ -359,8 +775,7 @@ def get_file_info(
         >>> info = get_file_info(drive, "abc123")
         >>> print(info['title'], info['fileSize'])
     """
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    gfile = _fetch_file(drive, file_id)
     
     info = dict(gfile)
     
@@ -385,62 +800,333 @@ def get_file_info(
     return info
 
 
+def get_files_info(
+    drive: GoogleDrive,
+    file_ids: List[str],
+    fields: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get information about many files with batched requests.
+    Lấy thông tin của nhiều file bằng batch request.
+    
+    Up to 100 lookups share one HTTP round trip, and files already in the
+    metadata cache cost no request.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_ids: File IDs
+        fields: Comma-separated fields to return (None for the full resource)
+    
+    Returns:
+        Dict: {file_id: metadata dict, or the Exception raised for that ID},
+        in input order
+    
+    Example:
+        >>> infos = get_files_info(drive, file_ids, fields="id,title,fileSize")
+        >>> missing = [fid for fid, info in infos.items() if isinstance(info, Exception)]
+    """
+    fetched = _fetch_metadata_batch(drive, file_ids, fields=fields)
+    return {
+        file_id: fetched[file_id] if isinstance(fetched[file_id], Exception)
+        else dict(fetched[file_id])
+        for file_id in dict.fromkeys(file_ids)
+    }
+
+
+def delete_files(
+    drive: GoogleDrive,
+    file_ids: List[str],
+    confirm: bool = True,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    Permanently delete many files or folders with batched requests.
+    Xóa nhiều file/folder bằng batch request.
+    
+    Up to 100 deletes share one HTTP round trip. Deletes that hit a rate
+    limit or a server error are retried on their own.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_ids: IDs of files or folders to delete
+        confirm: Ask once for confirmation before deleting (default: True)
+        verbose: Print a summary (default: True)
+    
+    Returns:
+        Dict: {file_id: True, or the Exception raised for that ID}; empty
+        if the deletion was cancelled
+    
+    Example:
+        >>> results = delete_files(drive, old_ids, confirm=False)
+        >>> failed = [fid for fid, ok in results.items() if ok is not True]
+    """
+    from .batch import BatchExecutor
+    from .folder import _forget_folder
+    
+    file_ids = list(dict.fromkeys(file_ids))
+    
+    if confirm:
+        response = input(f"Permanently delete {len(file_ids)} file(s)? [y/N]: ")
+        if response.lower() != 'y':
+            print("Deletion cancelled")
+            return {}
+    
+    executor = BatchExecutor(drive)
+    for file_id in file_ids:
+        executor.add(
+            executor.service.files().delete(fileId=file_id, supportsAllDrives=True),
+            key=file_id
+        )
+    
+    results = {}
+    for file_id, result in executor.execute().items():
+        if isinstance(result, Exception):
+            results[file_id] = result
+        else:
+            results[file_id] = True
+            _invalidate_metadata(file_id)
+            _forget_folder(file_id)
+    
+    if verbose:
+        deleted = sum(1 for r in results.values() if r is True)
+        print(f"✓ Deleted {deleted}/{len(file_ids)} files")
+        for file_id, result in results.items():
+            if result is not True:
+                print(f"  ✗ {file_id}: {result}")
+    
+    return results
+
+
+PATH_FIELDS = 'id,title,parents(id,isRoot)'
+
+
+class PathResolver:
+    """
+    Resolve file IDs to "My Drive/..." paths with memoized ancestors.
+    Tìm đường dẫn đầy đủ của file, ghi nhớ các thư mục cha.
+    
+    Ancestors are fetched one level at a time for all requested files
+    together, using batched requests, and each folder's path is computed
+    once and reused. Resolving many files in the same tree costs about
+    one batch request per tree level. Folder paths are forgotten after
+    ``ttl`` seconds.
+    
+    Files with several parents have one path per parent. The first
+    parent's path is the primary one.
+    
+    Example:
+        >>> resolver = PathResolver(drive)
+        >>> paths = resolver.resolve_many(["abc123", "def456"])
+        >>> resolver.resolve("abc123", all_parents=True)
+        ['My Drive/Data/file.csv', 'My Drive/Shared/file.csv']
+    """
+    
+    def __init__(self, drive: GoogleDrive, ttl: float = 300.0):
+        """
+        Args:
+            drive: Authenticated GoogleDrive instance
+            ttl: Seconds before memoized paths are refreshed (default: 300)
+        """
+        self.drive = drive
+        self.ttl = ttl
+        # id -> {'title', 'parents': [(parent_id, is_root)]}, or None if unreadable
+        self._nodes: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._paths: Dict[str, List[str]] = {}
+        self._loaded_at = time.monotonic()
+        self._lock = threading.RLock()
+    
+    def clear(self) -> None:
+        """Forget every memoized node and path."""
+        with self._lock:
+            self._nodes.clear()
+            self._paths.clear()
+            self._loaded_at = time.monotonic()
+    
+    def _load(self, file_ids: List[str], max_depth: int = 100) -> None:
+        """Fetch the given IDs and all their unknown ancestors, level by level."""
+        pending = [fid for fid in dict.fromkeys(file_ids) if fid not in self._nodes]
+        depth = 0
+        
+        while pending and depth <= max_depth:
+            fetched = _fetch_metadata_batch(self.drive, pending, fields=PATH_FIELDS)
+            next_level = []
+            
+            for fid in pending:
+                meta = fetched.get(fid)
+                if not isinstance(meta, dict):
+                    self._nodes[fid] = None
+                    continue
+                
+                parents = [(p['id'], bool(p.get('isRoot'))) for p in meta.get('parents', [])]
+                self._nodes[fid] = {'title': meta.get('title', fid), 'parents': parents}
+                next_level.extend(
+                    pid for pid, is_root in parents
+                    if not is_root and pid not in self._nodes
+                )
+            
+            pending = list(dict.fromkeys(next_level))
+            depth += 1
+    
+    def _resolve_node(self, node_id: str, depth: int = 0) -> List[str]:
+        """Get every path of a loaded node, memoized."""
+        if node_id in self._paths:
+            return self._paths[node_id]
+        
+        node = self._nodes.get(node_id)
+        if node is None:
+            # Unreadable ancestor: the path starts below it
+            return ['My Drive']
+        
+        title = node['title']
+        paths = []
+        for parent_id, is_root in node['parents']:
+            if is_root or depth >= 100:
+                paths.append(f"My Drive/{title}")
+            else:
+                paths.extend(f"{prefix}/{title}" for prefix in self._resolve_node(parent_id, depth + 1))
+        
+        if not paths:
+            # No parents (e.g. shared with me): shown at the top level
+            paths.append(f"My Drive/{title}")
+        
+        self._paths[node_id] = list(dict.fromkeys(paths))
+        return self._paths[node_id]
+    
+    def resolve_many(
+        self,
+        file_ids: List[str],
+        all_parents: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Resolve many files in one shared walk.
+        
+        Args:
+            file_ids: File IDs
+            all_parents: Return every path of multi-parent files (default: False)
+        
+        Returns:
+            Dict: {file_id: path (or list of paths), or None if the file can't be read}
+        """
+        with self._lock:
+            if time.monotonic() - self._loaded_at > self.ttl:
+                self.clear()
+            
+            self._load(list(file_ids))
+            
+            results: Dict[str, Any] = {}
+            for fid in file_ids:
+                if self._nodes.get(fid) is None:
+                    results[fid] = None
+                    continue
+                paths = self._resolve_node(fid)
+                results[fid] = paths if all_parents else paths[0]
+            return results
+    
+    def resolve(self, file_id: str, all_parents: bool = False) -> Any:
+        """
+        Resolve one file.
+        
+        Args:
+            file_id: File ID
+            all_parents: Return every path of a multi-parent file (default: False)
+        
+        Returns:
+            str or List[str]: Primary path, or all paths with all_parents=True
+        
+        Raises:
+            FileNotFoundError: If the file can't be read
+        """
+        path = self.resolve_many([file_id], all_parents)[file_id]
+        if path is None:
+            raise FileNotFoundError(f"File not found or not accessible: {file_id}")
+        return path
+
+
+# Every live resolver, so a move can clear them all. The resolver itself is
+# stored on its handle: it references the handle, so keying a
+# WeakKeyDictionary on the handle would keep both alive forever.
+_path_resolvers: 'weakref.WeakSet' = weakref.WeakSet()
+_path_resolvers_lock = threading.Lock()
+
+
+def _get_path_resolver(drive: GoogleDrive) -> PathResolver:
+    """Get the session-wide PathResolver of a drive handle."""
+    with _path_resolvers_lock:
+        resolver = getattr(drive, '_path_resolver', None)
+        if resolver is None:
+            resolver = drive._path_resolver = PathResolver(drive)
+            _path_resolvers.add(resolver)
+        return resolver
+
+
+def _clear_path_cache() -> None:
+    """Forget memoized paths after a move made through the toolkit."""
+    with _path_resolvers_lock:
+        resolvers = list(_path_resolvers)
+    for resolver in resolvers:
+        resolver.clear()
+
+
 def get_file_path(
     drive: GoogleDrive,
-    file_id: str
-) -> str:
+    file_id: str,
+    all_parents: bool = False
+) -> Any:
     """
     Get the full path of a file in Google Drive.
     Lấy đường dẫn đầy đủ của file trên Google Drive.
     
+    Folder paths are memoized per drive handle, so files in an already
+    resolved tree cost at most one request.
+    
     Args:
         drive: Authenticated GoogleDrive instance
         file_id: ID of the file
+        all_parents: Return a list with one path per parent for files
+                     that live in several folders (default: False)
     
     Returns:
-        str: Full path from My Drive (e.g., "My Drive/Folder1/Folder2/file.txt")
+        str: Full path from My Drive (e.g., "My Drive/Folder1/Folder2/file.txt"),
+             or List[str] with all_parents=True
         
     Example:
         >>> path = get_file_path(drive, "abc123")
         >>> print(f"File located at: {path}")
     """
-    gfile = drive.CreateFile({'id': file_id})
-    gfile.FetchMetadata()
+    return _get_path_resolver(drive).resolve(file_id, all_parents)
+
+
+def get_file_paths(
+    drive: GoogleDrive,
+    file_ids: List[str],
+    all_parents: bool = False
+) -> Dict[str, Any]:
+    """
+    Get the full paths of many files at once.
+    Lấy đường dẫn đầy đủ của nhiều file cùng lúc.
     
-    # Build path from root to file
-    path_parts = [gfile['title']]
+    Ancestors shared between the files are fetched once, with one
+    batched request per tree level.
     
-    # Traverse parent folders
-    current = gfile
-    max_depth = 100  # Prevent infinite loop
-    depth = 0
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_ids: File IDs
+        all_parents: Return every path of multi-parent files (default: False)
     
-    while 'parents' in current and len(current['parents']) > 0 and depth < max_depth:
-        parent_id = current['parents'][0]['id']
+    Returns:
+        Dict: {file_id: path (or list of paths), or None if the file can't be read}
         
-        # Stop at root
-        if parent_id == 'root' or not parent_id:
-            break
-        
-        # Get parent folder
-        try:
-            parent = drive.CreateFile({'id': parent_id})
-            parent.FetchMetadata()
-            path_parts.insert(0, parent['title'])
-            current = parent
-            depth += 1
-        except:
-            break
-    
-    # Build full path
-    full_path = "My Drive/" + "/".join(path_parts)
-    return full_path
+    Example:
+        >>> paths = get_file_paths(drive, [f['id'] for f in files])
+    """
+    return _get_path_resolver(drive).resolve_many(file_ids, all_parents)
 
 
 def list_files_in_folder(
     drive: GoogleDrive,
     folder_id: Optional[str] = None,
-    max_results: int = 100
+    max_results: int = 100,
+    fields: Optional[str] = 'standard'
 ) -> List[Dict[str, Any]]:
     """
     List all files in a folder.
@@ -450,6 +1136,7 @@ def list_files_in_folder(
         drive: Authenticated GoogleDrive instance
         folder_id: ID of the folder (None for root)
         max_results: Maximum number of results
+        fields: Fields to request (see search_files)
     
     Returns:
         List[Dict]: List of files
@@ -457,4 +1144,4 @@ def list_files_in_folder(
     Example:
         >>> files = list_files_in_folder(drive, folder_id="xyz789")
     """
-    return search_files(drive, folder_id=folder_id, max_results=max_results)
+    return search_files(drive, folder_id=folder_id, max_results=max_results, fields=fields)
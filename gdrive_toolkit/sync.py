@@ -0,0 +1,588 @@
+"""
+One-way directory sync between a local folder and Google Drive.
+Đồng bộ một chiều giữa thư mục local và Google Drive.
+
+``sync_to_drive`` pushes a local directory up, ``mirror_from_drive`` pulls
+a Drive folder down. Both compare size and MD5 so only changes move.
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import time
+import shutil
+import uuid
+import fnmatch
+from collections import deque
+from typing import Optional, List, Dict, Any, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydrive2.drive import GoogleDrive
+
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+TREE_FIELDS = 'id,title,mimeType,fileSize,md5Checksum,modifiedDate,parents(id)'
+
+# Prefix of in-progress downloads; renamed into place once complete
+TEMP_PREFIX = '.gdrive-tmp-'
+
+
+def _is_excluded(rel_path: str, exclude: Optional[List[str]]) -> bool:
+    """Check a relative path (or its base name) against glob patterns."""
+    if not exclude:
+        return False
+    name = rel_path.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern)
+               for pattern in exclude)
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+def _remote_path(item: Dict[str, Any], folder_paths: Dict[str, str]) -> str:
+    """Relative path of a remote item, given {folder ID: relative path}."""
+    for parent in item.get('parents') or []:
+        if parent['id'] in folder_paths:
+            return _join(folder_paths[parent['id']], item['title'])
+    return item['title']
+
+
+def _is_excluded_tree(rel_path: str, exclude: Optional[List[str]]) -> bool:
+    """Like _is_excluded, but also true below an excluded folder."""
+    if not exclude:
+        return False
+    parts = rel_path.split('/')
+    return any(_is_excluded('/'.join(parts[:i]), exclude) for i in range(1, len(parts) + 1))
+
+
+def remote_tree(
+    drive: GoogleDrive,
+    folder_id: str,
+    max_workers: int = 4
+) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Map everything below a Drive folder by relative path.
+    Lập bản đồ cây thư mục trên Drive theo đường dẫn tương đối.
+    
+    The tree is fetched with one breadth-first walk. When several items
+    share a path, the most recently modified one is kept and the others
+    are returned as duplicates.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        folder_id: Real ID of the root folder (not the "root" alias)
+        max_workers: Concurrent listing queries (default: 4)
+    
+    Returns:
+        Tuple: ({relative folder path: folder ID} including '' for the root,
+                {relative file path: file resource},
+                [duplicate items])
+    """
+    from .walk import walk_tree
+    
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    for item in walk_tree(drive, folder_id, fields=TREE_FIELDS, max_workers=max_workers):
+        for parent in item.get('parents') or []:
+            children.setdefault(parent['id'], []).append(item)
+    
+    folders = {'': folder_id}
+    files: Dict[str, Dict[str, Any]] = {}
+    duplicates = []
+    queue = deque([('', folder_id)])
+    
+    while queue:
+        rel_dir, dir_id = queue.popleft()
+        items = sorted(children.get(dir_id, []),
+                       key=lambda i: i.get('modifiedDate', ''), reverse=True)
+        
+        for item in items:
+            path = _join(rel_dir, item['title'])
+            if path in folders or path in files:
+                duplicates.append(item)
+            elif item.get('mimeType') == FOLDER_MIME:
+                folders[path] = item['id']
+                queue.append((path, item['id']))
+            else:
+                files[path] = item
+    
+    return folders, files, duplicates
+
+
+def local_tree(
+    local_dir: str,
+    exclude: Optional[List[str]] = None
+) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Map everything below a local folder by relative path.
+    
+    Leftover temporary files from interrupted downloads are ignored.
+    
+    Args:
+        local_dir: Local directory
+        exclude: Glob patterns matched against relative paths and names
+    
+    Returns:
+        Tuple: ([relative folder paths, parents first],
+                {relative file path: absolute file path})
+    """
+    dirs = []
+    files = {}
+    
+    for root, dirnames, filenames in os.walk(local_dir):
+        rel_root = os.path.relpath(root, local_dir)
+        rel_root = '' if rel_root == '.' else rel_root.replace(os.sep, '/')
+        
+        dirnames[:] = sorted(d for d in dirnames if not _is_excluded(_join(rel_root, d), exclude))
+        dirs.extend(_join(rel_root, d) for d in dirnames)
+        
+        for name in sorted(filenames):
+            if name.startswith(TEMP_PREFIX):
+                continue
+            rel_path = _join(rel_root, name)
+            if not _is_excluded(rel_path, exclude):
+                files[rel_path] = os.path.join(root, name)
+    
+    return dirs, files
+
+
+def _ensure_folders(
+    drive: GoogleDrive,
+    local_dirs: List[str],
+    remote_folders: Dict[str, str],
+    dry_run: bool = False,
+    verbose: bool = True
+) -> int:
+    """Create the remote folders missing for local_dirs; returns how many."""
+    from .folder import _remember_created_folder
+    
+    created = 0
+    for rel_dir in local_dirs:
+        if rel_dir in remote_folders:
+            continue
+        
+        parent_path, _, name = rel_dir.rpartition('/')
+        parent_id = remote_folders[parent_path]
+        
+        if dry_run:
+            remote_folders[rel_dir] = f'<new:{rel_dir}>'
+        else:
+            folder = drive.CreateFile({
+                'title': name,
+                'mimeType': FOLDER_MIME,
+                'parents': [{'id': parent_id}]
+            })
+            folder.Upload()
+            remote_folders[rel_dir] = folder['id']
+            _remember_created_folder(parent_id, name, folder['id'])
+        
+        created += 1
+        if verbose:
+            print(f"📁 {'Would create' if dry_run else 'Created'} folder '{rel_dir}'")
+    
+    return created
+
+
+def sync_to_drive(
+    drive: GoogleDrive,
+    local_dir: str,
+    folder_id: str = 'root',
+    delete: bool = False,
+    max_workers: int = 4,
+    exclude: Optional[List[str]] = None,
+    dry_run: bool = False,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    Mirror a local directory into a Drive folder (one way, local → Drive).
+    Đồng bộ thư mục local lên folder trên Drive (một chiều).
+    
+    The remote tree is read with one breadth-first walk. Missing folders
+    are created, one request each. Files are uploaded only when they are
+    new or their size or MD5 differs, and changed files are updated in
+    place so their IDs and share links are kept. Transfers run on a
+    thread pool. Local MD5s come from the persistent hash cache, so
+    unchanged files are not re-hashed on repeat runs.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        local_dir: Local directory to mirror
+        folder_id: Destination Drive folder ID (default: "root")
+        delete: Move remote files and folders that don't exist locally to
+                the trash (default: False)
+        max_workers: Concurrent uploads (default: 4)
+        exclude: Glob patterns to skip, matched against relative paths and
+                 names (e.g. ["*.tmp", ".ipynb_checkpoints"])
+        dry_run: Only report what would change (default: False)
+        verbose: Print progress (default: True)
+    
+    Returns:
+        Dict: Report with keys 'created_folders' (count), 'uploaded',
+        'updated', 'deleted' (relative paths), 'skipped' (count),
+        'failed' ({relative path: error}), 'total_bytes' and 'elapsed'
+    
+    Example:
+        >>> report = sync_to_drive(drive, "./outputs/exp42", folder_id="xyz789",
+        ...                        max_workers=8, exclude=["*.tmp"])
+        >>> print(report['uploaded'], report['failed'])
+    """
+    from .operations import _fetch_file, _compare_with_remote, _invalidate_metadata
+    from .folder import _forget_folder
+    from .utils import _run_transfer_pool, _print_throughput
+    
+    if not os.path.isdir(local_dir):
+        raise FileNotFoundError(f"Directory not found: {local_dir}")
+    
+    start_time = time.time()
+    root_id = _fetch_file(drive, folder_id)['id']
+    
+    if verbose:
+        print(f"🔍 Comparing '{local_dir}' with Drive folder {root_id}...")
+    
+    remote_folders, remote_files, duplicates = remote_tree(drive, root_id, max_workers)
+    if exclude:
+        # Excluded remote items are left alone, even with delete=True
+        folder_paths = {dir_id: path for path, dir_id in remote_folders.items()}
+        duplicates = [item for item in duplicates
+                      if not _is_excluded_tree(_remote_path(item, folder_paths), exclude)]
+        remote_folders = {path: fid for path, fid in remote_folders.items()
+                          if not path or not _is_excluded_tree(path, exclude)}
+        remote_files = {path: item for path, item in remote_files.items()
+                        if not _is_excluded_tree(path, exclude)}
+    local_dirs, local_files = local_tree(local_dir, exclude)
+    
+    report: Dict[str, Any] = {
+        'created_folders': 0, 'uploaded': [], 'updated': [], 'deleted': [],
+        'skipped': 0, 'failed': {}, 'total_bytes': 0, 'elapsed': 0.0,
+    }
+    
+    # Local folders that clash with a remote file can't be synced
+    for rel_dir in local_dirs:
+        if rel_dir in remote_files:
+            report['failed'][rel_dir] = "A file with this name exists on Drive"
+    local_dirs = [d for d in local_dirs
+                  if not any(d == f or d.startswith(f + '/') for f in report['failed'])]
+    
+    report['created_folders'] = _ensure_folders(drive, local_dirs, remote_folders, dry_run, verbose)
+    
+    # Decide what to transfer
+    work = []
+    for rel_path, file_path in local_files.items():
+        parent_path = rel_path.rpartition('/')[0]
+        if parent_path not in remote_folders:
+            continue  # below a clashing folder
+        
+        if rel_path in remote_folders:
+            report['failed'][rel_path] = "A folder with this name exists on Drive"
+            continue
+        
+        remote = remote_files.get(rel_path)
+        if remote and remote.get('mimeType', '').startswith('application/vnd.google-apps.'):
+            report['failed'][rel_path] = "A Google Docs file with this name exists on Drive"
+            continue
+        
+        action = _compare_with_remote(file_path, remote)
+        if action == 'skip':
+            report['skipped'] += 1
+        else:
+            work.append({'path': rel_path, 'local': file_path, 'action': action,
+                         'parent_id': remote_folders[parent_path],
+                         'id': remote['id'] if remote else None})
+    
+    # Remote extras: only the topmost missing folder needs to go
+    extras = []
+    if delete:
+        local_dir_set = set(local_dirs)
+        for rel_dir, dir_id in remote_folders.items():
+            parent_path = rel_dir.rpartition('/')[0]
+            if rel_dir and rel_dir not in local_dir_set and parent_path in local_dir_set | {''}:
+                extras.append((rel_dir, dir_id))
+        for rel_path, remote in remote_files.items():
+            parent_path = rel_path.rpartition('/')[0]
+            if rel_path not in local_files and parent_path in local_dir_set | {''}:
+                extras.append((rel_path, remote['id']))
+        extras.extend((f"{item['title']} (duplicate)", item['id']) for item in duplicates)
+    
+    if dry_run:
+        for item in work:
+            if verbose:
+                print(f"📤 Would {'upload' if item['action'] == 'create' else 'update'} '{item['path']}'")
+            report['uploaded' if item['action'] == 'create' else 'updated'].append(item['path'])
+        for rel_path, _ in extras:
+            if verbose:
+                print(f"🗑 Would trash '{rel_path}'")
+            report['deleted'].append(rel_path)
+        report['elapsed'] = time.time() - start_time
+        return report
+    
+    def upload(worker_drive, item):
+        if item['action'] == 'update':
+            gfile = worker_drive.CreateFile({'id': item['id']})
+        else:
+            gfile = worker_drive.CreateFile({
+                'title': item['path'].rpartition('/')[2],
+                'parents': [{'id': item['parent_id']}]
+            })
+        gfile.SetContentFile(item['local'])
+        gfile.Upload()
+        return gfile['id']
+    
+    if work:
+        entries = _run_transfer_pool(
+            drive, work, upload, max(1, min(max_workers, len(work))),
+            describe=lambda item: item['path'], verbose=verbose
+        )
+        for entry in entries:
+            item = entry['item']
+            if entry['error'] is not None:
+                report['failed'][item['path']] = entry['error']
+                continue
+            if item['action'] == 'update':
+                _invalidate_metadata(item['id'])
+            report['uploaded' if item['action'] == 'create' else 'updated'].append(item['path'])
+            report['total_bytes'] += os.path.getsize(item['local'])
+    
+    if extras:
+        def trash(worker_drive, extra):
+            worker_drive.CreateFile({'id': extra[1]}).Trash()
+        
+        entries = _run_transfer_pool(
+            drive, extras, trash, max(1, min(max_workers, len(extras))),
+            describe=lambda extra: f"trash {extra[0]}", verbose=verbose
+        )
+        for entry in entries:
+            rel_path, item_id = entry['item']
+            if entry['error'] is not None:
+                report['failed'][rel_path] = entry['error']
+            else:
+                _invalidate_metadata(item_id)
+                _forget_folder(item_id)
+                report['deleted'].append(rel_path)
+    
+    report['elapsed'] = time.time() - start_time
+    
+    if verbose:
+        print(f"\n✓ Sync complete: {len(report['uploaded'])} uploaded, "
+              f"{len(report['updated'])} updated, {report['skipped']} unchanged, "
+              f"{len(report['deleted'])} trashed, {len(report['failed'])} failed")
+        transferred = len(report['uploaded']) + len(report['updated'])
+        if transferred:
+            _print_throughput("Transferred", transferred, len(work), report['total_bytes'],
+                              report['elapsed'], min(max_workers, len(work)))
+    
+    return report
+
+
+def _download_atomic(drive: GoogleDrive, remote: Dict[str, Any], dest_path: str) -> int:
+    """
+    Download a file next to dest_path, verify it, then rename it into place.
+    
+    The content is written to a hidden temporary file in the same
+    directory, checked against the remote MD5 and moved over dest_path
+    with os.replace, so readers see either the old file or the complete
+    new one, never a partial write. The file keeps the mode of the file it
+    replaces, or gets the umask default if it is new.
+    
+    Returns:
+        int: Bytes downloaded
+    """
+    from .utils import compute_md5
+    from .transfer import _remember_md5
+    
+    # Not mkstemp: its 0600 would stick. Mode 0o666 lets the umask apply,
+    # as it would for open()
+    temp_path = os.path.join(os.path.dirname(dest_path), f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+    os.close(os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+    
+    try:
+        drive.CreateFile({'id': remote['id']}).GetContentFile(temp_path)
+        
+        expected = remote.get('md5Checksum')
+        if expected and compute_md5(temp_path) != expected:
+            raise RuntimeError("MD5 mismatch after download")
+        
+        size = os.path.getsize(temp_path)
+        if os.path.exists(dest_path):
+            os.chmod(temp_path, stat.S_IMODE(os.stat(dest_path).st_mode))
+        os.replace(temp_path, dest_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    if expected:
+        _remember_md5(dest_path, expected)
+    return size
+
+
+def mirror_from_drive(
+    drive: GoogleDrive,
+    folder_id: str = 'root',
+    local_dir: str = '.',
+    delete: bool = False,
+    max_workers: int = 4,
+    exclude: Optional[List[str]] = None,
+    dry_run: bool = False,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    Mirror a Drive folder into a local directory (one way, Drive → local).
+    Tải cây thư mục trên Drive về máy, giữ nguyên cấu trúc.
+    
+    The remote tree is read with one breadth-first walk and its folder
+    hierarchy is recreated under local_dir. Files are downloaded only when
+    missing or when their size or MD5 differs, on a thread pool. Each file
+    is written to a temporary file, verified and renamed into place, so a
+    half-written file never appears under its real name.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        folder_id: Drive folder to mirror (default: "root")
+        local_dir: Destination directory, created if needed (default: ".")
+        delete: Remove local files and folders that don't exist on Drive
+                (default: False)
+        max_workers: Concurrent downloads (default: 4)
+        exclude: Glob patterns to skip, matched against relative paths and
+                 names (e.g. ["*.tmp", "checkpoints"])
+        dry_run: Only report what would change (default: False)
+        verbose: Print progress (default: True)
+    
+    Returns:
+        Dict: Report with keys 'created_folders' (count), 'downloaded',
+        'updated', 'deleted', 'unsupported' (relative paths), 'skipped'
+        (count), 'failed' ({relative path: error}), 'total_bytes' and
+        'elapsed'. Google Docs files have no binary content and are listed
+        under 'unsupported'.
+    
+    Example:
+        >>> report = mirror_from_drive(drive, "xyz789", "./data/train", max_workers=16)
+        >>> print(len(report['downloaded']), report['failed'])
+    """
+    from .operations import _fetch_file, _is_unchanged_local
+    from .utils import _run_transfer_pool, _print_throughput
+    
+    start_time = time.time()
+    root_id = _fetch_file(drive, folder_id)['id']
+    
+    if verbose:
+        print(f"🔍 Comparing Drive folder {root_id} with '{local_dir}'...")
+    
+    remote_folders, remote_files, _ = remote_tree(drive, root_id, max_workers)
+    remote_folders = {path: fid for path, fid in remote_folders.items()
+                      if not path or not _is_excluded_tree(path, exclude)}
+    remote_files = {path: item for path, item in remote_files.items()
+                    if not _is_excluded_tree(path, exclude)}
+    
+    local_dirs, local_files = local_tree(local_dir, exclude) if os.path.isdir(local_dir) else ([], {})
+    local_dir_set = set(local_dirs)
+    
+    report: Dict[str, Any] = {
+        'created_folders': 0, 'downloaded': [], 'updated': [], 'deleted': [],
+        'unsupported': [], 'skipped': 0, 'failed': {}, 'total_bytes': 0, 'elapsed': 0.0,
+    }
+    
+    # Recreate the hierarchy, parents first
+    blocked = set()
+    for rel_dir in sorted(remote_folders, key=lambda p: p.count('/')):
+        if not rel_dir or rel_dir in local_dir_set:
+            continue
+        if rel_dir.rpartition('/')[0] in blocked or rel_dir in local_files:
+            report['failed'][rel_dir] = "A local file with this name exists"
+            blocked.add(rel_dir)
+            continue
+        
+        if not dry_run:
+            os.makedirs(os.path.join(local_dir, *rel_dir.split('/')), exist_ok=True)
+        report['created_folders'] += 1
+        if verbose:
+            print(f"📁 {'Would create' if dry_run else 'Created'} folder '{rel_dir}'")
+    
+    if not dry_run:
+        os.makedirs(local_dir, exist_ok=True)
+    
+    # Decide what to transfer
+    work = []
+    for rel_path, remote in remote_files.items():
+        if rel_path.rpartition('/')[0] in blocked:
+            continue
+        if remote.get('md5Checksum') is None:
+            report['unsupported'].append(rel_path)
+            continue
+        if rel_path in local_dir_set:
+            report['failed'][rel_path] = "A local folder with this name exists"
+            continue
+        
+        dest_path = os.path.join(local_dir, *rel_path.split('/'))
+        if _is_unchanged_local(dest_path, remote):
+            report['skipped'] += 1
+        else:
+            work.append({'path': rel_path, 'dest': dest_path, 'remote': remote,
+                         'action': 'update' if rel_path in local_files else 'create'})
+    
+    # Local extras: only the topmost missing folder needs to go
+    extras = []
+    if delete:
+        keep = set(remote_folders) | set(remote_files)
+        for rel_dir in local_dirs:
+            if rel_dir not in keep and rel_dir.rpartition('/')[0] in keep:
+                extras.append(rel_dir)
+        for rel_path in local_files:
+            if rel_path not in keep and rel_path.rpartition('/')[0] in keep:
+                extras.append(rel_path)
+    
+    if dry_run:
+        for item in work:
+            if verbose:
+                print(f"📥 Would {'download' if item['action'] == 'create' else 'update'} '{item['path']}'")
+            report['downloaded' if item['action'] == 'create' else 'updated'].append(item['path'])
+        for rel_path in extras:
+            if verbose:
+                print(f"🗑 Would delete '{rel_path}'")
+            report['deleted'].append(rel_path)
+        report['elapsed'] = time.time() - start_time
+        return report
+    
+    if work:
+        entries = _run_transfer_pool(
+            drive, work,
+            lambda worker_drive, item: _download_atomic(worker_drive, item['remote'], item['dest']),
+            max(1, min(max_workers, len(work))),
+            describe=lambda item: item['path'], verbose=verbose
+        )
+        for entry in entries:
+            item = entry['item']
+            if entry['error'] is not None:
+                report['failed'][item['path']] = entry['error']
+                continue
+            report['downloaded' if item['action'] == 'create' else 'updated'].append(item['path'])
+            report['total_bytes'] += entry['result']
+    
+    for rel_path in extras:
+        target = os.path.join(local_dir, *rel_path.split('/'))
+        try:
+            if os.path.isdir(target) and not os.path.islink(target):
+                shutil.rmtree(target)
+            else:
+                os.remove(target)
+            report['deleted'].append(rel_path)
+            if verbose:
+                print(f"🗑 Deleted '{rel_path}'")
+        except OSError as e:
+            report['failed'][rel_path] = str(e)
+    
+    report['elapsed'] = time.time() - start_time
+    
+    if verbose:
+        print(f"\n✓ Mirror complete: {len(report['downloaded'])} downloaded, "
+              f"{len(report['updated'])} updated, {report['skipped']} unchanged, "
+              f"{len(report['deleted'])} deleted, {len(report['failed'])} failed")
+        if report['unsupported']:
+            print(f"⚠ Skipped {len(report['unsupported'])} Google Docs file(s) with no binary content")
+        transferred = len(report['downloaded']) + len(report['updated'])
+        if transferred:
+            _print_throughput("Transferred", transferred, len(work), report['total_bytes'],
+                              report['elapsed'], min(max_workers, len(work)))
+    
+    return report
@@ -0,0 +1,670 @@
+"""
+Transfer engines for Google Drive.
+Các engine truyền dữ liệu cho Google Drive.
+
+Low-level helpers that talk to the Drive media endpoints directly over
+authorized HTTP, for transfers pydrive2 only does as a single stream.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import time
+import threading
+from typing import Optional, Dict, Any, Callable, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydrive2.drive import GoogleDrive
+
+
+MEDIA_URL = "https://www.googleapis.com/drive/v2/files/{file_id}?alt=media&supportsAllDrives=true"
+
+# Status codes worth retrying a request for
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _request_with_retry(
+    http,
+    url: str,
+    method: str = 'GET',
+    body: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    expected: Tuple[int, ...] = (200,),
+    max_retries: int = 5
+):
+    """
+    Send an HTTP request, retrying transient failures with backoff.
+    
+    Args:
+        http: Authorized httplib2.Http object
+        url: Request URL
+        method: HTTP method
+        body: Request body
+        headers: Request headers
+        expected: Status codes treated as success
+        max_retries: Maximum number of retries
+    
+    Returns:
+        tuple: (response, content)
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            resp, content = http.request(url, method=method, body=body, headers=headers)
+        except (OSError, ConnectionError):
+            if attempt == max_retries:
+                raise
+        else:
+            if resp.status in expected:
+                return resp, content
+            if resp.status not in RETRY_STATUSES or attempt == max_retries:
+                raise RuntimeError(
+                    f"HTTP {resp.status} for {method} {url}: {content[:200]!r}"
+                )
+        
+        time.sleep(min(2 ** attempt, 32))
+    
+    raise RuntimeError(f"Request failed after {max_retries} retries: {method} {url}")
+
+
+def _remember_md5(file_path: str, md5: str) -> None:
+    """Record a verified MD5 in the hash cache so later runs skip re-hashing."""
+    from .cache import get_hash_cache
+    
+    get_hash_cache().put(file_path, md5)
+
+
+def _split_ranges(total_size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split [0, total_size) into inclusive (start, end) byte ranges."""
+    return [
+        (start, min(start + chunk_size, total_size) - 1)
+        for start in range(0, total_size, chunk_size)
+    ]
+
+
+def download_segmented(
+    drive: GoogleDrive,
+    file_id: str,
+    output_path: str,
+    file_size: int,
+    md5_checksum: Optional[str] = None,
+    connections: int = 8,
+    chunk_size: int = 32 * 1024 * 1024,  # 32 MB
+    callback: Optional[Callable[[int, int], None]] = None
+) -> str:
+    """
+    Download a file over several concurrent HTTP Range requests.
+    Download file bằng nhiều kết nối song song (HTTP Range).
+    
+    The output file is preallocated to ``file_size`` and each byte range
+    is written at its own offset, so ranges may finish in any order.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_id: File ID to download
+        output_path: Local path to write to
+        file_size: Size of the file in bytes (Drive 'fileSize')
+        md5_checksum: Expected MD5 (Drive 'md5Checksum'); verified if given
+        connections: Number of concurrent connections (default: 8)
+        chunk_size: Bytes per Range request (default: 32 MB)
+        callback: Progress callback (current, total)
+    
+    Returns:
+        str: Downloaded file path
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    url = MEDIA_URL.format(file_id=file_id)
+    ranges = _split_ranges(file_size, chunk_size)
+    
+    # Preallocate so every worker can write at its own offset
+    with open(output_path, 'wb') as f:
+        f.truncate(file_size)
+    
+    local = threading.local()
+    progress_lock = threading.Lock()
+    transferred = [0]
+    
+    def fetch(byte_range: Tuple[int, int]) -> None:
+        if getattr(local, 'http', None) is None:
+            local.http = drive.auth.Get_Http_Object()
+        
+        start, end = byte_range
+        _, content = _request_with_retry(
+            local.http, url,
+            headers={'Range': f'bytes={start}-{end}'},
+            expected=(206,)
+        )
+        
+        if len(content) != end - start + 1:
+            raise RuntimeError(
+                f"Short read for bytes {start}-{end}: got {len(content)} bytes"
+            )
+        
+        with open(output_path, 'r+b') as f:
+            f.seek(start)
+            f.write(content)
+        
+        with progress_lock:
+            transferred[0] += len(content)
+            if callback:
+                callback(transferred[0], file_size)
+    
+    if drive.auth.access_token_expired:
+        drive.auth.Refresh()
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(connections, len(ranges) or 1))) as executor:
+            # list() re-raises the first worker exception
+            list(executor.map(fetch, ranges))
+    except Exception:
+        os.remove(output_path)
+        raise
+    
+    if md5_checksum:
+        from .utils import compute_md5
+        
+        local_md5 = compute_md5(output_path)
+        if local_md5 != md5_checksum:
+            os.remove(output_path)
+            raise RuntimeError(
+                f"MD5 mismatch for '{output_path}': "
+                f"expected {md5_checksum}, got {local_md5}"
+            )
+        
+        _remember_md5(output_path, local_md5)
+    
+    return output_path
+
+
+UPLOAD_URL = "https://www.googleapis.com/upload/drive/v2/files?uploadType=resumable&supportsAllDrives=true"
+
+# Resumable upload chunks must be a multiple of 256 KB
+CHUNK_ALIGNMENT = 256 * 1024
+
+STATE_SUFFIX = '.gdrive-upload.json'
+
+
+def _upload_state_path(local_path: str) -> str:
+    """
+    Path of the resumable-session state file for ``local_path``.
+    
+    The state file lives next to the source. If that directory is not
+    writable (e.g. /kaggle/input), it falls back to the temp directory
+    under a name derived from the absolute source path.
+    """
+    import hashlib
+    import tempfile
+    
+    abs_path = os.path.abspath(local_path)
+    if os.access(os.path.dirname(abs_path), os.W_OK):
+        return abs_path + STATE_SUFFIX
+    
+    digest = hashlib.md5(abs_path.encode('utf-8')).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"gdrive-upload-{digest}{STATE_SUFFIX}")
+
+
+def _load_state(state_path: str) -> Optional[Dict[str, Any]]:
+    """Load a saved transfer state file, or None if missing or unreadable."""
+    import json
+    
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(state_path: str, state: Dict[str, Any]) -> None:
+    """Atomically write a transfer state file."""
+    import json
+    
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def _parse_range_offset(resp) -> int:
+    """Return the next byte offset from a 308 response's Range header."""
+    range_header = resp.get('range')
+    if not range_header:
+        return 0
+    # Format: "bytes=0-12345"
+    return int(range_header.rsplit('-', 1)[1]) + 1
+
+
+def _start_upload_session(
+    http,
+    metadata: Dict[str, Any],
+    total_size: Optional[int],
+    mime_type: str
+) -> str:
+    """
+    Open a resumable upload session and return its session URI.
+    
+    Args:
+        http: Authorized httplib2.Http object
+        metadata: Drive v2 file resource (title, parents, ...)
+        total_size: Content length, or None if not known yet
+        mime_type: Content MIME type
+    
+    Returns:
+        str: Session URI to send content to
+    """
+    import json
+    
+    headers = {
+        'Content-Type': 'application/json; charset=UTF-8',
+        'X-Upload-Content-Type': mime_type,
+    }
+    if total_size is not None:
+        headers['X-Upload-Content-Length'] = str(total_size)
+    
+    resp, _ = _request_with_retry(
+        http, UPLOAD_URL, method='POST',
+        body=json.dumps(metadata).encode('utf-8'),
+        headers=headers
+    )
+    
+    session_uri = resp.get('location')
+    if not session_uri:
+        raise RuntimeError("Drive did not return a resumable session URI")
+    return session_uri
+
+
+def _query_upload_offset(http, session_uri: str, total_size: Optional[int]):
+    """
+    Ask Drive how many bytes of a session it has acknowledged.
+    
+    Returns:
+        tuple: (offset, resource) where resource is the finished file
+        resource if the upload already completed, else None. offset is
+        None if the session has expired.
+    """
+    import json
+    
+    total = '*' if total_size is None else str(total_size)
+    resp, content = http.request(
+        session_uri, method='PUT', body=b'',
+        headers={'Content-Length': '0', 'Content-Range': f'bytes */{total}'}
+    )
+    
+    if resp.status in (200, 201):
+        return total_size, json.loads(content)
+    if resp.status == 308:
+        return _parse_range_offset(resp), None
+    if resp.status in (404, 410):
+        return None, None
+    if resp.status in RETRY_STATUSES:
+        raise ConnectionError(f"HTTP {resp.status} while querying upload status")
+    
+    raise RuntimeError(f"HTTP {resp.status} while querying upload status: {content[:200]!r}")
+
+
+def _put_chunk(
+    http,
+    session_uri: str,
+    data: bytes,
+    offset: int,
+    total_size: Optional[int],
+    max_retries: int = 5
+):
+    """
+    Send one chunk of a resumable session, resyncing on transient failures.
+    
+    Returns:
+        tuple: (next_offset, resource) where resource is the finished
+        file resource after the last chunk, else None.
+    """
+    import json
+    
+    total = '*' if total_size is None else str(total_size)
+    if data:
+        content_range = f'bytes {offset}-{offset + len(data) - 1}/{total}'
+    else:
+        content_range = f'bytes */{total}'
+    
+    for attempt in range(max_retries + 1):
+        try:
+            if attempt:
+                # The server may have stored part of the chunk; resend from its
+                # offset. A failed query is retried like a failed PUT.
+                acked, resource = _query_upload_offset(http, session_uri, total_size)
+                if resource is not None:
+                    return acked, resource
+                if acked is None:
+                    raise RuntimeError("Upload session expired")
+                if acked != offset:
+                    return acked, None
+            
+            resp, content = http.request(
+                session_uri, method='PUT', body=data,
+                headers={'Content-Length': str(len(data)), 'Content-Range': content_range}
+            )
+        except (OSError, ConnectionError):
+            if attempt == max_retries:
+                raise
+        else:
+            if resp.status in (200, 201):
+                return offset + len(data), json.loads(content)
+            if resp.status == 308:
+                return _parse_range_offset(resp), None
+            if resp.status not in RETRY_STATUSES or attempt == max_retries:
+                raise RuntimeError(f"HTTP {resp.status} while uploading chunk: {content[:200]!r}")
+        
+        time.sleep(min(2 ** attempt, 32))
+    
+    raise RuntimeError("Chunk upload failed")
+
+
+def _query_upload_offset_with_retry(
+    http,
+    session_uri: str,
+    total_size: Optional[int],
+    max_retries: int = 5
+):
+    """Query a session's offset, retrying 5xx and dropped connections with backoff."""
+    for attempt in range(max_retries + 1):
+        try:
+            return _query_upload_offset(http, session_uri, total_size)
+        except (OSError, ConnectionError):
+            if attempt == max_retries:
+                raise
+        
+        time.sleep(min(2 ** attempt, 32))
+    
+    raise RuntimeError("Upload status query failed")
+
+
+def upload_resumable(
+    drive: GoogleDrive,
+    local_path: str,
+    metadata: Dict[str, Any],
+    chunk_size: int = 8 * 1024 * 1024,  # 8 MB
+    callback: Optional[Callable[[int, int], None]] = None,
+    resume: bool = True
+) -> Dict[str, Any]:
+    """
+    Upload a file through a chunked resumable upload session.
+    Upload file bằng resumable session theo từng chunk.
+    
+    The session URI is kept in a small state file next to the source
+    (``<file>.gdrive-upload.json``). If the process dies, calling this
+    again with the same file resumes from the last byte Drive
+    acknowledged instead of starting from zero.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        local_path: Path to file
+        metadata: Drive v2 file resource (title, parents, mimeType, ...)
+        chunk_size: Bytes per request, rounded to a multiple of 256 KB
+        callback: Progress callback (current, total), called after every chunk
+        resume: Reuse a saved session for this file if one exists
+    
+    Returns:
+        Dict: Uploaded file resource
+    """
+    from .utils import get_mime_type
+    
+    total_size = os.path.getsize(local_path)
+    mtime = os.path.getmtime(local_path)
+    mime_type = metadata.get('mimeType') or get_mime_type(local_path)
+    chunk_size = max(CHUNK_ALIGNMENT, chunk_size - chunk_size % CHUNK_ALIGNMENT)
+    
+    if drive.auth.access_token_expired:
+        drive.auth.Refresh()
+    http = drive.auth.Get_Http_Object()
+    
+    state_path = _upload_state_path(local_path)
+    offset = 0
+    session_uri = None
+    
+    if resume:
+        state = _load_state(state_path)
+        if (state and state.get('size') == total_size and state.get('mtime') == mtime
+                and state.get('metadata') == metadata):
+            acked, resource = _query_upload_offset_with_retry(
+                http, state['session_uri'], total_size
+            )
+            if resource is not None:
+                os.remove(state_path)
+                return resource
+            if acked is not None:
+                session_uri = state['session_uri']
+                offset = acked
+    
+    if session_uri is None:
+        session_uri = _start_upload_session(http, metadata, total_size, mime_type)
+        _save_state(state_path, {
+            'session_uri': session_uri,
+            'size': total_size,
+            'mtime': mtime,
+            'metadata': metadata,
+        })
+    
+    if callback:
+        callback(offset, total_size)
+    
+    resource = None
+    with open(local_path, 'rb') as f:
+        while resource is None:
+            f.seek(offset)
+            data = f.read(chunk_size)
+            offset, resource = _put_chunk(http, session_uri, data, offset, total_size)
+            
+            if callback:
+                callback(offset, total_size)
+    
+    try:
+        os.remove(state_path)
+    except OSError:
+        pass
+    
+    return resource
+
+
+class ResumableUploadStream(io.RawIOBase):
+    """
+    Writable stream that uploads to Drive through a resumable session.
+    Stream ghi dữ liệu thẳng lên Drive qua resumable session.
+    
+    Bytes written are buffered up to ``chunk_size`` and sent as they fill,
+    so memory stays bounded and the total size need not be known up front.
+    Closing the stream sends the final chunk and completes the upload;
+    leaving a ``with`` block through an exception, or dropping the stream
+    without closing it, abandons it instead.
+    
+    Example:
+        >>> with ResumableUploadStream(drive, {'title': 'out.zip'}) as stream:
+        ...     with zipfile.ZipFile(stream, 'w') as zipf:
+        ...         zipf.write('model.pt')
+        >>> file_id = stream.resource['id']
+    """
+    
+    def __init__(
+        self,
+        drive: GoogleDrive,
+        metadata: Dict[str, Any],
+        mime_type: Optional[str] = None,
+        chunk_size: int = 8 * 1024 * 1024  # 8 MB
+    ):
+        """
+        Open a resumable upload session.
+        
+        Args:
+            drive: Authenticated GoogleDrive instance
+            metadata: Drive v2 file resource (title, parents, ...)
+            mime_type: Content MIME type (default: metadata mimeType or octet-stream)
+            chunk_size: Bytes per request, rounded to a multiple of 256 KB
+        """
+        super().__init__()
+        
+        if drive.auth.access_token_expired:
+            drive.auth.Refresh()
+        
+        self._http = drive.auth.Get_Http_Object()
+        self._chunk_size = max(CHUNK_ALIGNMENT, chunk_size - chunk_size % CHUNK_ALIGNMENT)
+        self._buffer = bytearray()
+        self._sent = 0       # bytes acknowledged by Drive
+        self._position = 0   # bytes written by the caller
+        self._aborted = False
+        self.resource: Optional[Dict[str, Any]] = None
+        
+        mime_type = mime_type or metadata.get('mimeType') or 'application/octet-stream'
+        self._session_uri = _start_upload_session(self._http, metadata, None, mime_type)
+    
+    def writable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed upload stream")
+        
+        self._buffer.extend(data)
+        self._position += len(data)
+        
+        while len(self._buffer) >= self._chunk_size:
+            self._send(self._chunk_size, total_size=None)
+        
+        return len(data)
+    
+    def _send(self, length: int, total_size: Optional[int]) -> None:
+        """Send the first ``length`` buffered bytes and drop what Drive acknowledged."""
+        offset, resource = _put_chunk(
+            self._http, self._session_uri, bytes(self._buffer[:length]),
+            self._sent, total_size
+        )
+        del self._buffer[:offset - self._sent]
+        self._sent = offset
+        if resource is not None:
+            self.resource = resource
+    
+    def abort(self) -> None:
+        """Close without completing the upload; the session is left to expire."""
+        self._aborted = True
+        self.close()
+    
+    def close(self) -> None:
+        if not self.closed and not self._aborted:
+            # Final request carries the total size, which completes the file
+            while self.resource is None:
+                self._send(len(self._buffer), total_size=self._position)
+        super().close()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+    
+    def __del__(self):
+        # IOBase.__del__ calls close(), which would complete a file the
+        # caller never finished writing
+        self._aborted = True
+        super().__del__()
+
+
+PARTIAL_SUFFIX = '.part'
+
+
+def download_resumable(
+    drive: GoogleDrive,
+    file_id: str,
+    output_path: str,
+    file_size: int,
+    md5_checksum: Optional[str] = None,
+    modified_date: Optional[str] = None,
+    chunk_size: int = 32 * 1024 * 1024,  # 32 MB
+    callback: Optional[Callable[[int, int], None]] = None
+) -> str:
+    """
+    Download a file into '<output>.part', resuming an earlier partial download.
+    Download file, tiếp tục từ file tải dở nếu có.
+    
+    A '<output>.part.json' file records the remote md5Checksum, modifiedDate
+    and fileSize the partial belongs to. If they still match, the download
+    continues with a Range request from the partial's length; otherwise
+    the stale partial is discarded. The partial is renamed to
+    ``output_path`` only after the MD5 check passes.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        file_id: File ID to download
+        output_path: Final local path
+        file_size: Size of the file in bytes (Drive 'fileSize')
+        md5_checksum: Expected MD5 (Drive 'md5Checksum'); verified if given
+        modified_date: Remote 'modifiedDate' the partial is tied to
+        chunk_size: Bytes per Range request (default: 32 MB)
+        callback: Progress callback (current, total)
+    
+    Returns:
+        str: Downloaded file path
+    """
+    partial_path = output_path + PARTIAL_SUFFIX
+    state_path = partial_path + '.json'
+    remote = {
+        'id': file_id,
+        'fileSize': file_size,
+        'md5Checksum': md5_checksum,
+        'modifiedDate': modified_date,
+    }
+    
+    offset = 0
+    if os.path.exists(partial_path):
+        if _load_state(state_path) == remote:
+            offset = os.path.getsize(partial_path)
+        if offset > file_size or offset == 0:
+            offset = 0
+            os.remove(partial_path)
+    
+    _save_state(state_path, remote)
+    
+    if drive.auth.access_token_expired:
+        drive.auth.Refresh()
+    http = drive.auth.Get_Http_Object()
+    url = MEDIA_URL.format(file_id=file_id)
+    
+    if callback:
+        callback(offset, file_size)
+    
+    with open(partial_path, 'ab') as f:
+        while offset < file_size:
+            end = min(offset + chunk_size, file_size) - 1
+            _, content = _request_with_retry(
+                http, url,
+                headers={'Range': f'bytes={offset}-{end}'},
+                expected=(206,)
+            )
+            if not content:
+                raise RuntimeError(f"Empty response for bytes {offset}-{end}")
+            
+            f.write(content)
+            f.flush()
+            offset += len(content)
+            
+            if callback:
+                callback(offset, file_size)
+    
+    if md5_checksum:
+        from .utils import compute_md5
+        
+        local_md5 = compute_md5(partial_path)
+        if local_md5 != md5_checksum:
+            os.remove(partial_path)
+            os.remove(state_path)
+            raise RuntimeError(
+                f"MD5 mismatch for '{output_path}': "
+                f"expected {md5_checksum}, got {local_md5}"
+            )
+    
+    os.replace(partial_path, output_path)
+    os.remove(state_path)
+    
+    if md5_checksum:
+        _remember_md5(output_path, local_md5)
+    
+    return output_path
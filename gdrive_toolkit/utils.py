@@ -3,9 +3,11 @@ Utility functions for gdrive-toolkit.
 Các hàm tiện ích cho gdrive-toolkit.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Union
 import os
 import sys
+import time
+import threading
 import mimetypes
 
 
@@ -100,6 +102,29 @@ def get_mime_type(file_path: str) -> str:
     return mime_type or 'application/octet-stream'
 
 
+def compute_md5(file_path: str, block_size: int = 8 * 1024 * 1024) -> str:
+    """
+    Compute the MD5 hex digest of a local file.
+    Tính MD5 của file local.
+    
+    The result is comparable with Drive's 'md5Checksum' field.
+    
+    Args:
+        file_path: Path to file
+        block_size: Bytes read per iteration (default: 8 MB)
+    
+    Returns:
+        str: Lowercase hex MD5 digest
+    """
+    import hashlib
+    
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            md5.update(block)
+    return md5.hexdigest()
+
+
 def guess_mime_type(file_path: str) -> str:
     """
     Guess MIME type from file extension.
@@ -193,12 +218,122 @@ def format_file_size(size_bytes: int) -> str:
     return format_size(size_bytes)
 
 
+def _worker_drive(drive):
+    """
+    Get the GoogleDrive handle for the calling worker thread.
+    Lấy GoogleDrive handle của worker thread hiện tại.
+    
+    The handle shares the credentials of ``drive`` but owns its own
+    authorized HTTP transport, because httplib2.Http is not thread-safe.
+    See auth.DriveHandleFactory.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+    
+    Returns:
+        GoogleDrive: Handle bound to the same account, for this thread only
+    """
+    from .auth import get_handle_factory
+    
+    return get_handle_factory(drive).get()
+
+
+def _run_transfer_pool(
+    drive,
+    items: List[Any],
+    transfer: Callable[[Any, Any], Any],
+    max_workers: int,
+    describe: Callable[[Any], str],
+    verbose: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Run ``transfer(worker_drive, item)`` for every item on a bounded thread pool.
+    Chạy transfer cho từng item trên thread pool giới hạn.
+    
+    Each worker thread lazily creates its own Drive handle. Exceptions are
+    caught per item so one failure never aborts the batch.
+    
+    Args:
+        drive: Authenticated GoogleDrive instance
+        items: Work items, one per transfer
+        transfer: Function called as transfer(worker_drive, item)
+        max_workers: Number of worker threads
+        describe: Function returning a short label for an item
+        verbose: Print one line per finished item
+    
+    Returns:
+        List[Dict]: One entry per item, in input order, with keys
+        'item', 'result', 'error' and 'elapsed'
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    from .auth import get_handle_factory
+    
+    # Refresh once up front so workers never race on an expired token
+    if drive.auth.access_token_expired:
+        get_handle_factory(drive).refresh()
+    
+    local = threading.local()
+    total = len(items)
+    done = 0
+    done_lock = threading.Lock()
+    
+    def run(item):
+        if getattr(local, 'drive', None) is None:
+            local.drive = _worker_drive(drive)
+        start = time.time()
+        try:
+            return {'item': item, 'result': transfer(local.drive, item),
+                    'error': None, 'elapsed': time.time() - start}
+        except Exception as e:
+            return {'item': item, 'result': None,
+                    'error': str(e), 'elapsed': time.time() - start}
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * total
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run, item): i for i, item in enumerate(items)}
+        
+        for future in as_completed(futures):
+            entry = future.result()
+            results[futures[future]] = entry
+            
+            if verbose:
+                with done_lock:
+                    done += 1
+                    status = '✓' if entry['error'] is None else '✗'
+                    detail = '' if entry['error'] is None else f": {entry['error']}"
+                    print(f"[{done}/{total}] {status} {describe(entry['item'])}{detail}")
+    
+    return results  # type: ignore
+
+
+def _print_throughput(
+    label: str,
+    succeeded: int,
+    total: int,
+    total_bytes: int,
+    elapsed: float,
+    workers: int
+) -> None:
+    """Print an aggregate throughput summary for a batch transfer."""
+    files_per_sec = succeeded / elapsed if elapsed > 0 else 0.0
+    bytes_per_sec = total_bytes / elapsed if elapsed > 0 else 0.0
+    
+    print(f"📊 {label} {succeeded}/{total} files, {format_size(total_bytes)} "
+          f"in {elapsed:.1f}s with {workers} worker(s)")
+    print(f"   Throughput: {files_per_sec:.2f} files/s, {format_size(bytes_per_sec)}/s")
+
+
 def batch_upload(
     drive,
     file_paths: List[str],
     folder_id: Optional[str] = None,
-    verbose: bool = True
-) -> List[str]:
+    verbose: bool = True,
+    max_workers: int = 1,
+    return_report: bool = False,
+    if_changed: bool = False
+) -> Union[List[str], Dict[str, Any]]:
     """
     Upload multiple files at once.
     Upload nhiều file cùng lúc.
@@ -208,75 +343,335 @@ def batch_upload(
         file_paths: List of file paths to upload
         folder_id: Target folder ID
         verbose: Print progress
+        max_workers: Number of concurrent upload threads (default: 1, serial).
+                     Each worker gets its own authorized Drive handle.
+        return_report: Return a report dict instead of the list of IDs
+        if_changed: Skip files whose same-named copy in the folder has the
+                    same size and MD5, update the others in place. The
+                    folder is listed once for the whole batch.
     
     Returns:
-        List[str]: List of uploaded file IDs
+        List[str]: List of uploaded file IDs, in input order
+        
+        With return_report=True, a dict with keys:
+            'file_ids': uploaded IDs in input order
+            'results': per-file dicts ('path', 'id', 'error', 'size',
+                       'skipped', 'elapsed')
+            'failed': {path: error message} for failed files
+            'skipped': number of files left alone by if_changed
+            'total_bytes', 'elapsed', 'files_per_sec', 'bytes_per_sec':
+                counting only the files actually sent
+    
+    Example:
+        >>> report = batch_upload(drive, paths, folder_id="xyz789",
+        ...                       max_workers=8, return_report=True)
+        >>> print(report['failed'])
     """
-    from .operations import upload_file
+    from .operations import upload_file, _compare_with_remote, _list_folder_files
     
-    file_ids = []
     total = len(file_paths)
     
     if verbose:
         print(f"Uploading {total} file(s)...")
     
-    for i, file_path in enumerate(file_paths, 1):
-        if verbose:
-            print(f"\n[{i}/{total}] Uploading {os.path.basename(file_path)}...")
+    start_time = time.time()
+    
+    # List the target folder once instead of once per file
+    remote_files = _list_folder_files(drive, folder_id) if if_changed else None
+    
+    def upload_one(worker_drive, file_path, show_progress=True):
+        """Upload one file; returns (file ID, skipped as unchanged)."""
+        if remote_files is not None:
+            remote = remote_files.get(os.path.basename(file_path))
+            if _compare_with_remote(file_path, remote) == 'skip':
+                if verbose:
+                    print(f"⏭ Skipped '{os.path.basename(file_path)}' "
+                          f"(unchanged, ID: {remote['id']})")  # type: ignore
+                return remote['id'], True  # type: ignore
         
-        try:
-            file_id = upload_file(drive, file_path, folder_id=folder_id)
-            file_ids.append(file_id)
-        except Exception as e:
-            print(f"✗ Failed to upload {file_path}: {e}")
+        file_id = upload_file(worker_drive, file_path, folder_id=folder_id,
+                              show_progress=show_progress, if_changed=if_changed,
+                              remote_files=remote_files)
+        return file_id, False
+    
+    if max_workers > 1 and total > 1:
+        workers = min(max_workers, total)
+        
+        def transfer(worker_drive, file_path):
+            return upload_one(worker_drive, file_path, show_progress=False)
+        
+        entries = _run_transfer_pool(
+            drive, file_paths, transfer, workers,
+            describe=os.path.basename, verbose=verbose
+        )
+    else:
+        workers = 1
+        entries = []
+        
+        for i, file_path in enumerate(file_paths, 1):
+            if verbose:
+                print(f"\n[{i}/{total}] Uploading {os.path.basename(file_path)}...")
+            
+            file_start = time.time()
+            try:
+                result = upload_one(drive, file_path)
+                entries.append({'item': file_path, 'result': result, 'error': None,
+                                'elapsed': time.time() - file_start})
+            except Exception as e:
+                print(f"✗ Failed to upload {file_path}: {e}")
+                entries.append({'item': file_path, 'result': None, 'error': str(e),
+                                'elapsed': time.time() - file_start})
+    
+    elapsed = time.time() - start_time
+    
+    results = []
+    for entry in entries:
+        file_path = entry['item']
+        file_id, skipped = entry['result'] or (None, False)
+        size = os.path.getsize(file_path) if entry['error'] is None else 0
+        results.append({
+            'path': file_path,
+            'id': file_id,
+            'error': entry['error'],
+            'size': size,
+            'skipped': skipped,
+            'elapsed': entry['elapsed'],
+        })
+    
+    file_ids = [r['id'] for r in results if r['error'] is None]
+    failed = {r['path']: r['error'] for r in results if r['error'] is not None}
+    skipped = sum(1 for r in results if r['skipped'])
+    # Only count what was actually sent
+    uploaded = len(file_ids) - skipped
+    total_bytes = sum(r['size'] for r in results if not r['skipped'])
     
     if verbose:
-        print(f"\n✓ Successfully uploaded {len(file_ids)}/{total} files")
+        print(f"\n✓ Successfully uploaded {len(file_ids)}/{total} files"
+              + (f" ({skipped} unchanged)" if skipped else ""))
+        _print_throughput("Uploaded", uploaded, total - skipped, total_bytes, elapsed, workers)
+    
+    if return_report:
+        return {
+            'file_ids': file_ids,
+            'results': results,
+            'failed': failed,
+            'skipped': skipped,
+            'total_bytes': total_bytes,
+            'elapsed': elapsed,
+            'files_per_sec': uploaded / elapsed if elapsed > 0 else 0.0,
+            'bytes_per_sec': total_bytes / elapsed if elapsed > 0 else 0.0,
+        }
     
     return file_ids
 
 
+def _unique_file_names(titles: List[str]) -> List[str]:
+    """
+    Map Drive titles to unique local file names, deterministically.
+    Tạo tên file local không trùng lặp.
+    
+    The first occurrence of a title keeps it; later ones get " (1)",
+    " (2)", ... inserted before the extension, in input order, skipping
+    any name another file already uses. Path separators in titles are
+    replaced so every file stays in one directory.
+    
+    Args:
+        titles: Drive titles in input order
+    
+    Returns:
+        List[str]: Unique file names, same order as ``titles``
+    """
+    cleaned = [t.replace('/', '_').replace(os.sep, '_') or 'untitled' for t in titles]
+    taken = set(cleaned)
+    seen = set()
+    names = []
+    
+    for title in cleaned:
+        name = title
+        if title in seen:
+            stem, ext = os.path.splitext(title)
+            counter = 1
+            while name in taken:
+                name = f"{stem} ({counter}){ext}"
+                counter += 1
+            taken.add(name)
+        seen.add(title)
+        names.append(name)
+    
+    return names
+
+
 def batch_download(
     drive,
     file_ids: List[str],
     save_dir: str = ".",
-    verbose: bool = True
-) -> List[str]:
+    verbose: bool = True,
+    max_workers: int = 1,
+    return_report: bool = False,
+    skip_unchanged: bool = False
+) -> Union[List[str], Dict[str, Any]]:
     """
     Download multiple files at once.
     Download nhiều file cùng lúc.
     
+    Metadata for all files is fetched up front in batched requests; with
+    max_workers > 1 contents are then streamed concurrently into
+    ``save_dir``. Files sharing a title are saved as "name (1).ext",
+    "name (2).ext", ... in input order.
+    
     Args:
         drive: Authenticated GoogleDrive instance
         file_ids: List of file IDs to download
         save_dir: Directory to save files
         verbose: Print progress
+        max_workers: Number of concurrent download threads (default: 1, serial)
+        return_report: Return a report dict instead of the list of paths
+        skip_unchanged: Skip files whose local copy already has the remote
+                        size and MD5. Local hashes come from a persistent
+                        cache keyed on path, mtime and size.
     
     Returns:
-        List[str]: List of downloaded file paths
+        List[str]: List of downloaded file paths, in input order
+        
+        With return_report=True, a dict with keys:
+            'paths': downloaded paths in input order
+            'results': per-file dicts ('id', 'path', 'error', 'size',
+                       'skipped', 'elapsed')
+            'failed': {file_id: error message} for failed files
+            'skipped': number of files left alone by skip_unchanged
+            'total_bytes', 'elapsed', 'files_per_sec', 'bytes_per_sec':
+                counting only the files actually downloaded
+    
+    Example:
+        >>> paths = batch_download(drive, shard_ids, save_dir="./shards",
+        ...                        max_workers=16)
     """
     from .operations import download_file
     
     os.makedirs(save_dir, exist_ok=True)
     
-    downloaded_paths = []
     total = len(file_ids)
     
     if verbose:
         print(f"Downloading {total} file(s)...")
     
-    for i, file_id in enumerate(file_ids, 1):
-        if verbose:
-            print(f"\n[{i}/{total}] Downloading file ID: {file_id}...")
+    start_time = time.time()
+    
+    from .operations import _fetch_metadata_batch, _is_unchanged_local
+    
+    if verbose:
+        print("Fetching metadata...")
+    
+    metadata = _fetch_metadata_batch(
+        drive, file_ids,
+        fields='id,title,fileSize,mimeType,md5Checksum,modifiedDate'
+    )
+    
+    # Resolved for both modes so same-titled files never overwrite each other
+    titles = []
+    for file_id in file_ids:
+        meta = metadata.get(file_id)
+        titles.append(meta['title'] if isinstance(meta, dict) else file_id)
+    names = _unique_file_names(titles)
+    
+    items = [
+        {'id': file_id, 'meta': metadata.get(file_id),
+         'path': os.path.join(save_dir, name)}
+        for file_id, name in zip(file_ids, names)
+    ]
+    
+    def is_unchanged(item):
+        """Raise if metadata failed; True if the local copy can be kept."""
+        meta = item['meta']
+        if not isinstance(meta, dict):
+            raise meta if isinstance(meta, Exception) else FileNotFoundError(item['id'])
         
-        try:
-            path = download_file(drive, file_id=file_id, save_path=save_dir)
-            downloaded_paths.append(path)
-        except Exception as e:
-            print(f"✗ Failed to download {file_id}: {e}")
+        if skip_unchanged and _is_unchanged_local(item['path'], meta):
+            if verbose:
+                print(f"⏭ Skipped '{os.path.basename(item['path'])}' (unchanged)")
+            return True
+        return False
+    
+    if max_workers > 1 and total > 1:
+        workers = min(max_workers, total)
+        
+        def transfer(worker_drive, item):
+            """Download one file; returns (path, skipped as unchanged)."""
+            if is_unchanged(item):
+                return item['path'], True
+            
+            gfile = worker_drive.CreateFile({'id': item['id']})
+            gfile.GetContentFile(item['path'])
+            return item['path'], False
+        
+        entries = _run_transfer_pool(
+            drive, items, transfer, workers,
+            describe=lambda item: os.path.basename(item['path']),
+            verbose=verbose
+        )
+        
+        for entry in entries:
+            entry['item'] = entry['item']['id']
+    else:
+        workers = 1
+        entries = []
+        
+        for i, item in enumerate(items, 1):
+            file_id = item['id']
+            if verbose:
+                print(f"\n[{i}/{total}] Downloading file ID: {file_id}...")
+            
+            file_start = time.time()
+            try:
+                if is_unchanged(item):
+                    result = item['path'], True
+                else:
+                    result = download_file(drive, file_id=file_id, save_path=item['path']), False
+                entries.append({'item': file_id, 'result': result, 'error': None,
+                                'elapsed': time.time() - file_start})
+            except Exception as e:
+                print(f"✗ Failed to download {file_id}: {e}")
+                entries.append({'item': file_id, 'result': None, 'error': str(e),
+                                'elapsed': time.time() - file_start})
+    
+    elapsed = time.time() - start_time
+    
+    results = []
+    for entry in entries:
+        path, skipped = entry['result'] or (None, False)
+        results.append({
+            'id': entry['item'],
+            'path': path,
+            'error': entry['error'],
+            'size': os.path.getsize(path) if entry['error'] is None else 0,
+            'skipped': skipped,
+            'elapsed': entry['elapsed'],
+        })
+    
+    downloaded_paths = [r['path'] for r in results if r['error'] is None]
+    failed = {r['id']: r['error'] for r in results if r['error'] is not None}
+    skipped = sum(1 for r in results if r['skipped'])
+    # Only count what was actually fetched
+    downloaded = len(downloaded_paths) - skipped
+    total_bytes = sum(r['size'] for r in results if not r['skipped'])
     
     if verbose:
-        print(f"\n✓ Successfully downloaded {len(downloaded_paths)}/{total} files")
+        print(f"\n✓ Successfully downloaded {len(downloaded_paths)}/{total} files"
+              + (f" ({skipped} unchanged)" if skipped else ""))
+        _print_throughput("Downloaded", downloaded, total - skipped, total_bytes,
+                          elapsed, workers)
+    
+    if return_report:
+        return {
+            'paths': downloaded_paths,
+            'results': results,
+            'failed': failed,
+            'skipped': skipped,
+            'total_bytes': total_bytes,
+            'elapsed': elapsed,
+            'files_per_sec': downloaded / elapsed if elapsed > 0 else 0.0,
+            'bytes_per_sec': total_bytes / elapsed if elapsed > 0 else 0.0,
+        }
     
     return downloaded_paths
 
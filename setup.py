@@ -31,6 +31,9 @@ setup(
     ],
     python_requires=">=3.9",
     install_requires=requirements,
+    extras_require={
+        'async': ['aiohttp>=3.8'],
+    },
     entry_points={
         'console_scripts': [
             'gdrive-toolkit=gdrive_toolkit.cli:main',
@@ -0,0 +1,192 @@
+"""
+Tests for the asyncio client (offline, with a fake HTTP session).
+Kiểm tra client async.
+"""
+
+import asyncio
+import json
+
+from gdrive_toolkit.aio import AsyncDriveClient
+from gdrive_toolkit.cache import get_metadata_cache, set_metadata_cache
+
+
+class _FakeContent:
+    def __init__(self, body):
+        self.body = body
+    
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+
+class _FakeResponse:
+    def __init__(self, status, body=b'', headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.content = _FakeContent(body)
+    
+    async def read(self):
+        return self.body
+    
+    async def __aenter__(self):
+        await asyncio.sleep(0.01)
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    """Answers from a handler and records concurrency and requests."""
+    
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        session = self
+        
+        class _Context:
+            async def __aenter__(self):
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                self.resp = await session.handler(method, url, kwargs).__aenter__()
+                return self.resp
+            
+            async def __aexit__(self, *exc):
+                session.in_flight -= 1
+                return False
+        
+        return _Context()
+
+
+class _FakeCredentials:
+    access_token = 'token-1'
+
+
+class _FakeAuth:
+    access_token_expired = False
+    
+    def __init__(self):
+        self.credentials = _FakeCredentials()
+        self.refreshes = 0
+    
+    def Refresh(self):
+        self.refreshes += 1
+        self.credentials.access_token = f'token-{self.refreshes + 1}'
+
+
+class _FakeDrive:
+    def __init__(self):
+        self.auth = _FakeAuth()
+
+
+def _run(coro):
+    previous = get_metadata_cache()
+    set_metadata_cache(None)
+    try:
+        return asyncio.run(coro)
+    finally:
+        set_metadata_cache(previous)
+
+
+def test_concurrency_is_bounded_and_failures_retried(monkeypatch):
+    """Requests never exceed max_concurrency; 503 and 401 are retried."""
+    import gdrive_toolkit.aio as aio
+    
+    # Skip backoff delays (>= 1 s) but keep the fake network latency
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(aio.asyncio, 'sleep', lambda s: real_sleep(0) if s >= 1 else real_sleep(s))
+    calls = {}
+    
+    def handler(method, url, kwargs):
+        file_id = url.rsplit('/', 1)[1]
+        calls[file_id] = calls.get(file_id, 0) + 1
+        if file_id == 'busy' and calls[file_id] == 1:
+            return _FakeResponse(503, b'{}')
+        if file_id == 'stale' and kwargs['headers']['Authorization'] == 'Bearer token-1':
+            return _FakeResponse(401, b'{}')
+        return _FakeResponse(200, json.dumps({'id': file_id}).encode())
+    
+    session = _FakeSession(handler)
+    drive = _FakeDrive()
+    
+    async def main():
+        client = AsyncDriveClient(drive, max_concurrency=3, session=session)
+        ids = [f"f{i}" for i in range(10)] + ['busy', 'stale']
+        return await asyncio.gather(*(client.get_file(i) for i in ids))
+    
+    results = _run(main())
+    
+    assert [r['id'] for r in results][-2:] == ['busy', 'stale']
+    assert session.max_in_flight == 3
+    assert calls['busy'] == 2 and calls['stale'] == 2
+    assert drive.auth.refreshes == 1
+
+
+def test_upload_and_atomic_download(tmp_path):
+    """Small uploads are one multipart request; downloads land atomically."""
+    source = tmp_path / "data.csv"
+    source.write_bytes(b"a,b\n1,2\n")
+    
+    def handler(method, url, kwargs):
+        if method == 'POST':
+            assert kwargs['params']['uploadType'] == 'multipart'
+            assert b'"title": "data.csv"' in kwargs['data'] and b"a,b\n1,2\n" in kwargs['data']
+            return _FakeResponse(200, b'{"id": "new1"}')
+        if kwargs['params'].get('alt') == 'media':
+            return _FakeResponse(200, b"x" * 3000)
+        return _FakeResponse(200, b'{"id": "new1", "title": "copy.bin"}')
+    
+    async def main():
+        client = AsyncDriveClient(_FakeDrive(), session=_FakeSession(handler))
+        file_id = await client.upload_file(str(source), parent_id='P')
+        path = await client.download_file(file_id, str(tmp_path))
+        return file_id, path
+    
+    file_id, path = _run(main())
+    
+    assert file_id == 'new1'
+    assert path == str(tmp_path / "copy.bin")
+    assert (tmp_path / "copy.bin").read_bytes() == b"x" * 3000
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['copy.bin', 'data.csv']
+
+
+def test_resumable_upload_resyncs_after_server_error(tmp_path, monkeypatch):
+    """After a 503 on a chunk, the session offset is queried, not the range resent."""
+    import gdrive_toolkit.aio as aio
+    
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(aio.asyncio, 'sleep', lambda s: real_sleep(0))
+    monkeypatch.setattr(aio, 'MULTIPART_LIMIT', 4)
+    monkeypatch.setattr(aio, 'UPLOAD_CHUNK_SIZE', 4)
+    source = tmp_path / "big.bin"
+    source.write_bytes(b"0123456789")
+    
+    replies = {
+        'bytes 0-3/10': (308, 'bytes=0-3'),
+        'bytes 4-7/10': (503, None),
+        # Drive kept the first two bytes of the failed chunk
+        'bytes */10': (308, 'bytes=0-5'),
+        'bytes 6-9/10': (200, None),
+    }
+    ranges = []
+    
+    def handler(method, url, kwargs):
+        if method == 'POST':
+            return _FakeResponse(200, b'{}', {'Location': 'https://upload/session'})
+        content_range = kwargs['headers']['Content-Range']
+        ranges.append(content_range)
+        status, acked = replies[content_range]
+        return _FakeResponse(status, b'{"id": "big1"}', {'range': acked} if acked else {})
+    
+    async def main():
+        client = AsyncDriveClient(_FakeDrive(), session=_FakeSession(handler))
+        return await client.upload_file(str(source))
+    
+    assert _run(main()) == 'big1'
+    assert ranges == ['bytes 0-3/10', 'bytes 4-7/10', 'bytes */10', 'bytes 6-9/10']
@@ -0,0 +1,97 @@
+"""
+Tests for batched Drive API calls.
+Kiểm tra batch request.
+"""
+
+import json
+
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+from gdrive_toolkit import batch as batch_module
+from gdrive_toolkit.batch import BatchExecutor
+
+
+def _http_error(status, reason=''):
+    content = json.dumps({'error': {'errors': [{'reason': reason}]}}).encode()
+    return HttpError(Response({'status': status}), content)
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.calls = []
+    
+    def add(self, request, request_id):
+        self.calls.append((request_id, request))
+    
+    def execute(self, http=None):
+        self.service.batches.append([request for _, request in self.calls])
+        for request_id, request in self.calls:
+            outcome = self.service.outcomes[request].pop(0)
+            if isinstance(outcome, Exception):
+                self.callback(request_id, None, outcome)
+            else:
+                self.callback(request_id, outcome, None)
+
+
+class _FakeService:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.batches = []
+    
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+
+class _FakeAuth:
+    http = None
+    
+    def __init__(self, service):
+        self.service = service
+
+
+class _FakeDrive:
+    def __init__(self, outcomes):
+        self.auth = _FakeAuth(_FakeService(outcomes))
+
+
+def test_batch_executor_chunks_and_retries_transient_failures(monkeypatch):
+    """Only rate-limited and 5xx calls are resent; others fail per item."""
+    monkeypatch.setattr(batch_module.time, 'sleep', lambda seconds: None)
+    outcomes = {
+        'a': [{'id': 'a'}],
+        'b': [_http_error(429), {'id': 'b'}],
+        'c': [_http_error(403, 'userRateLimitExceeded'), _http_error(503), {'id': 'c'}],
+        'd': [_http_error(404, 'notFound')],
+        'e': [_http_error(403, 'insufficientFilePermissions')],
+    }
+    drive = _FakeDrive(outcomes)
+    
+    executor = BatchExecutor(drive, batch_size=2)
+    for name in outcomes:
+        executor.add(name, key=name.upper())
+    results = executor.execute()
+    
+    assert list(results) == ['A', 'B', 'C', 'D', 'E']
+    assert results['A'] == {'id': 'a'} and results['B'] == {'id': 'b'} and results['C'] == {'id': 'c'}
+    assert results['D'].resp.status == 404
+    assert results['E'].resp.status == 403
+    # 3 chunks of up to 2, then 'b'+'c' together, then 'c' alone
+    assert drive.auth.service.batches == [['a', 'b'], ['c', 'd'], ['e'], ['b', 'c'], ['c']]
+    assert executor.retried == 3
+    assert len(executor) == 0
+
+
+def test_batch_executor_gives_up_after_max_retries(monkeypatch):
+    """A call that keeps failing reports its last error."""
+    monkeypatch.setattr(batch_module.time, 'sleep', lambda seconds: None)
+    drive = _FakeDrive({'x': [_http_error(500)] * 3})
+    
+    executor = BatchExecutor(drive, max_retries=2)
+    executor.add('x')
+    results = executor.execute()
+    
+    assert results[0].resp.status == 500
+    assert len(drive.auth.service.batches) == 3
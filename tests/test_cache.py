@@ -0,0 +1,163 @@
+"""
+Tests for the caching helpers.
+Kiểm tra các bộ nhớ đệm.
+"""
+
+import os
+import stat
+import time
+
+from gdrive_toolkit.cache import (
+    HashCache, MetadataCache, FolderCache, TokenCache, get_metadata_cache, set_metadata_cache,
+)
+from gdrive_toolkit.utils import compute_md5
+
+
+def test_hash_cache_reuses_and_invalidates(tmp_path):
+    """Hash is served from cache until the file's size or mtime changes."""
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(b"hello")
+    
+    cache = HashCache(str(tmp_path / "hashes.sqlite"))
+    assert cache.get(str(file_path)) is None
+    assert cache.md5(str(file_path)) == compute_md5(str(file_path))
+    
+    # A bogus entry for the current mtime/size is trusted as-is
+    cache.put(str(file_path), "cached")
+    assert cache.md5(str(file_path)) == "cached"
+    
+    file_path.write_bytes(b"hello world")
+    assert cache.get(str(file_path)) is None
+    assert cache.md5(str(file_path)) == compute_md5(str(file_path))
+    cache.close()
+
+
+def test_hash_cache_persists(tmp_path):
+    """Entries survive reopening the database."""
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(b"payload")
+    db_path = str(tmp_path / "hashes.sqlite")
+    
+    cache = HashCache(db_path)
+    md5 = cache.md5(str(file_path))
+    cache.close()
+    
+    reopened = HashCache(db_path)
+    assert reopened.get(str(file_path)) == md5
+    reopened.close()
+
+
+def test_metadata_cache_ttl_lru_and_stats(monkeypatch):
+    """Entries expire after the TTL and the least recently used is evicted."""
+    import gdrive_toolkit.cache as cache_module
+    
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    
+    cache = MetadataCache(max_entries=2, ttl=10)
+    cache.put('a', {'id': 'a', 'parents': [{'id': 'root'}]})
+    cache.put('b', {'id': 'b'})
+    
+    # Returned copies can't corrupt the cache
+    cache.get('a')['parents'].clear()
+    assert cache.get('a')['parents'] == [{'id': 'root'}]
+    
+    cache.put('c', {'id': 'c'})  # evicts 'b', the least recently used
+    assert cache.get('b') is None
+    
+    now[0] += 11
+    assert cache.get('a') is None
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'size': 1}
+
+
+def test_fetch_file_uses_metadata_cache():
+    """Repeat lookups are served from the cache until invalidated."""
+    from gdrive_toolkit.operations import _fetch_file, _invalidate_metadata
+    
+    class FakeFile(dict):
+        def FetchMetadata(self):
+            drive.fetches += 1
+            self.update(title='data.csv')
+    
+    class FakeDrive:
+        auth = None
+        fetches = 0
+        
+        def CreateFile(self, metadata):
+            return FakeFile(metadata)
+    
+    drive = FakeDrive()
+    previous = get_metadata_cache()
+    set_metadata_cache(MetadataCache())
+    try:
+        assert _fetch_file(drive, 'abc')['title'] == 'data.csv'
+        assert _fetch_file(drive, 'abc')['title'] == 'data.csv'
+        assert drive.fetches == 1
+        
+        _invalidate_metadata('abc')
+        _fetch_file(drive, 'abc')
+        assert drive.fetches == 2
+        assert get_metadata_cache().stats()['hits'] == 1
+    finally:
+        set_metadata_cache(previous)
+
+
+def test_folder_cache_negative_ttl_and_listing(monkeypatch):
+    """Missing names expire; a listed parent answers every name."""
+    import gdrive_toolkit.cache as cache_module
+    
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    
+    cache = FolderCache(negative_ttl=30)
+    assert cache.get('root', 'Projects') == (False, None)
+    
+    cache.put('root', 'Projects', None)
+    assert cache.get('root', 'Projects') == (True, None)
+    now[0] += 31
+    assert cache.get('root', 'Projects') == (False, None)
+    
+    cache.prefill('P', [('2025', 'y1'), ('2025', 'y2')])
+    assert cache.get('P', '2025') == (True, 'y1')
+    assert cache.get('P', '2026') == (True, None)
+    
+    cache.invalidate('y1')
+    assert cache.get('P', '2025') == (True, None)
+    cache.invalidate('P')
+    assert cache.get('P', '2026') == (False, None)
+
+
+def test_folder_cache_found_folders_expire(monkeypatch):
+    """A folder trashed outside the toolkit stops resolving after ttl."""
+    import gdrive_toolkit.cache as cache_module
+    
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    
+    cache = FolderCache(ttl=300)
+    cache.put('root', 'Projects', 'p1')
+    cache.prefill('p1', [('2025', 'y1')])
+    now[0] += 299
+    assert cache.get('root', 'Projects') == (True, 'p1')
+    now[0] += 2
+    assert cache.get('root', 'Projects') == (False, None)
+    assert cache.get('p1', '2025') == (False, None)
+
+
+def test_token_cache_respects_min_validity(tmp_path):
+    """Tokens are shared through the file and dropped when close to expiry."""
+    db_path = str(tmp_path / "tokens.sqlite")
+    cache = TokenCache(db_path)
+    expiry = time.time() + 120
+    cache.put('key', 'token', expiry)
+    
+    # Another process opening the same file sees the token
+    other = TokenCache(db_path)
+    assert other.get('key', min_validity=60) == ('token', expiry)
+    assert other.get('key', min_validity=300) is None
+    assert stat.S_IMODE(os.stat(db_path).st_mode) == 0o600
+    
+    cache.invalidate('key')
+    assert other.get('key', min_validity=0) is None
+    cache.close()
+    other.close()
@@ -0,0 +1,155 @@
+"""
+Tests for the CLI daemon.
+Kiểm tra daemon của CLI.
+"""
+
+import io
+import os
+import socket
+import stat
+import threading
+
+import pytest
+
+from gdrive_toolkit import client
+from gdrive_toolkit.daemon import DriveDaemon, forward, request
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    drive = object()
+    server = DriveDaemon(drive, str(tmp_path / "d.sock"))
+    server.bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    request({'op': 'stop'}, server.socket_path)
+    thread.join(timeout=5)
+
+
+def test_forward_runs_command_with_daemon_session(daemon, monkeypatch, tmp_path):
+    """Forwarded commands use the daemon's handle and relay their output."""
+    calls = []
+    
+    def fake_list_folder(drive, parent_id, max_results):
+        calls.append((drive, parent_id))
+        return [{'title': 'a.txt', 'id': 'A', 'mimeType': 'text/plain', 'size': '5'}]
+    monkeypatch.setattr(client, 'list_folder', fake_list_folder)
+    
+    out, err = io.StringIO(), io.StringIO()
+    code = forward(['ls', 'F'], daemon.socket_path, stdout=out, stderr=err)
+    
+    assert code == 0
+    assert calls == [(daemon.drive, 'F')]
+    assert "a.txt" in out.getvalue() and "Authenticating" not in out.getvalue()
+    
+    # Errors come back as a non-zero exit code and text on stderr
+    code = forward(['ls', '--limit', 'many'], daemon.socket_path, stdout=out, stderr=err)
+    assert code == 2
+    assert "many" in err.getvalue()
+    
+    status = request({'op': 'status'}, daemon.socket_path)
+    assert status['commands'] == 2
+
+
+def test_prompts_are_answered_by_the_client(daemon, monkeypatch):
+    """input() inside the daemon reads a line from the forwarding client."""
+    answers = []
+    
+    def fake_delete(drive, file_id, confirm=True):
+        answers.append(input(f"Delete {file_id}? [y/N]: "))
+    monkeypatch.setattr(client, 'delete_file_or_folder', fake_delete)
+    
+    out = io.StringIO()
+    code = forward(['delete', 'X'], daemon.socket_path, stdin=io.StringIO("y\n"),
+                   stdout=out, stderr=io.StringIO())
+    
+    assert code == 0
+    assert answers == ['y']
+    assert "Delete X? [y/N]: " in out.getvalue()
+
+
+def test_socket_is_never_reachable_by_other_users(tmp_path, monkeypatch):
+    """The socket is bound inside a 0700 directory and moved into place as 0600."""
+    bound_in = []
+    
+    class _RecordingSocket(socket.socket):
+        def bind(self, path):
+            bound_in.append(stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode))
+            super().bind(path)
+    monkeypatch.setattr(socket, 'socket', _RecordingSocket)
+    
+    # A directory other users can enter, unlike pytest's own tmp_path
+    shared = tmp_path / "run"
+    shared.mkdir()
+    shared.chmod(0o755)
+    
+    server = DriveDaemon(object(), str(shared / "d.sock"))
+    server.bind()
+    server._sock.close()
+    
+    assert bound_in == [0o700]
+    assert stat.S_IMODE(os.stat(server.socket_path).st_mode) == 0o600
+    assert os.listdir(shared) == ["d.sock"]
+
+
+def test_no_daemon_means_run_locally(tmp_path):
+    """Without a listening daemon, forward() declines."""
+    assert forward(['ls'], str(tmp_path / "missing.sock")) is None
+
+
+def test_only_the_commands_own_output_is_relayed(daemon, monkeypatch, capsys):
+    """Prints from the command's threads reach the client; other threads' don't."""
+    go, printed = threading.Event(), threading.Event()
+    
+    def background():
+        go.wait(5)
+        print("token refresh failed")
+        printed.set()
+    threading.Thread(target=background, daemon=True).start()
+    
+    def fake_list_folder(drive, parent_id, max_results):
+        worker = threading.Thread(target=print, args=("from a worker",))
+        worker.start()
+        worker.join()
+        go.set()
+        printed.wait(5)
+        return []
+    monkeypatch.setattr(client, 'list_folder', fake_list_folder)
+    
+    out = io.StringIO()
+    assert forward(['ls', 'F'], daemon.socket_path, stdout=out, stderr=io.StringIO()) == 0
+    
+    assert "from a worker" in out.getvalue()
+    assert "token refresh failed" not in out.getvalue()
+    assert "token refresh failed" in capsys.readouterr().out
+
+
+def test_busy_or_silent_daemon_means_run_locally(daemon, monkeypatch, tmp_path):
+    """forward() declines while another command runs or if nothing answers."""
+    started, release = threading.Event(), threading.Event()
+    
+    def slow_list_folder(drive, parent_id, max_results):
+        started.set()
+        release.wait(5)
+        return []
+    monkeypatch.setattr(client, 'list_folder', slow_list_folder)
+    
+    first = threading.Thread(target=forward, args=(['ls'], daemon.socket_path),
+                             kwargs={'stdout': io.StringIO(), 'stderr': io.StringIO()})
+    first.start()
+    try:
+        assert started.wait(5)
+        assert forward(['ls'], daemon.socket_path) is None
+        assert request({'op': 'status'}, daemon.socket_path)['commands'] == 1
+    finally:
+        release.set()
+        first.join(timeout=5)
+    
+    # Accepts connections but never replies
+    path = str(tmp_path / "silent.sock")
+    silent = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    silent.bind(path)
+    silent.listen(1)
+    with silent:
+        assert forward(['ls'], path, timeout=0.2) is None
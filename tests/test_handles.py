@@ -0,0 +1,161 @@
+"""
+Tests for per-thread Drive handles.
+Kiểm tra handle riêng cho từng thread.
+"""
+
+import datetime
+import gc
+import threading
+import weakref
+import time
+
+import pytest
+from oauth2client.client import OAuth2Credentials
+from pydrive2.auth import GoogleAuth
+from pydrive2.drive import GoogleDrive
+
+from gdrive_toolkit import cache as cache_module
+from gdrive_toolkit.auth import (
+    DriveHandleFactory, authenticate_kaggle, get_handle_factory, start_token_refresher,
+)
+from gdrive_toolkit.cache import TokenCache
+
+
+@pytest.fixture(autouse=True)
+def token_cache(monkeypatch):
+    # Keep tokens out of the user's cache directory
+    cache = TokenCache(':memory:')
+    monkeypatch.setattr(cache_module, '_token_cache', cache)
+    return cache
+
+
+def _drive(expired=False, expires_in=3600):
+    gauth = GoogleAuth(settings=dict(GoogleAuth.DEFAULT_SETTINGS))
+    expiry = datetime.datetime.utcnow() + datetime.timedelta(seconds=-3600 if expired else expires_in)
+    gauth.credentials = OAuth2Credentials(
+        'token-1', 'client-id', 'client-secret', 'refresh-token', expiry,
+        'https://oauth2.googleapis.com/token', None
+    )
+    return GoogleDrive(gauth)
+
+
+def _fake_refresh(credentials, calls):
+    def do_refresh(http):
+        time.sleep(0.05)  # widen the race window
+        calls.append(threading.get_ident())
+        credentials.access_token = f'token-{len(calls) + 1}'
+        credentials.token_expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        credentials.invalid = False
+    credentials._do_refresh_request = do_refresh
+
+
+def test_each_thread_gets_its_own_transport():
+    """Handles are per thread, reused within a thread, and share credentials."""
+    drive = _drive()
+    factory = get_handle_factory(drive)
+    handles = {}
+    
+    def worker(name):
+        handles[name] = (factory.get(), factory.get())
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in 'ab']
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    (a1, a2), (b1, _) = handles['a'], handles['b']
+    assert a1 is a2
+    assert a1 is not b1 and a1.auth.http is not b1.auth.http
+    assert a1.auth.credentials is b1.auth.credentials is drive.auth.credentials
+    assert a1.auth.service is not None
+    # Handles map back to their factory
+    assert get_handle_factory(a1) is factory
+
+
+def test_expired_token_is_refreshed_once_across_threads():
+    """Concurrent refreshes through the factory collapse into one."""
+    drive = _drive(expired=True)
+    calls = []
+    _fake_refresh(drive.auth.credentials, calls)
+    factory = DriveHandleFactory(drive)
+    
+    threads = [threading.Thread(target=factory.refresh) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert len(calls) == 1
+    assert drive.auth.credentials.access_token == 'token-2'
+    
+    # A worker that finds the token expired refreshes it instead of
+    # starting the browser flow
+    handle = factory.get()
+    drive.auth.credentials.token_expiry = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    handle.auth.LocalWebserverAuth()
+    assert len(calls) == 2
+    assert not handle.auth.access_token_expired
+
+
+def test_factory_does_not_keep_handle_alive():
+    """A handle with a factory (and worker handles) is freed once unreferenced."""
+    drive = _drive()
+    get_handle_factory(drive).get()
+    ref = weakref.ref(drive)
+    
+    del drive
+    gc.collect()
+    assert ref() is None
+
+
+def test_kaggle_reuses_cached_token(monkeypatch):
+    """A second connect with the same credentials skips the token endpoint."""
+    calls = []
+    
+    def do_refresh(self, http):
+        calls.append(1)
+        self.access_token = 'fresh-token'
+        self.token_expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    monkeypatch.setattr(OAuth2Credentials, '_do_refresh_request', do_refresh)
+    
+    for _ in range(2):
+        drive = authenticate_kaggle('client-id', 'client-secret', 'refresh-token')
+        assert drive.auth.credentials.access_token == 'fresh-token'
+        assert drive.auth.service is not None
+    assert len(calls) == 1
+
+
+def test_refresher_renews_token_before_expiry():
+    """A token inside the margin is renewed in the background."""
+    drive = _drive(expires_in=30)
+    calls = []
+    _fake_refresh(drive.auth.credentials, calls)
+    
+    refresher = start_token_refresher(drive, margin=300)
+    assert start_token_refresher(drive) is refresher
+    try:
+        deadline = time.time() + 5
+        while not calls and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        refresher.stop()
+    
+    assert len(calls) == 1
+    assert drive.auth.credentials.access_token == 'token-2'
+
+
+def test_refresher_is_shared_and_exits_with_its_handle():
+    """One refresher per credentials; it stops once its handle is freed."""
+    first, second = _drive(), _drive()
+    refresher = start_token_refresher(first)
+    try:
+        assert start_token_refresher(second) is refresher
+        assert refresher.factory is get_handle_factory(second)
+        
+        del first, second
+        gc.collect()
+        refresher.join(timeout=5)
+        assert not refresher.is_alive()
+    finally:
+        refresher.stop()
@@ -0,0 +1,61 @@
+"""
+Tests that importing the package and trivial CLI commands stay light.
+Kiểm tra việc import package và các lệnh CLI đơn giản không nạp thư viện nặng.
+"""
+
+import os
+import subprocess
+import sys
+
+import gdrive_toolkit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Slow to import; only needed once a command actually talks to Drive
+HEAVY_MODULES = ('pydrive2', 'googleapiclient', 'oauth2client', 'httplib2', 'aiohttp')
+
+
+def _loaded_heavy_modules(code):
+    """Run code in a fresh interpreter and list the heavy modules it loaded."""
+    script = (
+        code + "\nimport sys\n"
+        f"print('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.rsplit('loaded:', 1)[1].strip()
+
+
+def test_package_and_cli_import_lazily():
+    """import gdrive_toolkit, --help and info don't load pydrive2 and friends."""
+    assert _loaded_heavy_modules("import gdrive_toolkit") == ''
+    assert _loaded_heavy_modules("import gdrive_toolkit.cli") == ''
+    
+    for argv in (['--help'], ['info'], ['sync', '--help']):
+        code = (
+            "import sys\n"
+            "from gdrive_toolkit.cli import cli\n"
+            f"try:\n    cli.main(args={argv!r}, standalone_mode=False)\n"
+            "except SystemExit:\n    pass"
+        )
+        assert _loaded_heavy_modules(code) == '', argv
+
+
+def test_every_public_name_resolves():
+    """Each name in __all__ loads from its submodule on first access."""
+    for name in gdrive_toolkit.__all__:
+        assert getattr(gdrive_toolkit, name) is not None
+    assert gdrive_toolkit.upload_file_client is gdrive_toolkit.client.upload_file
+    assert 'quick_connect' in dir(gdrive_toolkit)
+
+
+def test_submodules_resolve_as_attributes():
+    """gdrive_toolkit.client and friends work without importing them first."""
+    code = (
+        "import gdrive_toolkit\n"
+        "for name in ('client', 'auth', 'operations', 'folder', 'utils'):\n"
+        "    module = getattr(gdrive_toolkit, name)\n"
+        "    assert module.__name__ == 'gdrive_toolkit.' + name, module\n"
+        "assert gdrive_toolkit.client.upload_file is gdrive_toolkit.upload_file_client"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
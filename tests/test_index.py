@@ -0,0 +1,144 @@
+"""
+Tests for the local Drive index.
+Kiểm tra chỉ mục Drive cục bộ.
+"""
+
+import re
+
+from gdrive_toolkit.cache import get_metadata_cache, set_metadata_cache
+from gdrive_toolkit.index import DriveIndex, FOLDER_MIME
+
+
+CHILDREN = {
+    'R': [
+        {'id': 'P', 'title': 'Projects', 'mimeType': FOLDER_MIME, 'parents': [{'id': 'R'}]},
+        {'id': 'a', 'title': 'report_2024.pdf', 'mimeType': 'application/pdf',
+         'fileSize': '500', 'parents': [{'id': 'R'}]},
+    ],
+    'P': [{'id': 'Y', 'title': '2025', 'mimeType': FOLDER_MIME, 'parents': [{'id': 'P'}]}],
+    'Y': [
+        {'id': 'b', 'title': 'Report%final.csv', 'mimeType': 'text/csv',
+         'fileSize': '70', 'parents': [{'id': 'Y'}, {'id': 'R'}]},
+        {'id': 'c', 'title': 'big.bin', 'mimeType': 'application/octet-stream',
+         'fileSize': '9000', 'parents': [{'id': 'Y'}]},
+    ],
+}
+
+
+class _FakeFile(dict):
+    def FetchMetadata(self):
+        self.update(id='R', title='My Drive')
+
+
+class _FakeRequest:
+    def __init__(self, response):
+        self.response = response
+    
+    def execute(self, http=None):
+        return self.response
+
+
+class _FakeChanges:
+    """Changes feed: one page of scripted changes after token '1'."""
+    
+    def __init__(self):
+        self.items = []
+    
+    def getStartPageToken(self, **kwargs):
+        return _FakeRequest({'startPageToken': '1'})
+    
+    def list(self, pageToken, **kwargs):
+        items = self.items if pageToken == '1' else []
+        return _FakeRequest({'items': items, 'newStartPageToken': '2'})
+
+
+class _FakeAuth:
+    http = None
+    
+    def __init__(self):
+        self.feed = _FakeChanges()
+        self.service = self
+    
+    def changes(self):
+        return self.feed
+
+
+class _FakeDrive:
+    def __init__(self):
+        self.auth = _FakeAuth()
+    
+    def CreateFile(self, metadata):
+        return _FakeFile(metadata)
+    
+    def ListFile(self, params):
+        ids = re.findall(r"'(\w+)' in parents", params['q'])
+        return iter([[item for fid in ids for item in CHILDREN.get(fid, [])]])
+
+
+def _build_index(drive=None):
+    previous = get_metadata_cache()
+    set_metadata_cache(None)
+    try:
+        index = DriveIndex(':memory:')
+        assert index.build(drive or _FakeDrive(), max_workers=1, verbose=False) == 5
+    finally:
+        set_metadata_cache(previous)
+    return index
+
+
+def test_index_queries():
+    index = _build_index()
+    
+    assert index.info()['files'] == 3
+    assert index.age() is not None
+    assert [f['id'] for f in index.search(name_contains='REPORT')] == ['b', 'a']
+    assert [f['id'] for f in index.search(name_contains='%')] == ['b']
+    assert [f['id'] for f in index.search(min_size=100)] == ['c', 'a']
+    assert index.get('b')['parents'] == ['Y', 'R']
+    
+    assert index.folder_id('2025', parent_id='P') == 'Y'
+    assert index.folder_id('2025', parent_id='root') is None
+    assert index.resolve_path('Projects/2025/big.bin') == 'c'
+    assert index.path('c') == 'My Drive/Projects/2025/big.bin'
+    assert index.folder_stats('P') == {'size': 9070, 'files': 2, 'folders': 1}
+
+
+def test_search_files_from_index():
+    from gdrive_toolkit import search_files, get_folder_id_by_name
+    
+    index = _build_index()
+    
+    files = search_files(None, file_name='report', index=index)  # type: ignore
+    assert [(f['id'], f['size']) for f in files] == [('b', '70'), ('a', '500')]
+    assert get_folder_id_by_name(None, 'Projects', index=index) == 'P'  # type: ignore
+
+
+def test_update_applies_changes():
+    drive = _FakeDrive()
+    index = _build_index(drive)
+    
+    drive.auth.feed.items = [
+        # Child listed before its new parent folder
+        {'fileId': 'n2', 'file': {'id': 'n2', 'title': 'new.txt', 'mimeType': 'text/plain',
+                                  'fileSize': '3', 'parents': [{'id': 'n1'}]}},
+        {'fileId': 'n1', 'file': {'id': 'n1', 'title': 'New', 'mimeType': FOLDER_MIME,
+                                  'parents': [{'id': 'R'}]}},
+        # Renamed and moved to the root
+        {'fileId': 'c', 'file': {'id': 'c', 'title': 'huge.bin', 'mimeType': 'x',
+                                 'fileSize': '9000', 'parents': [{'id': 'R'}]}},
+        # Trashed folder takes its subtree with it
+        {'fileId': 'P', 'file': {'id': 'P', 'title': 'Projects', 'mimeType': FOLDER_MIME,
+                                 'parents': [{'id': 'R'}], 'labels': {'trashed': True}}},
+        {'fileId': 'a', 'deleted': True},
+    ]
+    
+    stats = index.update(drive, max_workers=1, verbose=False)
+    
+    assert stats == {'changes': 5, 'updated': 3, 'removed': 4}
+    assert index.path('n2') == 'My Drive/New/new.txt'
+    assert index.path('c') == 'My Drive/huge.bin'
+    assert index.get('b') is None and index.get('a') is None
+    assert index.folder_stats() == {'size': 9003, 'files': 2, 'folders': 1}
+    
+    # Token advanced: nothing more to apply
+    assert index.update(drive, verbose=False)['changes'] == 0
@@ -0,0 +1,97 @@
+"""
+Tests for paginated listing and field projection.
+Kiểm tra liệt kê theo trang và chọn trường trả về.
+"""
+
+from gdrive_toolkit.operations import _list_fields, iter_search_files
+
+
+class _FakeDrive:
+    """Serves fixed pages and records how many were requested."""
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.params = None
+        self.fetched = 0
+    
+    def ListFile(self, params):
+        self.params = params
+        self.fetched = 0
+        return self._iter()
+    
+    def _iter(self):
+        for page in self.pages:
+            self.fetched += 1
+            yield page
+
+
+def test_list_fields_presets_and_custom():
+    assert _list_fields('minimal') == 'nextPageToken,items(id,title)'
+    assert _list_fields('full') is None
+    assert _list_fields('title, fileSize') == 'nextPageToken,items(id,title,fileSize)'
+    assert _list_fields('nextPageToken,items(id)') == 'nextPageToken,items(id)'
+
+
+def test_iter_search_files_is_lazy():
+    pages = [[{'id': f'{p}-{i}', 'title': 'x'} for i in range(3)] for p in range(5)]
+    drive = _FakeDrive(pages)
+    
+    results = iter_search_files(drive, folder_id='abc', page_size=3, fields='minimal')
+    first = next(results)
+    
+    assert first['id'] == '0-0'
+    assert drive.fetched == 1
+    assert drive.params['maxResults'] == 3
+    assert drive.params['fields'] == 'nextPageToken,items(id,title)'
+    
+    assert len(list(iter_search_files(drive, max_results=7))) == 7
+    assert drive.fetched == 3
+
+
+def test_iter_search_files_pages_and_max_results():
+    pages = [[{'id': f'{p}-{i}', 'title': 'x'} for i in range(3)] for p in range(3)]
+    drive = _FakeDrive(pages)
+    
+    assert [f['id'] for f in iter_search_files(drive, page_size=3)] == [
+        f'{p}-{i}' for p in range(3) for i in range(3)
+    ]
+    assert drive.fetched == 3
+    assert drive.params['q'] == 'trashed = false'
+    
+    # A small max_results also shrinks the page; the cutoff can land mid-page
+    assert [f['id'] for f in iter_search_files(drive, max_results=2)] == ['0-0', '0-1']
+    assert drive.params['maxResults'] == 2
+    assert [f['id'] for f in iter_search_files(drive, page_size=3, max_results=4)] == [
+        '0-0', '0-1', '0-2', '1-0'
+    ]
+    assert drive.fetched == 2
+    assert list(iter_search_files(drive, max_results=0)) == []
+    
+    list(iter_search_files(drive, page_size=5000))
+    assert drive.params['maxResults'] == 1000
+
+
+def test_walk_tree_groups_parent_queries():
+    import re
+    from gdrive_toolkit.walk import FOLDER_MIME, folder_stats
+    
+    children = {
+        'root': [{'id': f'd{i}', 'mimeType': FOLDER_MIME} for i in range(3)],
+        'd0': [{'id': 'f1', 'mimeType': 'text/csv', 'fileSize': '10'}],
+        'd1': [{'id': 'f1', 'mimeType': 'text/csv', 'fileSize': '10'},  # second parent
+               {'id': 'f2', 'mimeType': 'text/csv', 'fileSize': '5'}],
+        'd2': [{'id': 'e', 'mimeType': FOLDER_MIME}],
+    }
+    queries = []
+    
+    class Drive:
+        def ListFile(self, params):
+            queries.append(params['q'])
+            ids = re.findall(r"'(\w+)' in parents", params['q'])
+            return iter([[item for fid in ids for item in children.get(fid, [])]])
+    
+    stats = folder_stats(Drive(), 'root', max_workers=1)
+    
+    assert stats == {'size': 15, 'files': 2, 'folders': 4}
+    assert len(queries) == 3
+    assert queries[1] == "('d0' in parents or 'd1' in parents or 'd2' in parents) and trashed = false"
@@ -0,0 +1,62 @@
+"""
+Tests for path resolution.
+Kiểm tra tìm đường dẫn file.
+"""
+
+import gc
+import weakref
+
+from gdrive_toolkit import operations
+from gdrive_toolkit.operations import PathResolver
+
+
+TREE = {
+    'A': {'id': 'A', 'title': 'A', 'parents': [{'id': 'R', 'isRoot': True}]},
+    'B': {'id': 'B', 'title': 'B', 'parents': [{'id': 'A', 'isRoot': False}]},
+    'S': {'id': 'S', 'title': 'Shared', 'parents': [{'id': 'R', 'isRoot': True}]},
+    'f1': {'id': 'f1', 'title': 'one.csv', 'parents': [{'id': 'B'}]},
+    'f2': {'id': 'f2', 'title': 'two.csv', 'parents': [{'id': 'B'}]},
+    'm': {'id': 'm', 'title': 'multi.csv', 'parents': [{'id': 'B'}, {'id': 'S'}]},
+}
+
+
+def test_resolve_many_shares_ancestors(monkeypatch):
+    calls = []
+    
+    def fake_batch(drive, file_ids, fields=None, batch_size=100):
+        calls.append(list(file_ids))
+        return {fid: TREE.get(fid, Exception('404')) for fid in file_ids}
+    
+    monkeypatch.setattr(operations, '_fetch_metadata_batch', fake_batch)
+    resolver = PathResolver(drive=None)  # type: ignore
+    
+    paths = resolver.resolve_many(['f1', 'f2', 'm', 'missing'])
+    
+    assert paths == {
+        'f1': 'My Drive/A/B/one.csv',
+        'f2': 'My Drive/A/B/two.csv',
+        'm': 'My Drive/A/B/multi.csv',
+        'missing': None,
+    }
+    # One batch per tree level, each ancestor fetched once
+    assert calls == [['f1', 'f2', 'm', 'missing'], ['B', 'S'], ['A']]
+    
+    assert resolver.resolve('m', all_parents=True) == [
+        'My Drive/A/B/multi.csv', 'My Drive/Shared/multi.csv'
+    ]
+    assert len(calls) == 3
+
+
+def test_session_resolver_does_not_keep_handle_alive():
+    """The shared resolver lives on its handle and is freed with it."""
+    class _Drive:
+        pass
+    
+    drive = _Drive()
+    resolver = operations._get_path_resolver(drive)
+    assert operations._get_path_resolver(drive) is resolver
+    
+    handle = weakref.ref(drive)
+    del drive, resolver
+    gc.collect()
+    assert handle() is None
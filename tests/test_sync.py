@@ -0,0 +1,218 @@
+"""
+Tests for one-way directory sync.
+Kiểm tra đồng bộ thư mục một chiều.
+"""
+
+import hashlib
+import os
+import re
+
+from gdrive_toolkit import cache as cache_module
+from gdrive_toolkit import utils
+from gdrive_toolkit.cache import (
+    HashCache, FolderCache, set_metadata_cache, get_metadata_cache,
+    get_folder_cache, set_folder_cache,
+)
+from gdrive_toolkit.sync import sync_to_drive, mirror_from_drive, FOLDER_MIME, TEMP_PREFIX
+
+
+def _md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+class _FakeFile(dict):
+    def __init__(self, drive, metadata):
+        super().__init__(metadata)
+        self.drive = drive
+    
+    def FetchMetadata(self):
+        self.update(id='R', title='My Drive')
+    
+    def SetContentFile(self, path):
+        self.content_path = path
+    
+    def Upload(self):
+        if 'id' in self:
+            self.drive.updated.append(self['id'])
+        else:
+            self['id'] = f"new{len(self.drive.created)}"
+            self.drive.created.append((self['title'], self['parents'][0]['id']))
+    
+    def Trash(self):
+        self.drive.trashed.append(self['id'])
+    
+    def GetContentFile(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.drive.content[self['id']])
+        self.drive.downloaded.append(self['id'])
+
+
+class _FakeAuth:
+    access_token_expired = False
+
+
+class _FakeDrive:
+    def __init__(self, children):
+        self.auth = _FakeAuth()
+        self.children = children
+        self.created = []
+        self.updated = []
+        self.trashed = []
+        self.downloaded = []
+        self.content = {}
+    
+    def CreateFile(self, metadata):
+        return _FakeFile(self, metadata)
+    
+    def ListFile(self, params):
+        ids = re.findall(r"'(\w+)' in parents", params['q'])
+        return iter([[item for fid in ids for item in self.children.get(fid, [])]])
+
+
+def _setup(tmp_path, monkeypatch):
+    local = tmp_path / "src"
+    (local / "sub").mkdir(parents=True)
+    (local / "same.txt").write_bytes(b"same")
+    (local / "changed.txt").write_bytes(b"new content")
+    (local / "sub" / "new.txt").write_bytes(b"brand new")
+    (local / "skip.tmp").write_bytes(b"ignored")
+    
+    children = {
+        'R': [
+            {'id': 's', 'title': 'same.txt', 'mimeType': 'text/plain', 'fileSize': '4',
+             'md5Checksum': _md5(b"same"), 'parents': [{'id': 'R'}]},
+            {'id': 'c', 'title': 'changed.txt', 'mimeType': 'text/plain', 'fileSize': '3',
+             'md5Checksum': _md5(b"old"), 'parents': [{'id': 'R'}]},
+            {'id': 'x', 'title': 'extra.txt', 'mimeType': 'text/plain', 'fileSize': '1',
+             'md5Checksum': _md5(b"x"), 'parents': [{'id': 'R'}]},
+            {'id': 'G', 'title': 'gone', 'mimeType': FOLDER_MIME, 'parents': [{'id': 'R'}]},
+        ],
+        'G': [{'id': 'g', 'title': 'inside.txt', 'mimeType': 'text/plain', 'fileSize': '1',
+               'md5Checksum': _md5(b"g"), 'parents': [{'id': 'G'}]}],
+    }
+    drive = _FakeDrive(children)
+    
+    monkeypatch.setattr(cache_module, '_hash_cache', HashCache(str(tmp_path / "hashes.sqlite")))
+    monkeypatch.setattr(utils, '_worker_drive', lambda d: d)
+    previous = get_metadata_cache()
+    set_metadata_cache(None)
+    return drive, str(local), previous
+
+
+def test_sync_dry_run_changes_nothing(tmp_path, monkeypatch):
+    """dry_run reports the plan without creating, uploading or trashing."""
+    drive, local, previous = _setup(tmp_path, monkeypatch)
+    try:
+        report = sync_to_drive(drive, local, 'R', delete=True, exclude=['*.tmp'],
+                               dry_run=True, verbose=False)
+    finally:
+        set_metadata_cache(previous)
+    
+    assert report['created_folders'] == 1
+    assert report['uploaded'] == ['sub/new.txt']
+    assert report['updated'] == ['changed.txt']
+    assert report['skipped'] == 1
+    assert sorted(report['deleted']) == ['extra.txt', 'gone']
+    assert drive.created == drive.updated == drive.trashed == []
+
+
+def test_sync_uploads_only_changes(tmp_path, monkeypatch):
+    """New files are created, changed ones updated in place, extras trashed."""
+    drive, local, previous = _setup(tmp_path, monkeypatch)
+    try:
+        report = sync_to_drive(drive, local, 'R', delete=True, max_workers=2,
+                               exclude=['*.tmp'], verbose=False)
+    finally:
+        set_metadata_cache(previous)
+    
+    # The 'sub' folder is created first, then new.txt inside it
+    assert drive.created == [('sub', 'R'), ('new.txt', 'new0')]
+    assert drive.updated == ['c']
+    # Only the topmost missing folder is trashed, not its contents
+    assert sorted(drive.trashed) == ['G', 'x']
+    assert report['failed'] == {}
+    assert report['total_bytes'] == len(b"new content") + len(b"brand new")
+
+
+def test_mirror_recreates_tree_and_downloads_changes(tmp_path, monkeypatch):
+    """Only missing or changed files are downloaded; extras are removed."""
+    drive, local, previous = _setup(tmp_path, monkeypatch)
+    drive.content = {'c': b"old", 'x': b"x", 'g': b"g"}
+    (tmp_path / "src" / "sub" / "new.txt").unlink()
+    os.chmod(tmp_path / "src" / "changed.txt", 0o640)
+    try:
+        report = mirror_from_drive(drive, 'R', local, delete=True, max_workers=2,
+                                   exclude=['*.tmp'], verbose=False)
+    finally:
+        set_metadata_cache(previous)
+    
+    src = tmp_path / "src"
+    assert sorted(drive.downloaded) == ['c', 'g', 'x']
+    assert (src / "changed.txt").read_bytes() == b"old"
+    assert (src / "gone" / "inside.txt").read_bytes() == b"g"
+    assert report['skipped'] == 1
+    assert report['deleted'] == ['sub']
+    assert not (src / "sub").exists()
+    # Excluded files are left alone and no temporary files remain
+    assert (src / "skip.tmp").exists()
+    assert not [p for p in src.rglob(TEMP_PREFIX + '*')]
+    # Replaced files keep their mode, new ones get the umask default
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert (src / "changed.txt").stat().st_mode & 0o777 == 0o640
+    assert (src / "gone" / "inside.txt").stat().st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_sync_delete_leaves_excluded_remote_items(tmp_path, monkeypatch):
+    """Remote items matching exclude are never trashed; trashed folders leave the cache."""
+    drive, local, previous = _setup(tmp_path, monkeypatch)
+    drive.children['R'] += [
+        {'id': 'K', 'title': '.ipynb_checkpoints', 'mimeType': FOLDER_MIME, 'parents': [{'id': 'R'}]},
+        {'id': 't', 'title': 'keep.tmp', 'mimeType': 'text/plain', 'fileSize': '1',
+         'md5Checksum': _md5(b"t"), 'parents': [{'id': 'R'}]},
+    ]
+    drive.children['K'] = [
+        {'id': 'k1', 'title': 'a.ipynb', 'mimeType': 'text/plain', 'fileSize': '1',
+         'md5Checksum': _md5(b"a"), 'parents': [{'id': 'K'}]},
+        {'id': 'k2', 'title': 'a.ipynb', 'mimeType': 'text/plain', 'fileSize': '1',
+         'md5Checksum': _md5(b"b"), 'parents': [{'id': 'K'}]},
+    ]
+    previous_folders = get_folder_cache()
+    folders = FolderCache()
+    folders.put('R', 'gone', 'G')
+    set_folder_cache(folders)
+    try:
+        report = sync_to_drive(drive, local, 'R', delete=True,
+                               exclude=['*.tmp', '.ipynb_checkpoints'], verbose=False)
+    finally:
+        set_metadata_cache(previous)
+        set_folder_cache(previous_folders)
+    
+    assert sorted(drive.trashed) == ['G', 'x']
+    assert sorted(report['deleted']) == ['extra.txt', 'gone']
+    assert folders.get('R', 'gone') == (False, None)
+
+
+def test_sync_dry_run_is_quiet_without_verbose(tmp_path, monkeypatch, capsys):
+    """verbose=False silences the dry-run plan too."""
+    drive, local, previous = _setup(tmp_path, monkeypatch)
+    try:
+        sync_to_drive(drive, local, 'R', delete=True, dry_run=True, verbose=False)
+    finally:
+        set_metadata_cache(previous)
+    
+    assert capsys.readouterr().out == ''
+
+
+def test_mirror_dry_run_is_quiet_without_verbose(tmp_path, monkeypatch, capsys):
+    """verbose=False silences the mirror's dry-run plan too."""
+    drive, local, previous = _setup(tmp_path, monkeypatch)
+    try:
+        report = mirror_from_drive(drive, 'R', local, delete=True, dry_run=True,
+                                   verbose=False)
+    finally:
+        set_metadata_cache(previous)
+    
+    assert capsys.readouterr().out == ''
+    assert report['updated'] == ['changed.txt'] and report['deleted']
+    assert drive.downloaded == []
@@ -0,0 +1,320 @@
+"""
+Tests for the transfer engines (offline, with a fake HTTP transport).
+Kiểm tra các engine truyền dữ liệu.
+"""
+
+import gc
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+import zipfile
+
+import pytest
+
+from gdrive_toolkit import cache as cache_module
+from gdrive_toolkit.cache import HashCache
+from gdrive_toolkit.transfer import (
+    CHUNK_ALIGNMENT, ResumableUploadStream, download_resumable, download_segmented,
+    upload_resumable,
+)
+
+
+def _md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+class _Response(dict):
+    """httplib2-style response: lower-case headers plus a status."""
+    
+    def __init__(self, status, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+
+
+class _FakeServer:
+    """
+    Serves one file over Range requests, like the Drive media endpoint,
+    and accepts resumable upload sessions.
+    """
+    
+    def __init__(self, content=b''):
+        self.content = content
+        self.requests = []
+        self.lock = threading.Lock()
+        self.sessions = {}  # session URI -> bytes received
+        self.expired = set()
+        self.failures = []  # statuses or exceptions for the next PUTs
+    
+    def request(self, url, method='GET', body=None, headers=None):
+        headers = headers or {}
+        with self.lock:
+            self.requests.append((method, headers))
+        
+        if method == 'POST':
+            session_uri = f"https://upload/session/{len(self.sessions)}"
+            self.sessions[session_uri] = bytearray()
+            return _Response(200, {'location': session_uri}), b''
+        if method == 'PUT':
+            return self._put(url, body, headers['Content-Range'])
+        
+        start, end = map(int, re.match(r'bytes=(\d+)-(\d+)', headers['Range']).groups())
+        # Let later ranges finish first
+        time.sleep(0.002 * (len(self.content) - start) / max(len(self.content), 1))
+        return _Response(206), self.content[start:end + 1]
+    
+    def _put(self, session_uri, body, content_range):
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return _Response(failure), b''
+        if session_uri in self.expired:
+            return _Response(404), b''
+        received = self.sessions[session_uri]
+        
+        match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', content_range)
+        if match:
+            assert int(match.group(1)) == len(received), "chunk does not continue the upload"
+            received.extend(body)
+        total = content_range.rsplit('/', 1)[1]
+        
+        if total != '*' and len(received) == int(total):
+            return _Response(200), json.dumps({'id': 'up1', 'fileSize': total}).encode()
+        if not received:
+            return _Response(308), b''
+        return _Response(308, {'range': f'bytes=0-{len(received) - 1}'}), b''
+
+
+class _FakeAuth:
+    access_token_expired = False
+    
+    def __init__(self, server):
+        self.server = server
+    
+    def Get_Http_Object(self):
+        return self.server
+
+
+class _FakeDrive:
+    def __init__(self, server):
+        self.auth = _FakeAuth(server)
+
+
+@pytest.fixture(autouse=True)
+def hash_cache(tmp_path, monkeypatch):
+    # Keep verified hashes out of the user's cache directory
+    monkeypatch.setattr(cache_module, '_hash_cache', HashCache(str(tmp_path / "hashes.sqlite")))
+
+
+def test_segmented_download_reassembles_ranges(tmp_path):
+    """Ranges fetched concurrently and out of order make up the whole file."""
+    content = bytes(range(256)) * 40 + b"tail"
+    server = _FakeServer(content)
+    output = tmp_path / "big.bin"
+    progress = []
+    
+    download_segmented(_FakeDrive(server), 'F', str(output), len(content),
+                       md5_checksum=_md5(content), connections=4, chunk_size=1000,
+                       callback=lambda done, total: progress.append(done))
+    
+    assert output.read_bytes() == content
+    assert len(server.requests) == 11
+    assert progress[-1] == len(content)
+    assert cache_module.get_hash_cache().md5(str(output)) == _md5(content)
+
+
+def test_segmented_download_rejects_md5_mismatch(tmp_path):
+    """A checksum mismatch raises and leaves no file behind."""
+    server = _FakeServer(b"x" * 5000)
+    output = tmp_path / "big.bin"
+    
+    with pytest.raises(RuntimeError, match="MD5 mismatch"):
+        download_segmented(_FakeDrive(server), 'F', str(output), 5000,
+                           md5_checksum=_md5(b"something else"), chunk_size=1000)
+    assert not output.exists()
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def _interrupt_after(limit):
+    """Progress callback that fails once ``limit`` bytes are acknowledged."""
+    def callback(done, total):
+        if done >= limit:
+            raise _Interrupted()
+    return callback
+
+
+def _puts(server):
+    return [headers['Content-Range'] for method, headers in server.requests if method == 'PUT']
+
+
+def test_resumable_upload_resumes_from_acknowledged_offset(tmp_path):
+    """A rerun asks Drive for the session offset and sends only the rest."""
+    content = os.urandom(2 * CHUNK_ALIGNMENT + 100)
+    source = tmp_path / "model.pt"
+    source.write_bytes(content)
+    server = _FakeServer()
+    drive = _FakeDrive(server)
+    
+    with pytest.raises(_Interrupted):
+        upload_resumable(drive, str(source), {'title': 'model.pt'},
+                         chunk_size=CHUNK_ALIGNMENT, callback=_interrupt_after(CHUNK_ALIGNMENT))
+    assert os.path.exists(str(source) + '.gdrive-upload.json')
+    
+    server.requests.clear()
+    resource = upload_resumable(drive, str(source), {'title': 'model.pt'},
+                                chunk_size=CHUNK_ALIGNMENT)
+    
+    total = len(content)
+    assert resource['id'] == 'up1'
+    assert [method for method, _ in server.requests].count('POST') == 0
+    assert _puts(server) == [
+        f'bytes */{total}',
+        f'bytes {CHUNK_ALIGNMENT}-{2 * CHUNK_ALIGNMENT - 1}/{total}',
+        f'bytes {2 * CHUNK_ALIGNMENT}-{total - 1}/{total}',
+    ]
+    assert bytes(server.sessions['https://upload/session/0']) == content
+    assert not os.path.exists(str(source) + '.gdrive-upload.json')
+
+
+def test_resumable_upload_ignores_stale_state(tmp_path):
+    """A changed source or an expired session starts a new session."""
+    source = tmp_path / "data.bin"
+    source.write_bytes(os.urandom(2 * CHUNK_ALIGNMENT))
+    server = _FakeServer()
+    drive = _FakeDrive(server)
+    
+    def interrupted_upload():
+        with pytest.raises(_Interrupted):
+            upload_resumable(drive, str(source), {'title': 'data.bin'},
+                             chunk_size=CHUNK_ALIGNMENT,
+                             callback=_interrupt_after(CHUNK_ALIGNMENT))
+    
+    # The source changed since the interrupted upload
+    interrupted_upload()
+    content = os.urandom(2 * CHUNK_ALIGNMENT + 1)
+    source.write_bytes(content)
+    upload_resumable(drive, str(source), {'title': 'data.bin'}, chunk_size=CHUNK_ALIGNMENT)
+    assert bytes(server.sessions['https://upload/session/1']) == content
+    
+    # The saved session expired on Drive's side
+    interrupted_upload()
+    server.expired.add('https://upload/session/2')
+    upload_resumable(drive, str(source), {'title': 'data.bin'}, chunk_size=CHUNK_ALIGNMENT)
+    assert bytes(server.sessions['https://upload/session/3']) == content
+
+
+def test_resumable_upload_retries_failed_offset_queries(tmp_path, monkeypatch):
+    """A 5xx or dropped connection while asking for the offset is retried, not raised."""
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    content = os.urandom(2 * CHUNK_ALIGNMENT + 100)
+    source = tmp_path / "model.pt"
+    source.write_bytes(content)
+    server = _FakeServer()
+    drive = _FakeDrive(server)
+    
+    # The first chunk fails, then so does the resync query after it
+    server.failures = [503, ConnectionResetError("reset")]
+    with pytest.raises(_Interrupted):
+        upload_resumable(drive, str(source), {'title': 'model.pt'},
+                         chunk_size=CHUNK_ALIGNMENT, callback=_interrupt_after(CHUNK_ALIGNMENT))
+    assert len(server.sessions['https://upload/session/0']) == CHUNK_ALIGNMENT
+    
+    # The rerun's resume query fails twice before Drive answers
+    server.failures = [500, OSError("connection dropped")]
+    resource = upload_resumable(drive, str(source), {'title': 'model.pt'},
+                                chunk_size=CHUNK_ALIGNMENT)
+    
+    assert resource['id'] == 'up1'
+    assert len(server.sessions) == 1
+    assert bytes(server.sessions['https://upload/session/0']) == content
+
+
+def _write_partial(output, data, file_size, md5, modified_date):
+    (output.parent / (output.name + '.part')).write_bytes(data)
+    state = {'id': 'F', 'fileSize': file_size, 'md5Checksum': md5, 'modifiedDate': modified_date}
+    (output.parent / (output.name + '.part.json')).write_text(json.dumps(state))
+
+
+def test_partial_download_resumes_where_it_stopped(tmp_path):
+    """A .part file for the same remote version is continued with a Range request."""
+    content = os.urandom(5000)
+    server = _FakeServer(content)
+    output = tmp_path / "data.bin"
+    _write_partial(output, content[:1200], 5000, _md5(content), '2024-01-01T00:00:00.000Z')
+    
+    download_resumable(_FakeDrive(server), 'F', str(output), 5000, md5_checksum=_md5(content),
+                       modified_date='2024-01-01T00:00:00.000Z', chunk_size=2000)
+    
+    assert output.read_bytes() == content
+    assert [h['Range'] for _, h in server.requests] == ['bytes=1200-3199', 'bytes=3200-4999']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['data.bin', 'hashes.sqlite']
+
+
+def test_partial_download_is_discarded_when_remote_changed(tmp_path):
+    """A .part file left by an older remote version is thrown away."""
+    content = os.urandom(5000)
+    server = _FakeServer(content)
+    output = tmp_path / "data.bin"
+    _write_partial(output, b"stale" * 100, 5000, _md5(b"old"), '2023-01-01T00:00:00.000Z')
+    
+    download_resumable(_FakeDrive(server), 'F', str(output), 5000, md5_checksum=_md5(content),
+                       modified_date='2024-01-01T00:00:00.000Z')
+    
+    assert output.read_bytes() == content
+    assert [h['Range'] for _, h in server.requests] == ['bytes=0-4999']
+
+
+def test_upload_stream_takes_a_zip_written_without_seeking(tmp_path):
+    """ZipFile writes to the non-seekable stream; the uploaded bytes are a valid archive."""
+    members = {'a.bin': os.urandom(CHUNK_ALIGNMENT), 'b.txt': b"hello" * 1000}
+    server = _FakeServer()
+    
+    with ResumableUploadStream(_FakeDrive(server), {'title': 'out.zip'},
+                               chunk_size=CHUNK_ALIGNMENT) as stream:
+        assert not stream.seekable()
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for name, data in members.items():
+                zipf.writestr(name, data)
+    
+    assert stream.resource['id'] == 'up1'
+    uploaded = bytes(server.sessions['https://upload/session/0'])
+    with zipfile.ZipFile(io.BytesIO(uploaded)) as zipf:
+        assert {name: zipf.read(name) for name in zipf.namelist()} == members
+    # Full chunks went up while writing, with the size unknown until the end
+    ranges = _puts(server)
+    assert ranges[0] == f'bytes 0-{CHUNK_ALIGNMENT - 1}/*'
+    assert ranges[-1].endswith(f'/{len(uploaded)}')
+
+
+def test_upload_stream_is_abandoned_on_error():
+    """Leaving the with block through an exception never completes the file."""
+    server = _FakeServer()
+    
+    with pytest.raises(_Interrupted):
+        with ResumableUploadStream(_FakeDrive(server), {'title': 'out.zip'}) as stream:
+            stream.write(b"partial")
+            raise _Interrupted()
+    
+    assert stream.resource is None
+    assert _puts(server) == []
+
+
+def test_upload_stream_dropped_without_close_is_abandoned():
+    """Garbage-collecting an unclosed stream doesn't commit what was written so far."""
+    server = _FakeServer()
+    stream = ResumableUploadStream(_FakeDrive(server), {'title': 'out.zip'},
+                                   chunk_size=CHUNK_ALIGNMENT)
+    stream.write(os.urandom(CHUNK_ALIGNMENT + 10))
+    
+    del stream
+    gc.collect()
+    
+    # Only the full chunk went up, with the size still unknown
+    assert _puts(server) == [f'bytes 0-{CHUNK_ALIGNMENT - 1}/*']
@@ -0,0 +1,177 @@
+"""
+Tests for the batch transfer helpers.
+Kiểm tra các hàm upload/download hàng loạt.
+"""
+
+import hashlib
+import threading
+import time
+
+import pytest
+
+from gdrive_toolkit import cache as cache_module
+from gdrive_toolkit import operations, utils
+from gdrive_toolkit.cache import HashCache, get_metadata_cache, set_metadata_cache
+from gdrive_toolkit.utils import (
+    _run_transfer_pool, _unique_file_names, batch_download, batch_upload,
+)
+
+
+class _FakeFile(dict):
+    def __init__(self, drive, metadata):
+        super().__init__(metadata)
+        self.drive = drive
+    
+    def FetchMetadata(self):
+        self.update(self.drive.metadata.get(self['id'], {}))
+        self.setdefault('parents', [])
+    
+    def SetContentFile(self, path):
+        self.content_path = path
+    
+    def Upload(self):
+        if 'id' in self:
+            self.drive.updated.append(self['id'])
+        else:
+            self['id'] = f"new{len(self.drive.created)}"
+            self.drive.created.append(self['title'])
+    
+    def GetContentFile(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.drive.content[self['id']])
+        self.drive.downloaded.append(self['id'])
+
+
+class _FakeAuth:
+    access_token_expired = False
+
+
+class _FakeDrive:
+    def __init__(self):
+        self.auth = _FakeAuth()
+        self.created = []
+        self.updated = []
+        self.content = {}
+        self.metadata = {}
+        self.downloaded = []
+    
+    def CreateFile(self, metadata):
+        return _FakeFile(self, metadata)
+
+
+@pytest.fixture
+def drive(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, '_hash_cache', HashCache(str(tmp_path / "hashes.sqlite")))
+    monkeypatch.setattr(utils, '_worker_drive', lambda d: d)
+    previous = get_metadata_cache()
+    set_metadata_cache(None)
+    yield _FakeDrive()
+    set_metadata_cache(previous)
+
+
+def test_transfer_pool_keeps_input_order_and_captures_failures(drive):
+    """Results come back in input order; one failure doesn't stop the rest."""
+    threads = set()
+    
+    def transfer(worker_drive, item):
+        threads.add(threading.get_ident())
+        # Later items finish first
+        time.sleep(0.01 * (5 - item))
+        if item == 2:
+            raise ValueError("boom")
+        return item * 10
+    
+    entries = _run_transfer_pool(drive, list(range(5)), transfer, max_workers=4,
+                                 describe=str, verbose=False)
+    
+    assert [e['item'] for e in entries] == [0, 1, 2, 3, 4]
+    assert [e['result'] for e in entries] == [0, 10, None, 30, 40]
+    assert [e['error'] for e in entries] == [None, None, "boom", None, None]
+    assert all(e['elapsed'] >= 0 for e in entries)
+    assert len(threads) > 1
+
+
+def test_batch_upload_report_counts_only_sent_bytes(drive, tmp_path, monkeypatch):
+    """if_changed skips unchanged files, updates changed ones, and reports them apart."""
+    for name, data in (('same.txt', b"same"), ('changed.txt', b"changed!"), ('new.txt', b"new")):
+        (tmp_path / name).write_bytes(data)
+    remote = {
+        'same.txt': {'id': 's', 'fileSize': '4', 'md5Checksum': hashlib.md5(b"same").hexdigest()},
+        'changed.txt': {'id': 'c', 'fileSize': '3', 'md5Checksum': hashlib.md5(b"old").hexdigest()},
+    }
+    monkeypatch.setattr(operations, '_list_folder_files', lambda d, folder_id: remote)
+    paths = [str(tmp_path / name) for name in ('same.txt', 'changed.txt', 'new.txt')]
+    
+    for workers in (1, 3):
+        drive.created, drive.updated = [], []
+        report = batch_upload(drive, paths, folder_id='F', max_workers=workers,
+                              if_changed=True, return_report=True, verbose=False)
+        
+        assert report['file_ids'] == ['s', 'c', 'new0']
+        assert drive.updated == ['c'] and drive.created == ['new.txt']
+        assert [r['skipped'] for r in report['results']] == [True, False, False]
+        assert report['skipped'] == 1
+        assert report['total_bytes'] == len(b"changed!") + len(b"new")
+
+
+def test_unique_file_names_are_deterministic():
+    """Later duplicates get a counter, skipping names already in use."""
+    titles = ['a.txt', 'a.txt', 'a (1).txt', 'a.txt', 'b', 'b', 'x/y.csv', '']
+    
+    assert _unique_file_names(titles) == [
+        'a.txt', 'a (2).txt', 'a (1).txt', 'a (3).txt', 'b', 'b (1)', 'x_y.csv', 'untitled',
+    ]
+
+
+def test_batch_download_keeps_files_sharing_a_title(drive, tmp_path, monkeypatch):
+    """Same-titled files land side by side, in input order, serial or concurrent."""
+    drive.content = {'1': b"one", '2': b"two", '3': b"three"}
+    drive.metadata = {
+        '1': {'title': 'data.csv'},
+        '2': {'title': 'data.csv'},
+        '3': {'title': 'other.csv'},
+    }
+    metadata = {file_id: dict(meta, id=file_id) for file_id, meta in drive.metadata.items()}
+    metadata['gone'] = FileNotFoundError("gone")
+    monkeypatch.setattr(operations, '_fetch_metadata_batch', lambda d, ids, fields: metadata)
+    
+    for workers in (1, 4):
+        save_dir = tmp_path / f"workers{workers}"
+        
+        report = batch_download(drive, ['1', '2', 'gone', '3'], save_dir=str(save_dir),
+                                max_workers=workers, return_report=True, verbose=False)
+        
+        assert report['paths'] == [str(save_dir / name)
+                                   for name in ('data.csv', 'data (1).csv', 'other.csv')]
+        assert (save_dir / "data.csv").read_bytes() == b"one"
+        assert (save_dir / "data (1).csv").read_bytes() == b"two"
+        assert list(report['failed']) == ['gone']
+
+
+def test_batch_download_skips_files_already_up_to_date(drive, tmp_path, monkeypatch):
+    """skip_unchanged leaves local copies with the remote size and MD5 alone."""
+    drive.content = {'1': b"same", '2': b"remote"}
+    drive.metadata = {
+        '1': {'title': 'same.txt', 'fileSize': '4',
+              'md5Checksum': hashlib.md5(b"same").hexdigest()},
+        '2': {'title': 'changed.txt', 'fileSize': '6',
+              'md5Checksum': hashlib.md5(b"remote").hexdigest()},
+    }
+    metadata = {file_id: dict(meta, id=file_id) for file_id, meta in drive.metadata.items()}
+    monkeypatch.setattr(operations, '_fetch_metadata_batch', lambda d, ids, fields: metadata)
+    
+    for workers in (1, 2):
+        (tmp_path / "same.txt").write_bytes(b"same")
+        (tmp_path / "changed.txt").write_bytes(b"local!")
+        drive.downloaded = []
+        
+        report = batch_download(drive, ['1', '2'], save_dir=str(tmp_path), max_workers=workers,
+                                skip_unchanged=True, return_report=True, verbose=False)
+        
+        assert report['paths'] == [str(tmp_path / "same.txt"), str(tmp_path / "changed.txt")]
+        assert [r['skipped'] for r in report['results']] == [True, False]
+        assert report['skipped'] == 1
+        # The kept copy isn't counted as transferred bytes
+        assert report['total_bytes'] == 6
+        assert drive.downloaded == ['2']
+        assert (tmp_path / "changed.txt").read_bytes() == b"remote"